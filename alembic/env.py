@@ -23,6 +23,7 @@ from models.tournament_game import TournamentGame
 from models.game_participant import GameParticipant
 from models.game_log import GameLog
 from models.tournament_log import TournamentLog
+from models.player_stats import PlayerStats
 
 load_dotenv()
 
@@ -32,7 +33,8 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# При запуску з застосунку (core.startup) logging вже налаштований - не чіпаємо його
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # Set the database URL from environment variable
@@ -79,6 +81,17 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # З'єднання від застосунку (core.startup.run_migrations_if_needed)
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -0,0 +1,29 @@
+"""add_log_created_at_indexes
+
+Revision ID: 2e8b6d4f0a1c
+Revises: 9c4e2a7d1f3b
+Create Date: 2025-12-10 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e8b6d4f0a1c'
+down_revision: Union[str, Sequence[str], None] = '9c4e2a7d1f3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset-пагінація логів турніру: (game_id, created_at) / (tournament_id, created_at)
+    op.create_index('ix_game_logs_game_id_created_at', 'game_logs', ['game_id', 'created_at'], unique=False)
+    op.create_index('ix_tournament_logs_tournament_id_created_at', 'tournament_logs', ['tournament_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tournament_logs_tournament_id_created_at', table_name='tournament_logs')
+    op.drop_index('ix_game_logs_game_id_created_at', table_name='game_logs')
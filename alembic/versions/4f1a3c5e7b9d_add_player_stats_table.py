@@ -0,0 +1,42 @@
+"""add_player_stats_table
+
+Revision ID: 4f1a3c5e7b9d
+Revises: 2e8b6d4f0a1c
+Create Date: 2025-12-11 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1a3c5e7b9d'
+down_revision: Union[str, Sequence[str], None] = '2e8b6d4f0a1c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'player_stats',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('tournament_size', sa.Integer(), nullable=False),
+        sa.Column('tournaments_played', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('wins', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('second_places', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('third_places', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('position_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('games_played', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('game_position_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('user_id', 'tournament_size')
+    )
+    # Заповнення: python scripts/rebuild_player_stats.py
+    # (до того /stats/player рахує статистику наживо)
+
+
+def downgrade() -> None:
+    op.drop_table('player_stats')
@@ -0,0 +1,29 @@
+"""add_version_to_tournaments
+
+Revision ID: 5a7c9e1b3d2f
+Revises: 4752f0caf6df
+Create Date: 2025-12-06 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a7c9e1b3d2f'
+down_revision: Union[str, Sequence[str], None] = '4752f0caf6df'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'tournaments',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('tournaments', 'version')
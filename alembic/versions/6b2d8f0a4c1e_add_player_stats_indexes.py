@@ -0,0 +1,51 @@
+"""add_player_stats_indexes
+
+Revision ID: 6b2d8f0a4c1e
+Revises: 4f1a3c5e7b9d
+Create Date: 2025-12-12 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b2d8f0a4c1e'
+down_revision: Union[str, Sequence[str], None] = '4f1a3c5e7b9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Турніри гравця: до цього user_id не мав власного індексу
+    # (unique_tournament_participant починається з tournament_id)
+    op.create_index(
+        'ix_tournament_participants_user_id',
+        'tournament_participants',
+        ['user_id'],
+        unique=False,
+        postgresql_include=['id', 'tournament_id', 'final_position', 'total_score', 'finals_score']
+    )
+
+    # Ігри гравця: той самий префікс (participant_id, best_position) + покриваючі колонки
+    op.drop_index('ix_game_participants_participant_best_position', table_name='game_participants')
+    op.create_index(
+        'ix_game_participants_participant_best_position',
+        'game_participants',
+        ['participant_id', 'best_position'],
+        unique=False,
+        postgresql_include=['game_id', 'position_mask']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_game_participants_participant_best_position', table_name='game_participants')
+    op.create_index(
+        'ix_game_participants_participant_best_position',
+        'game_participants',
+        ['participant_id', 'best_position'],
+        unique=False
+    )
+    op.drop_index('ix_tournament_participants_user_id', table_name='tournament_participants')
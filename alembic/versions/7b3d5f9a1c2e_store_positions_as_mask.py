@@ -0,0 +1,74 @@
+"""store_positions_as_mask
+
+Revision ID: 7b3d5f9a1c2e
+Revises: 5a7c9e1b3d2f
+Create Date: 2025-12-08 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3d5f9a1c2e'
+down_revision: Union[str, Sequence[str], None] = '5a7c9e1b3d2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('game_participants', sa.Column('position_mask', sa.SmallInteger(), nullable=True))
+    op.add_column('game_participants', sa.Column('best_position', sa.SmallInteger(), nullable=True))
+
+    # Backfill: JSON-рядок "[6, 7, 8]" -> маска 0b11100000 та best_position 6
+    op.execute("""
+        UPDATE game_participants AS gp
+        SET position_mask = parsed.mask,
+            best_position = parsed.best
+        FROM (
+            SELECT g.id,
+                   SUM(1 << (e.value::int - 1))::smallint AS mask,
+                   MIN(e.value::int)::smallint AS best
+            FROM game_participants AS g
+            CROSS JOIN LATERAL json_array_elements_text(g.positions::json) AS e(value)
+            WHERE g.positions IS NOT NULL
+              AND btrim(g.positions) NOT IN ('', '[]', 'null')
+              AND e.value::int BETWEEN 1 AND 8
+            GROUP BY g.id
+        ) AS parsed
+        WHERE gp.id = parsed.id
+    """)
+
+    op.create_index(
+        'ix_game_participants_participant_best_position',
+        'game_participants',
+        ['participant_id', 'best_position'],
+        unique=False
+    )
+    op.drop_column('game_participants', 'positions')
+
+
+def downgrade() -> None:
+    op.add_column('game_participants', sa.Column('positions', sa.String(), nullable=True))
+
+    # Маска -> JSON-рядок у форматі json.dumps: "[6, 7, 8]"
+    op.execute("""
+        UPDATE game_participants AS gp
+        SET positions = restored.positions
+        FROM (
+            SELECT g.id,
+                   '[' || string_agg(p.pos::text, ', ' ORDER BY p.pos) || ']' AS positions
+            FROM game_participants AS g
+            CROSS JOIN generate_series(1, 8) AS p(pos)
+            WHERE g.position_mask IS NOT NULL
+              AND (g.position_mask & (1 << (p.pos - 1))) <> 0
+            GROUP BY g.id
+        ) AS restored
+        WHERE gp.id = restored.id
+    """)
+
+    op.drop_index('ix_game_participants_participant_best_position', table_name='game_participants')
+    op.drop_column('game_participants', 'best_position')
+    op.drop_column('game_participants', 'position_mask')
@@ -0,0 +1,55 @@
+"""add_hot_path_indexes
+
+Revision ID: 8e4a6c2b0d7f
+Revises: 6b2d8f0a4c1e
+Create Date: 2025-12-13 12:00:00.000000
+
+Аудит фільтрів гарячих запитів. Уже покриті (лівий префікс існуючого індексу):
+- game_participants.game_id            -> unique_game_participant (game_id, participant_id)
+- game_participants.participant_id     -> ix_game_participants_participant_best_position
+- tournament_participants.tournament_id -> unique_tournament_participant (tournament_id, user_id)
+- tournament_participants.user_id      -> ix_tournament_participants_user_id
+- tournament_games.round_id            -> unique_round_game (round_id, game_number)
+- tournament_rounds (tournament_id, round_number) -> unique_tournament_round
+Тут додаються відсутні.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4a6c2b0d7f'
+down_revision: Union[str, Sequence[str], None] = '6b2d8f0a4c1e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_tournament_games_tournament_id_round_id',
+        'tournament_games',
+        ['tournament_id', 'round_id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_tournaments_listing',
+        'tournaments',
+        ['status', 'start_date', 'created_at'],
+        unique=False,
+        postgresql_where=sa.text('is_deleted = false')
+    )
+    op.create_index(
+        'ix_tournaments_creator_id',
+        'tournaments',
+        ['creator_id'],
+        unique=False,
+        postgresql_where=sa.text('is_deleted = false')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tournaments_creator_id', table_name='tournaments')
+    op.drop_index('ix_tournaments_listing', table_name='tournaments')
+    op.drop_index('ix_tournament_games_tournament_id_round_id', table_name='tournament_games')
@@ -0,0 +1,28 @@
+"""add_tiebreak_seed_to_tournaments
+
+Revision ID: 9c4e2a7d1f3b
+Revises: 7b3d5f9a1c2e
+Create Date: 2025-12-09 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2a7d1f3b'
+down_revision: Union[str, Sequence[str], None] = '7b3d5f9a1c2e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tournaments', sa.Column('tiebreak_seed', sa.Integer(), nullable=True))
+    # Існуючим турнірам - випадковий seed (для вже завершених він не використовується)
+    op.execute("UPDATE tournaments SET tiebreak_seed = floor(random() * 2147483646)::int")
+
+
+def downgrade() -> None:
+    op.drop_column('tournaments', 'tiebreak_seed')
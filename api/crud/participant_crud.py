@@ -99,44 +99,15 @@ def get_finals_leaderboard(db: Session, tournament_id: int):
     Тепер беремо фактичних фіналістів з фінальних ігор (враховуємо свапи).
     """
     from models.tournament import Tournament
-    from models.tournament_round import TournamentRound
-    from models.tournament_game import TournamentGame
-    from models.game_participant import GameParticipant
+    from services.finalists import get_finalist_sets
     from sqlalchemy.orm import joinedload
     
     tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
     if not tournament or not tournament.finals_started:
         return []
     
-    # Знаходимо всі фінальні раунди (round_number > regular_rounds)
-    regular_rounds = tournament.regular_rounds or tournament.total_rounds
-    final_rounds = db.query(TournamentRound.id).filter(
-        TournamentRound.tournament_id == tournament_id,
-        TournamentRound.round_number > regular_rounds
-    ).all()
-    
-    if not final_rounds:
-        return []
-    
-    final_round_ids = [r[0] for r in final_rounds]
-    
-    # Всі фінальні ігри
-    final_games = db.query(TournamentGame.id).filter(
-        TournamentGame.tournament_id == tournament_id,
-        TournamentGame.round_id.in_(final_round_ids)
-    ).all()
-    
-    if not final_games:
-        return []
-    
-    final_game_ids = [g[0] for g in final_games]
-    
     # Фіналісти = всі унікальні TournamentParticipant.id, які є в фінальних GameParticipant
-    finalist_rows = db.query(GameParticipant.participant_id).filter(
-        GameParticipant.game_id.in_(final_game_ids)
-    ).distinct().all()
-    
-    finalist_ids = [row[0] for row in finalist_rows]
+    finalist_ids = get_finalist_sets(db, tournament).actual
     
     if not finalist_ids:
         return []
@@ -167,36 +138,15 @@ def get_finals_candidates(db: Session, tournament_id: int):
     - повертаємо всіх інших учасників турніру, відсортованих по total_score
     """
     from models.tournament import Tournament
-    from models.tournament_round import TournamentRound
-    from models.tournament_game import TournamentGame
-    from models.game_participant import GameParticipant
+    from services.finalists import get_finalist_sets
     from sqlalchemy.orm import joinedload
 
     tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
     if not tournament or not tournament.with_finals:
         return []
 
-    # Знаходимо фактичних фіналістів з фінальних ігор (як у get_finals_leaderboard)
-    regular_rounds = tournament.regular_rounds or tournament.total_rounds
-    final_rounds = db.query(TournamentRound.id).filter(
-        TournamentRound.tournament_id == tournament_id,
-        TournamentRound.round_number > regular_rounds
-    ).all()
-
-    finalist_ids = set()
-    if final_rounds:
-        final_round_ids = [r[0] for r in final_rounds]
-        final_games = db.query(TournamentGame.id).filter(
-            TournamentGame.tournament_id == tournament_id,
-            TournamentGame.round_id.in_(final_round_ids)
-        ).all()
-
-        if final_games:
-            final_game_ids = [g[0] for g in final_games]
-            finalist_rows = db.query(GameParticipant.participant_id).filter(
-                GameParticipant.game_id.in_(final_game_ids)
-            ).distinct().all()
-            finalist_ids = {row[0] for row in finalist_rows}
+    # Фактичні фіналісти з фінальних ігор (як у get_finals_leaderboard)
+    finalist_ids = get_finalist_sets(db, tournament).actual
 
     # Всі учасники турніру
     all_participants = db.query(TournamentParticipant).options(
@@ -221,56 +171,112 @@ def get_finals_candidates(db: Session, tournament_id: int):
 
 
 def update_participant_total_score(db: Session, participant_id: int):
-    """Recalculate total score and finals_score from all game results"""
-    from models.tournament_round import TournamentRound
-    from models.tournament_game import TournamentGame
-    from models.tournament import Tournament
-    
-    # Get participant's tournament
-    participant = db.query(TournamentParticipant).filter(
+    """
+    Recalculate total_score and finals_score for a single participant.
+    Тонка обгортка над services.score_engine.recalculate_scores (з commit),
+    залишена для сумісності.
+    """
+    from services.score_engine import recalculate_scores
+
+    tournament_id = db.query(TournamentParticipant.tournament_id).filter(
         TournamentParticipant.id == participant_id
-    ).first()
-    
-    if not participant:
+    ).scalar()
+
+    if tournament_id is None:
         return
-    
-    tournament = db.query(Tournament).filter(
-        Tournament.id == participant.tournament_id
-    ).first()
-    
-    regular_rounds = tournament.regular_rounds or tournament.total_rounds
-    
-    # Calculate total_score from regular rounds only
-    regular_score = db.query(
-        func.coalesce(func.sum(GameParticipant.calculated_points), 0)
-    ).join(TournamentGame, GameParticipant.game_id == TournamentGame.id
-    ).join(TournamentRound, TournamentGame.round_id == TournamentRound.id
-    ).filter(
-        GameParticipant.participant_id == participant_id,
-        TournamentRound.round_number <= regular_rounds
-    ).scalar() or 0.0
-    
-    # Calculate finals_score from final rounds only
-    finals_score = db.query(
-        func.coalesce(func.sum(GameParticipant.calculated_points), 0)
-    ).join(TournamentGame, GameParticipant.game_id == TournamentGame.id
-    ).join(TournamentRound, TournamentGame.round_id == TournamentRound.id
-    ).filter(
-        GameParticipant.participant_id == participant_id,
-        TournamentRound.round_number > regular_rounds
-    ).scalar() or 0.0
-    
-    # Update both scores
-    db.query(TournamentParticipant).filter(
-        TournamentParticipant.id == participant_id
-    ).update({
-        TournamentParticipant.total_score: regular_score,
-        TournamentParticipant.finals_score: finals_score
-    }, synchronize_session=False)
-    
+
+    recalculate_scores(db, tournament_id, [participant_id])
     db.commit()
 
 
+def _final_standings_query(tournament):
+    """
+    SELECT participant_id, final_position - один ranking-запит.
+
+    Фіналісти (учасники фінальних ігор, з урахуванням свапів) займають місця
+    1..N за score DESC, best_placement ASC, tiebreak ASC; решта - N+1.. за
+    total_score DESC, tiebreak ASC. Якщо фінальних ігор ще немає, фіналістами
+    вважаються top-N за total_score (як і раніше).
+    """
+    from sqlalchemy import case, literal, select, true
+    from services.finalists import in_final_games
+
+    use_finals_score = bool(tournament.with_finals and tournament.finals_started)
+    seed = tournament.tiebreak_seed if tournament.tiebreak_seed is not None else tournament.id
+
+    # Детермінований "coin flip": мультиплікативний хеш (seed, participant_id)
+    tiebreak = (TournamentParticipant.id * 2654435761 + seed) % 2147483647
+
+    best_placements = (
+        select(
+            GameParticipant.participant_id.label("participant_id"),
+            func.min(GameParticipant.best_position).label("best_placement"),
+        )
+        .join(TournamentParticipant, TournamentParticipant.id == GameParticipant.participant_id)
+        .where(
+            TournamentParticipant.tournament_id == tournament.id,
+            GameParticipant.best_position.isnot(None)
+        )
+        .group_by(GameParticipant.participant_id)
+        .subquery("best_placements")
+    )
+
+    if use_finals_score:
+        in_finals_flag = case((in_final_games(tournament), 1), else_=0)
+    else:
+        in_finals_flag = literal(1)
+
+    base = (
+        select(
+            TournamentParticipant.id.label("participant_id"),
+            func.coalesce(TournamentParticipant.total_score, 0.0).label("total_score"),
+            func.coalesce(TournamentParticipant.finals_score, 0.0).label("finals_score"),
+            func.coalesce(best_placements.c.best_placement, 999).label("best_placement"),
+            tiebreak.label("tiebreak"),
+            in_finals_flag.label("in_finals"),
+        )
+        .select_from(TournamentParticipant)
+        .outerjoin(best_placements, best_placements.c.participant_id == TournamentParticipant.id)
+        .where(TournamentParticipant.tournament_id == tournament.id)
+        .subquery("base")
+    )
+
+    ranked = select(
+        base,
+        func.max(base.c.in_finals).over().label("any_in_finals"),
+        func.row_number().over(
+            order_by=(base.c.total_score.desc(), base.c.tiebreak.asc())
+        ).label("total_rank"),
+    ).subquery("ranked")
+
+    if use_finals_score:
+        # fallback: фінальних ігор немає - top-N за total_score
+        finals_count = tournament.finals_participants_count
+        fallback = (ranked.c.total_rank <= finals_count) if finals_count else true()
+        is_finalist = case(
+            (ranked.c.any_in_finals == 1, ranked.c.in_finals == 1),
+            else_=fallback,
+        )
+        score = case((is_finalist, ranked.c.finals_score), else_=ranked.c.total_score)
+    else:
+        # ТУРНІРИ БЕЗ ФІНАЛІВ: всі учасники змагаються за місця по total_score
+        is_finalist = true()
+        score = ranked.c.total_score
+
+    return select(
+        ranked.c.participant_id,
+        func.row_number().over(
+            order_by=(
+                case((is_finalist, 0), else_=1).asc(),
+                score.desc(),
+                # best_placement - тайбрейк лише для фіналістів
+                case((is_finalist, ranked.c.best_placement), else_=0).asc(),
+                ranked.c.tiebreak.asc(),
+            )
+        ).label("final_position"),
+    ).subquery("standings")
+
+
 def update_final_positions(db: Session, tournament_id: int):
     """
     Update final positions based on scores with tiebreakers.
@@ -281,12 +287,16 @@ def update_final_positions(db: Session, tournament_id: int):
     Tiebreaker rules:
     1. Higher score wins (finals_score or total_score)
     2. If equal score, check best placement (lowest position number across all games)
-    3. If still tied, random 50/50 (coin flip)
+    3. If still tied, deterministic coin flip seeded by tournament.tiebreak_seed
+    
+    Standings are ranked by one window-function query and written with one
+    UPDATE ... FROM (no commit per participant). Returns {participant_id: final_position}.
     """
-    import random
-    import json
     import logging
+    from sqlalchemy import update
+    from sqlalchemy.orm.attributes import set_committed_value
     from models.tournament import Tournament
+    from services.tournament_cache import bump_tournament_version
     
     logger = logging.getLogger(__name__)
     
@@ -295,137 +305,34 @@ def update_final_positions(db: Session, tournament_id: int):
         if not tournament:
             from core.exceptions import TournamentException
             raise TournamentException("Tournament not found while updating final positions")
-
-        use_finals_score = tournament.with_finals and tournament.finals_started
-        
-        # Get all participants with their game results
-        participants = db.query(TournamentParticipant).filter(
-            TournamentParticipant.tournament_id == tournament_id
-        ).all()
         
-        # Separate finalists and non-finalists if tournament has finals
-        finalists = []
-        non_finalists = []
+        # Незбережені ORM-зміни (очки, фінальні ігри) мають потрапити в ranking
+        db.flush()
         
-        if use_finals_score:
-            # FINALS: беремо фактичних фіналістів з фінальних ігор (як у get_finals_leaderboard),
-            # щоб врахувати свапи та будь-які ручні заміни складу фіналу.
-            from models.tournament_round import TournamentRound
-            from models.tournament_game import TournamentGame
-            from models.game_participant import GameParticipant
-
-            regular_rounds = tournament.regular_rounds or tournament.total_rounds
-
-            # Фінальні раунди (round_number > regular_rounds)
-            final_rounds = db.query(TournamentRound.id).filter(
-                TournamentRound.tournament_id == tournament_id,
-                TournamentRound.round_number > regular_rounds
-            ).all()
-
-            if final_rounds:
-                final_round_ids = [r[0] for r in final_rounds]
-
-                # Фінальні ігри
-                final_games = db.query(TournamentGame.id).filter(
-                    TournamentGame.tournament_id == tournament_id,
-                    TournamentGame.round_id.in_(final_round_ids)
-                ).all()
-
-                if final_games:
-                    final_game_ids = [g[0] for g in final_games]
-
-                    # ID фіналістів з фінальних ігор
-                    finalist_rows = db.query(GameParticipant.participant_id).filter(
-                        GameParticipant.game_id.in_(final_game_ids)
-                    ).distinct().all()
-
-                    finalist_ids = {row[0] for row in finalist_rows}
-
-                    # Розбиваємо всіх учасників на фіналістів і не-фіналістів
-                    for p in participants:
-                        if p.id in finalist_ids:
-                            finalists.append(p)
-                        else:
-                            non_finalists.append(p)
-                else:
-                    # fallback: якщо чомусь немає фінальних ігор, поводимось як раніше (top-N за total_score)
-                    sorted_by_total = sorted(participants, key=lambda p: -p.total_score)
-                    finals_count = tournament.finals_participants_count or len(sorted_by_total)
-                    finalists = sorted_by_total[:finals_count]
-                    non_finalists = sorted_by_total[finals_count:]
-            else:
-                # fallback: якщо немає фінальних раундів
-                sorted_by_total = sorted(participants, key=lambda p: -p.total_score)
-                finals_count = tournament.finals_participants_count or len(sorted_by_total)
-                finalists = sorted_by_total[:finals_count]
-                non_finalists = sorted_by_total[finals_count:]
-        else:
-            # ТУРНІРИ БЕЗ ФІНАЛІВ: всі учасники змагаються за місця по total_score
-            finalists = participants
-        
-        # Calculate best placement for finalists
-        finalist_data = []
-        from models.game_participant import GameParticipant
-        for participant in finalists:
-            game_results = db.query(GameParticipant).filter(
-                GameParticipant.participant_id == participant.id
-            ).all()
-            
-            best_placement = float('inf')
-            for game_result in game_results:
-                if game_result.positions:
-                    try:
-                        positions = json.loads(game_result.positions)
-                        if positions:
-                            min_position = min(positions)
-                            best_placement = min(best_placement, min_position)
-                    except (json.JSONDecodeError, ValueError):
-                        pass
-            
-            if best_placement == float('inf'):
-                best_placement = 999
-            
-            # Use finals_score for finals, total_score otherwise
-            score = participant.finals_score if use_finals_score else participant.total_score
-            
-            finalist_data.append({
-                'participant': participant,
-                'score': score,
-                'best_placement': best_placement,
-                'random_tiebreaker': random.random()
-            })
-        
-        # Sort finalists by: score DESC, best_placement ASC, random_tiebreaker ASC
-        finalist_data.sort(
-            key=lambda x: (-x['score'], x['best_placement'], x['random_tiebreaker'])
+        standings = _final_standings_query(tournament)
+        stmt = (
+            update(TournamentParticipant)
+            .where(TournamentParticipant.id == standings.c.participant_id)
+            .values(final_position=standings.c.final_position)
+            .returning(TournamentParticipant.id, TournamentParticipant.final_position)
+            .execution_options(synchronize_session=False)
         )
+        positions = {row[0]: row[1] for row in db.execute(stmt)}
         
-        # Assign final positions to finalists (1, 2, 3, ... N)
-        for position, data in enumerate(finalist_data, 1):
-            data['participant'].final_position = position
+        # UPDATE в обхід ORM не тригерить after_flush - версію турніру піднімаємо явно
+        if positions:
+            bump_tournament_version(db, tournament_id)
         
-        # For non-finalists, assign positions after finalists (N+1, N+2, ...)
-        if non_finalists:
-            non_finalist_data = []
-            for participant in non_finalists:
-                non_finalist_data.append({
-                    'participant': participant,
-                    'total_score': participant.total_score,
-                    'random_tiebreaker': random.random()
-                })
-            
-            non_finalist_data.sort(
-                key=lambda x: (-x['total_score'], x['random_tiebreaker'])
-            )
-            
-            start_position = len(finalists) + 1
-            for position, data in enumerate(non_finalist_data, start_position):
-                data['participant'].final_position = position
+        # Синхронізуємо вже завантажені об'єкти
+        # (PK беремо з identity key: звернення до obj.id перезавантажило б expired об'єкт)
+        for key, obj in list(db.identity_map.items()):
+            if isinstance(obj, TournamentParticipant) and key[1][0] in positions:
+                set_committed_value(obj, "final_position", positions[key[1][0]])
         
         db.commit()
-        return [data['participant'] for data in finalist_data]
+        return positions
     except Exception as e:
         # Логування і прокидування як TournamentException, щоб не було 500 без пояснення
         logger.error(f"update_final_positions error for tournament {tournament_id}: {e}")
         from core.exceptions import TournamentException
-        raise TournamentException(f"Failed to update final positions: {e}")
\ No newline at end of file
+        raise TournamentException(f"Failed to update final positions: {e}")
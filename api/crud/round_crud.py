@@ -1,8 +1,10 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from sqlalchemy import func, insert
+from typing import List, Optional, Sequence
+from datetime import datetime, timezone
 from models.tournament_round import TournamentRound, RoundStatus
 from models.tournament_game import TournamentGame, GameStatus
+from models.game_participant import GameParticipant
 from schemas.tournament import TournamentRoundCreate
 
 
@@ -32,7 +34,7 @@ def get_current_round(db: Session, tournament_id: int):
     ).first()
 
 
-def start_round(db: Session, round_id: int):
+def start_round(db: Session, round_id: int, commit: bool = True):
     """Start a tournament round"""
     db_round = db.query(TournamentRound).filter(TournamentRound.id == round_id).first()
     if not db_round:
@@ -47,13 +49,14 @@ def start_round(db: Session, round_id: int):
         game.status = GameStatus.ACTIVE
         game.started_at = func.now()
     
-    db.commit()
-    db.refresh(db_round)
+    if commit:
+        db.commit()
+        db.refresh(db_round)
     return db_round
 
 
-def complete_round(db: Session, round_id: int):
-    """Complete a tournament round"""
+def complete_round(db: Session, round_id: int, commit: bool = True):
+    """Complete a tournament round (commit=False - у транзакції викликача)"""
     db_round = db.query(TournamentRound).filter(TournamentRound.id == round_id).first()
     if not db_round:
         return None
@@ -68,32 +71,82 @@ def complete_round(db: Session, round_id: int):
             game.status = GameStatus.COMPLETED
             game.finished_at = func.now()
     
-    db.commit()
-    db.refresh(db_round)
+    if commit:
+        db.commit()
+        db.refresh(db_round)
     return db_round
 
 
+def build_round(
+    db: Session,
+    tournament_id: int,
+    round_number: int,
+    plan: Sequence[Sequence[int]],
+    games_count: Optional[int] = None,
+    start: bool = True,
+    commit: bool = True
+) -> TournamentRound:
+    """
+    Створити раунд за готовим планом розсадки однією транзакцією.
+
+    plan[i] - participant_id гравців гри i+1. Раунд, ігри (multi-row INSERT ... RETURNING)
+    та учасники ігор вставляються пакетно; при start=True раунд та ігри одразу ACTIVE.
+    games_count - кількість ігор, якщо потрібні й порожні лоббі (за замовчуванням len(plan)).
+    commit=False залишає commit викликачу (наприклад, після призначення lobby maker-ів).
+    """
+    from services.tournament_cache import bump_tournament_version
+
+    games_count = max(games_count or 0, len(plan))
+    started_at = datetime.now(timezone.utc) if start else None
+    status = RoundStatus.ACTIVE if start else RoundStatus.PENDING
+    game_status = GameStatus.ACTIVE if start else GameStatus.PENDING
+
+    round_id = db.execute(
+        insert(TournamentRound).returning(TournamentRound.id),
+        [{
+            "tournament_id": tournament_id,
+            "round_number": round_number,
+            "status": status,
+            "started_at": started_at,
+        }]
+    ).scalar_one()
+
+    game_ids = []
+    if games_count:
+        game_ids = db.execute(
+            insert(TournamentGame).returning(TournamentGame.id, sort_by_parameter_order=True),
+            [
+                {
+                    "tournament_id": tournament_id,
+                    "round_id": round_id,
+                    "game_number": game_number,
+                    "status": game_status,
+                    "started_at": started_at,
+                }
+                for game_number in range(1, games_count + 1)
+            ]
+        ).scalars().all()
+
+    game_participants = [
+        {"game_id": game_id, "participant_id": participant_id, "is_lobby_maker": False}
+        for game_id, participant_ids in zip(game_ids, plan)
+        for participant_id in participant_ids
+    ]
+    if game_participants:
+        db.execute(insert(GameParticipant), game_participants)
+
+    # Core/bulk INSERT не проходить через after_flush - версію турніру піднімаємо явно
+    bump_tournament_version(db, tournament_id)
+
+    if commit:
+        db.commit()
+    return db.get(TournamentRound, round_id)
+
+
 def create_round_with_games(db: Session, tournament_id: int, round_number: int, total_participants: int):
-    """Create a round with appropriate number of games"""
-    # Create the round
-    round_data = TournamentRoundCreate(
-        tournament_id=tournament_id,
-        round_number=round_number
+    """Create a round with appropriate number of games (8 players per game, no participants yet)"""
+    return build_round(
+        db, tournament_id, round_number, [],
+        games_count=total_participants // 8,
+        start=False
     )
-    db_round = create_tournament_round(db, round_data)
-    
-    # Calculate number of games needed (8 players per game)
-    num_games = total_participants // 8
-    
-    # Create games for this round
-    for game_number in range(1, num_games + 1):
-        game = TournamentGame(
-            tournament_id=tournament_id,
-            round_id=db_round.id,
-            game_number=game_number
-        )
-        db.add(game)
-    
-    db.commit()
-    db.refresh(db_round)
-    return db_round
\ No newline at end of file
@@ -10,45 +10,13 @@ def _calculate_finalist_status(db: Session, tournament: Tournament) -> Tuple[set
     Calculate original finalist IDs and actual finalist IDs for a tournament.
     Returns: (original_finalist_ids, actual_finalist_ids)
     """
-    original_finalist_ids = set()
-    actual_finalist_ids = set()
-    
-    if tournament.with_finals and tournament.finals_started:
-        # Original finalists = top-N by total_score (before any swaps)
-        finals_count = tournament.finals_participants_count or 8
-        all_participants_sorted = sorted(
-            tournament.participants,
-            key=lambda p: p.total_score or 0,
-            reverse=True
-        )
-        original_finalist_ids = {p.id for p in all_participants_sorted[:finals_count]}
-        
-        # Actual finalists = those who actually play in final games (after swaps)
-        from models.tournament_round import TournamentRound
-        from models.tournament_game import TournamentGame
-        from models.game_participant import GameParticipant
-        
-        regular_rounds = tournament.regular_rounds or tournament.total_rounds
-        final_rounds = db.query(TournamentRound).filter(
-            TournamentRound.tournament_id == tournament.id,
-            TournamentRound.round_number > regular_rounds
-        ).all()
-        
-        if final_rounds:
-            final_round_ids = [r.id for r in final_rounds]
-            final_games = db.query(TournamentGame).filter(
-                TournamentGame.tournament_id == tournament.id,
-                TournamentGame.round_id.in_(final_round_ids)
-            ).all()
-            
-            if final_games:
-                final_game_ids = [g.id for g in final_games]
-                finalist_rows = db.query(GameParticipant.participant_id).filter(
-                    GameParticipant.game_id.in_(final_game_ids)
-                ).distinct().all()
-                actual_finalist_ids = {row[0] for row in finalist_rows}
-    
-    return original_finalist_ids, actual_finalist_ids
+    if not (tournament.with_finals and tournament.finals_started):
+        return set(), set()
+    
+    # Original = top-N by total_score, actual = players of final games (after swaps)
+    from services.finalists import get_finalist_sets
+    finalist_sets = get_finalist_sets(db, tournament)
+    return set(finalist_sets.original), set(finalist_sets.actual)
 
 
 def create_tournament(db: Session, tournament: TournamentCreate, creator_id: int):
@@ -166,14 +134,169 @@ def get_tournament(db: Session, tournament_id: int):
     return tournament
 
 
-def get_tournaments(db: Session, skip: int = 0, limit: int = 100, status: List[TournamentStatus] = None):
-    from sqlalchemy.orm import joinedload
-    from sqlalchemy import case
+def encode_tournament_cursor(tournament: Tournament) -> str:
+    """Keyset-курсор (start_date, created_at, id) для наступної сторінки списку"""
+    import base64
+    import json
     
-    query = db.query(Tournament).options(
-        joinedload(Tournament.creator),
-        joinedload(Tournament.participants).joinedload(TournamentParticipant.user)
-    ).filter(Tournament.is_deleted == False)
+    payload = [
+        tournament.start_date.isoformat() if tournament.start_date else None,
+        tournament.created_at.isoformat() if tournament.created_at else None,
+        tournament.id
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_tournament_cursor(cursor: str) -> Tuple[Optional["datetime"], Optional["datetime"], int]:
+    """Розібрати курсор; ValueError якщо курсор пошкоджений"""
+    import base64
+    import json
+    from datetime import datetime
+    
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        start_date, created_at, tournament_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (
+            datetime.fromisoformat(start_date) if start_date else None,
+            datetime.fromisoformat(created_at) if created_at else None,
+            int(tournament_id)
+        )
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _after_cursor(cursor: str):
+    """
+    Умова "після курсора" для сортування
+    (start_date IS NULL) ASC, start_date ASC, created_at DESC, id DESC.
+    """
+    from sqlalchemy import and_, or_
+    
+    start_date, created_at, tournament_id = decode_tournament_cursor(cursor)
+    
+    same_start_tail = or_(
+        Tournament.created_at < created_at,
+        and_(Tournament.created_at == created_at, Tournament.id < tournament_id)
+    ) if created_at is not None else Tournament.id < tournament_id
+    
+    if start_date is None:
+        return and_(Tournament.start_date.is_(None), same_start_tail)
+    
+    return or_(
+        Tournament.start_date.is_(None),
+        Tournament.start_date > start_date,
+        and_(Tournament.start_date == start_date, same_start_tail)
+    )
+
+
+def _populate_winners(db: Session, tournaments: List[Tournament]):
+    """
+    Top-3 для завершених турнірів сторінки одним запитом (ROW_NUMBER по турніру),
+    без завантаження всіх учасників.
+    """
+    from sqlalchemy import select, func
+    from models.user import User
+    
+    finished = {t.id: t for t in tournaments if t.status == TournamentStatus.FINISHED}
+    for tournament in tournaments:
+        tournament.winners = []
+    if not finished:
+        return
+    
+    ranked = select(
+        TournamentParticipant.tournament_id,
+        TournamentParticipant.user_id,
+        TournamentParticipant.final_position,
+        TournamentParticipant.total_score,
+        TournamentParticipant.finals_score,
+        User.battletag,
+        func.row_number().over(
+            partition_by=TournamentParticipant.tournament_id,
+            order_by=(
+                func.coalesce(TournamentParticipant.final_position, 999),
+                TournamentParticipant.total_score.desc()
+            )
+        ).label("place")
+    ).join(
+        User, User.id == TournamentParticipant.user_id
+    ).where(
+        TournamentParticipant.tournament_id.in_(list(finished))
+    ).subquery()
+    
+    rows = db.execute(
+        select(ranked).where(ranked.c.place <= 3).order_by(ranked.c.tournament_id, ranked.c.place)
+    ).all()
+    
+    for row in rows:
+        tournament = finished[row.tournament_id]
+        # Use finals_score for tournaments with finals, total_score otherwise
+        use_finals = tournament.with_finals and tournament.finals_started
+        tournament.winners.append({
+            "user_id": row.user_id,
+            "battletag": row.battletag,
+            "final_position": row.final_position if row.final_position is not None else row.place,
+            "total_score": row.finals_score if use_finals else row.total_score
+        })
+
+
+def get_tournaments(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    status: List[TournamentStatus] = None,
+    viewer_id: Optional[int] = None,
+    cursor: Optional[str] = None
+):
+    """
+    Список турнірів без завантаження учасників:
+    - occupied_slots, creator_battletag та участь viewer_id - в одному запиті (агрегати/outer join);
+    - winners - другим запитом з ROW_NUMBER.
+    cursor - keyset-пагінація по (start_date, created_at, id) замість skip.
+    """
+    from sqlalchemy import case, select, func, exists, and_
+    from sqlalchemy.orm import aliased
+    from models.user import User
+    from models.tournament_round import TournamentRound
+    from models.tournament_game import TournamentGame
+    from models.game_participant import GameParticipant
+    
+    creator = aliased(User)
+    
+    occupied_slots = select(func.count(TournamentParticipant.id)).where(
+        TournamentParticipant.tournament_id == Tournament.id
+    ).correlate(Tournament).scalar_subquery()
+    
+    columns = [Tournament, occupied_slots.label("occupied_slots"), creator.battletag.label("creator_battletag")]
+    
+    my_participant = None
+    if viewer_id is not None:
+        my_participant = aliased(TournamentParticipant)
+        # Чи грав учасник viewer у фінальних раундах (після свапів)
+        in_finals = exists().where(
+            GameParticipant.participant_id == my_participant.id,
+            TournamentGame.id == GameParticipant.game_id,
+            TournamentRound.id == TournamentGame.round_id,
+            TournamentRound.round_number > func.coalesce(Tournament.regular_rounds, Tournament.total_rounds)
+        )
+        columns += [
+            my_participant.id.label("my_participant_id"),
+            my_participant.final_position.label("my_final_position"),
+            in_finals.label("my_in_finals")
+        ]
+    
+    query = db.query(*columns).outerjoin(
+        creator, creator.id == Tournament.creator_id
+    )
+    if my_participant is not None:
+        query = query.outerjoin(
+            my_participant,
+            and_(
+                my_participant.tournament_id == Tournament.id,
+                my_participant.user_id == viewer_id
+            )
+        )
+    
+    query = query.filter(Tournament.is_deleted == False)
     
     if status:
         # Convert to model Enums to ensure compatibility
@@ -189,50 +312,48 @@ def get_tournaments(db: Session, skip: int = 0, limit: int = 100, status: List[T
         
         if model_statuses:
             query = query.filter(Tournament.status.in_(model_statuses))
+    
+    if cursor:
+        query = query.filter(_after_cursor(cursor))
         
-    # Sort by start_date (nulls last), then by created_at
-    tournaments = query.order_by(
+    # Sort by start_date (nulls last), then by created_at; id makes the order stable for keyset pagination
+    query = query.order_by(
         case(
             (Tournament.start_date.is_(None), 1),
             else_=0
         ),
         Tournament.start_date.asc(),
-        Tournament.created_at.desc()
-    ).offset(skip).limit(limit).all()
+        Tournament.created_at.desc(),
+        Tournament.id.desc()
+    )
+    if not cursor:
+        query = query.offset(skip)
+    rows = query.limit(limit).all()
     
-    for tournament in tournaments:
-        tournament.occupied_slots = len(tournament.participants)
-        tournament.creator_battletag = tournament.creator.battletag if tournament.creator else None
+    tournaments = []
+    for row in rows:
+        tournament = row[0]
+        tournament.occupied_slots = row.occupied_slots
+        tournament.creator_battletag = row.creator_battletag
+        tournament.my_status = None
         
-        # Populate winners for finished tournaments
-        if tournament.status == TournamentStatus.FINISHED:
-            # Filter out participants with no user (should not happen but safe check)
-            valid_participants = [p for p in tournament.participants if p.user]
-            
-            # Sort by final_position (asc) then total_score (desc)
-            # If final_position is None (not finished properly), put at end
-            sorted_participants = sorted(
-                valid_participants,
-                key=lambda p: (p.final_position if p.final_position is not None else 999, -p.total_score)
-            )
-            
-            # Take top 3
-            top_3 = sorted_participants[:3]
-            
-            # Use finals_score for tournaments with finals, total_score otherwise
-            use_finals = tournament.with_finals and tournament.finals_started
-            
-            tournament.winners = [
-                {
-                    "user_id": p.user_id,
-                    "battletag": p.user.battletag,
-                    "final_position": p.final_position if p.final_position is not None else i+1,
-                    "total_score": p.finals_score if use_finals else p.total_score
-                }
-                for i, p in enumerate(top_3)
-            ]
-        else:
-            tournament.winners = []
+        if my_participant is not None and row.my_participant_id is not None:
+            if tournament.status == TournamentStatus.ACTIVE:
+                tournament.my_status = "playing"
+            elif tournament.status == TournamentStatus.FINISHED:
+                tournament.my_status = "finished"
+                # final_position already holds the finals place for finalists
+                # (update_final_positions ranks finalists 1..N by finals_score in SQL)
+                if row.my_final_position:
+                    tournament.my_result = row.my_final_position
+                if tournament.with_finals and tournament.finals_started:
+                    tournament.was_in_finals = bool(row.my_in_finals)
+            else:
+                tournament.my_status = "registered"
+        
+        tournaments.append(tournament)
+    
+    _populate_winners(db, tournaments)
         
     return tournaments
 
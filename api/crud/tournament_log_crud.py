@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from models.tournament_log import TournamentLog
 from models.user import User
 
@@ -48,3 +48,130 @@ def get_tournament_logs_count(db: Session, tournament_id: int) -> int:
     """Отримати загальну кількість логів для турніру"""
     return db.query(TournamentLog).filter(TournamentLog.tournament_id == tournament_id).count()
 
+
+
+def _combined_logs_query(tournament_id: int):
+    """
+    UNION ALL логів ігор турніру та логів самого турніру в єдиному форматі:
+    (type, id, game_id, user_battletag, user_role, action_type, action_description, created_at)
+    """
+    from sqlalchemy import select, literal, null, Integer, String
+    from models.game_log import GameLog
+    from models.tournament_game import TournamentGame
+    
+    game_logs = select(
+        literal("game", String).label("type"),
+        GameLog.id.label("id"),
+        GameLog.game_id.label("game_id"),
+        GameLog.user_battletag.label("user_battletag"),
+        GameLog.user_role.label("user_role"),
+        GameLog.action_type.label("action_type"),
+        GameLog.action_description.label("action_description"),
+        GameLog.created_at.label("created_at"),
+    ).join(
+        TournamentGame, GameLog.game_id == TournamentGame.id
+    ).where(TournamentGame.tournament_id == tournament_id)
+    
+    tournament_logs = select(
+        literal("tournament", String).label("type"),
+        TournamentLog.id.label("id"),
+        null().cast(Integer).label("game_id"),
+        TournamentLog.user_battletag.label("user_battletag"),
+        TournamentLog.user_role.label("user_role"),
+        TournamentLog.action_type.label("action_type"),
+        TournamentLog.action_description.label("action_description"),
+        TournamentLog.created_at.label("created_at"),
+    ).where(TournamentLog.tournament_id == tournament_id)
+    
+    return game_logs, tournament_logs
+
+
+def _before_cursor(column_created_at, column_id, branch_type: str, cursor: str):
+    """
+    Умова "після курсора" для однієї гілки при сортуванні
+    created_at DESC, type DESC, id DESC ("tournament" > "game").
+    """
+    from sqlalchemy import and_, or_
+    
+    created_at, log_type, log_id = decode_log_cursor(cursor)
+    if log_type == branch_type:
+        return or_(column_created_at < created_at, and_(column_created_at == created_at, column_id < log_id))
+    if branch_type == "game":
+        # Курсор на логу турніру: логи ігор з тим самим created_at ще попереду
+        return column_created_at <= created_at
+    return column_created_at < created_at
+
+
+def encode_log_cursor(log) -> str:
+    """Keyset-курсор (created_at, type, id) останнього рядка сторінки"""
+    import base64
+    import json
+    
+    payload = [log.created_at.isoformat(), log.type, log.id]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_log_cursor(cursor: str):
+    """Розібрати курсор; ValueError якщо курсор пошкоджений"""
+    import base64
+    import json
+    from datetime import datetime
+    
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, log_type, log_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if log_type not in ("game", "tournament"):
+            raise ValueError(log_type)
+        return datetime.fromisoformat(created_at), log_type, int(log_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def get_combined_tournament_logs(
+    db: Session,
+    tournament_id: int,
+    limit: int = 50,
+    skip: int = 0,
+    cursor: Optional[str] = None
+) -> List:
+    """
+    Логи ігор і турніру однією сторінкою, найновіші першими.
+    Сортування та LIMIT - у SQL: кожна гілка UNION ALL обмежується limit
+    (індекси (game_id, created_at) / (tournament_id, created_at)), потім
+    спільне сортування по (created_at, type, id).
+    cursor - keyset-пагінація замість skip.
+    """
+    from sqlalchemy import union_all
+    from models.game_log import GameLog
+    
+    game_logs, tournament_logs = _combined_logs_query(tournament_id)
+    
+    if cursor:
+        # type у ключі сортування: id двох таблиць можуть збігатися при однаковому created_at
+        game_logs = game_logs.where(_before_cursor(GameLog.created_at, GameLog.id, "game", cursor))
+        tournament_logs = tournament_logs.where(
+            _before_cursor(TournamentLog.created_at, TournamentLog.id, "tournament", cursor)
+        )
+    
+    per_branch = skip + limit
+    game_logs = game_logs.order_by(GameLog.created_at.desc(), GameLog.id.desc()).limit(per_branch)
+    tournament_logs = tournament_logs.order_by(TournamentLog.created_at.desc(), TournamentLog.id.desc()).limit(per_branch)
+    
+    combined = union_all(game_logs.subquery().select(), tournament_logs.subquery().select()).subquery()
+    query = combined.select().order_by(
+        combined.c.created_at.desc(), combined.c.type.desc(), combined.c.id.desc()
+    ).offset(0 if cursor else skip).limit(limit)
+    
+    return db.execute(query).all()
+
+
+def count_combined_tournament_logs(db: Session, tournament_id: int) -> int:
+    """Загальна кількість логів ігор і турніру (два COUNT по індексах)"""
+    from sqlalchemy import func
+    from models.game_log import GameLog
+    from models.tournament_game import TournamentGame
+    
+    game_count = db.query(func.count(GameLog.id)).join(
+        TournamentGame, GameLog.game_id == TournamentGame.id
+    ).filter(TournamentGame.tournament_id == tournament_id).scalar() or 0
+    return game_count + get_tournament_logs_count(db, tournament_id)
@@ -6,7 +6,8 @@ from sqlalchemy.orm import Session
 from typing import List
 from sqlalchemy.orm.attributes import flag_modified
 
-from core.auth import get_admin, get_super_admin, get_current_active_user
+from core.auth import get_admin, get_super_admin, get_current_active_user, get_current_db_user
+from core.identity import identity_cache
 from core.roles import UserRole
 from api.deps.db import get_db
 from models.user import User
@@ -89,7 +90,7 @@ async def get_all_users(
                 "battlegrounds_rating": user.battlegrounds_rating,
                 "role": user.role,
                 "is_active": user.is_active,
-                "last_seen": user.last_seen,
+                "last_seen": user.current_last_seen,
                 "is_online": user.is_online,
                 "created_at": user.created_at,
                 "updated_at": user.updated_at
@@ -138,6 +139,7 @@ async def update_user_role(
     
     user.role = role_update.role
     db.commit()
+    identity_cache.invalidate(user.id)
     db.refresh(user)
     return user
 
@@ -164,6 +166,7 @@ async def deactivate_user(
     
     user.is_active = False
     db.commit()
+    identity_cache.invalidate(user.id)
     return {"message": f"User {user.battletag} deactivated"}
 
 
@@ -227,7 +230,7 @@ async def get_admin_stats(
 @router.get("/favorite-lobby-makers")
 async def get_favorite_lobby_makers(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_db_user),
 ):
     """Return the logged‑in user's global favorite lobby makers list (ordered)."""
     fav = current_user.favorite_lobby_makers or []
@@ -247,7 +250,7 @@ async def get_favorite_lobby_makers(
 async def add_favorite_lobby_maker(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_db_user),
 ):
     """Add a user to the caller's favorite lobby makers (append to end)."""
     target = db.query(User).filter(User.id == user_id).first()
@@ -265,7 +268,7 @@ async def add_favorite_lobby_maker(
 async def delete_favorite_lobby_maker(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_db_user),
 ):
     """Remove a user from the caller's favorite lobby makers list."""
     fav = current_user.favorite_lobby_makers or []
@@ -280,7 +283,7 @@ async def delete_favorite_lobby_maker(
 async def reorder_favorite_lobby_makers(
     priority_list: List[int],
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_db_user),
 ):
     """Replace the whole ordering of favorite lobby makers.
     The list must contain exactly the same user IDs currently stored.
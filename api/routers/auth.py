@@ -7,7 +7,7 @@ from api.deps.db import get_db
 from api.crud.user import get_user_by_battlenet_id, create_user, update_user
 from schemas.auth import UserCreate, UserUpdate, Token, User as UserSchema
 from services.battlenet_service import battlenet_service
-from core.auth import create_access_token, get_current_active_user
+from core.auth import create_access_token, get_current_active_user, get_current_db_user
 from core.logging import logger
 
 router = APIRouter(prefix="/auth")
@@ -78,6 +78,9 @@ async def auth_callback(code: str, state: str = None, db: Session = Depends(get_
                         db_user.battlegrounds_rating = bg_rating
                         logger.info(f"Setting initial BG rating: {bg_rating}")
                     db.commit()
+                    # battletag міг змінитися - знімок у кеші ідентичності застарів
+                    from core.identity import identity_cache
+                    identity_cache.invalidate(db_user.id)
                     db.refresh(db_user)
                 break
             except Exception as db_error:
@@ -110,7 +113,7 @@ async def auth_callback(code: str, state: str = None, db: Session = Depends(get_
 
 
 @router.get("/me", response_model=UserSchema)
-async def get_current_user_info(current_user = Depends(get_current_active_user)):
+async def get_current_user_info(current_user = Depends(get_current_db_user)):
     """
     Get current authenticated user info.
     Додано просте логування для діагностики можливих проблем з токенами.
@@ -18,7 +18,7 @@ router = APIRouter(prefix="/games", tags=["Games"])
 
 
 @router.get("/{game_id}", response_model=TournamentGameWithParticipants)
-async def get_game_details(
+def get_game_details(
     game_id: int,
     db: Session = Depends(get_db)
 ):
@@ -30,7 +30,7 @@ async def get_game_details(
 
 
 @router.get("/round/{round_id}", response_model=List[TournamentGameWithParticipants])
-async def get_round_games_endpoint(
+def get_round_games_endpoint(
     round_id: int,
     db: Session = Depends(get_db)
 ):
@@ -213,8 +213,7 @@ async def clear_participant_result(
         old_positions = None
         old_points = None
         if game_participant:
-            import json
-            old_positions = json.loads(game_participant.positions) if game_participant.positions else None
+            old_positions = game_participant.positions_list or None
             old_points = game_participant.points
         
         games_service.clear_participant_result_logic(db, game_id, participant_id, game)
@@ -0,0 +1,35 @@
+"""
+Внутрішні метрики процесу (для адмінів / моніторингу)
+"""
+from fastapi import APIRouter, Depends
+
+from core.auth import get_admin
+from models.user import User
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+
+@router.get("/metrics")
+async def get_internal_metrics(current_user: User = Depends(get_admin)):
+    """Пул БД, WebSocket, черги сповіщень і журналу, presence, кеші турнірів, ідентичності та токенів, таймінги старту"""
+    from core.auth import token_cache
+    from core.db_pool import pool_metrics
+    from core.identity import identity_cache
+    from core.presence import presence_tracker
+    from core.startup import startup_timer
+    from services.audit_log import audit_log_writer
+    from services.notification_dispatcher import notification_dispatcher
+    from services.tournament_cache import tournament_cache
+    from services.websocket_manager import websocket_manager
+
+    return {
+        "db_pool": pool_metrics.get_metrics(),
+        "websocket": websocket_manager.get_metrics(),
+        "notifications": notification_dispatcher.get_metrics(),
+        "audit_log": audit_log_writer.get_metrics(),
+        "presence": presence_tracker.get_metrics(),
+        "tournament_cache": tournament_cache.get_metrics(),
+        "identity_cache": identity_cache.get_metrics(),
+        "token_cache": token_cache.get_metrics(),
+        "startup_ms": startup_timer.get_metrics(),
+    }
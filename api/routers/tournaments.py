@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
@@ -11,7 +12,7 @@ from core.validators import (
 from core.exceptions import TournamentException
 from api.crud.tournament_crud import (
     create_tournament, get_tournament, get_tournaments, get_user_tournaments,
-    update_tournament
+    update_tournament, encode_tournament_cursor
 )
 from api.crud.participant_crud import (
     join_tournament, leave_tournament, get_tournament_participants,
@@ -19,6 +20,7 @@ from api.crud.participant_crud import (
 )
 from api.crud.game_crud import move_participant_to_game
 from services.tournament_manager import TournamentManager
+from services.websocket_manager import websocket_manager
 from schemas.tournament import (
     Tournament, TournamentCreate, TournamentUpdate, TournamentWithParticipants,
     TournamentParticipant, LobbyMakerPriorityUpdate, TournamentStatus
@@ -41,73 +43,37 @@ async def create_new_tournament(
 
 
 @router.get("/", response_model=List[Tournament])
-async def list_tournaments(
+def list_tournaments(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: Optional[List[TournamentStatus]] = Query(None, description="Filter by tournament status"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor (replaces skip)"),
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """Get list of all tournaments"""
-    tournaments = get_tournaments(db, skip=skip, limit=limit, status=status)
+    try:
+        tournaments = get_tournaments(
+            db,
+            skip=skip,
+            limit=limit,
+            status=status,
+            viewer_id=current_user.id if current_user else None,
+            cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    # Add my_status for each tournament if user is authenticated
-    if current_user:
-        from models.tournament_participant import TournamentParticipant
-        from models.tournament import TournamentStatus as ModelTournamentStatus
-        
-        for tournament in tournaments:
-            participant = db.query(TournamentParticipant).filter(
-                TournamentParticipant.tournament_id == tournament.id,
-                TournamentParticipant.user_id == current_user.id
-            ).first()
-            
-            if participant:
-                if tournament.status == ModelTournamentStatus.REGISTRATION:
-                    tournament.my_status = "registered"
-                elif tournament.status == ModelTournamentStatus.ACTIVE:
-                    tournament.my_status = "playing"
-                elif tournament.status == ModelTournamentStatus.FINISHED:
-                    tournament.my_status = "finished"
-                    
-                    # Check if tournament had finals and user participated in them
-                    if tournament.with_finals and tournament.finals_started:
-                        # Check if user was in finals (top N by total_score)
-                        top_participants = db.query(TournamentParticipant).filter(
-                            TournamentParticipant.tournament_id == tournament.id
-                        ).order_by(TournamentParticipant.total_score.desc()).limit(tournament.finals_participants_count).all()
-                        
-                        top_user_ids = [p.user_id for p in top_participants]
-                        if current_user.id in top_user_ids:
-                            # User was in finals - show finals position
-                            finalists_sorted = sorted(top_participants, key=lambda p: -p.finals_score)
-                            for i, p in enumerate(finalists_sorted, 1):
-                                if p.user_id == current_user.id:
-                                    tournament.my_result = i
-                                    tournament.was_in_finals = True
-                                    break
-                        else:
-                            # User was NOT in finals - show regular position
-                            if participant.final_position:
-                                tournament.my_result = participant.final_position
-                            tournament.was_in_finals = False
-                    else:
-                        # No finals - show regular position
-                        if participant.final_position:
-                            tournament.my_result = participant.final_position
-                else:
-                    tournament.my_status = "registered"
-            else:
-                tournament.my_status = None
-    else:
-        for tournament in tournaments:
-            tournament.my_status = None
+    # Повна сторінка - віддаємо курсор на наступну
+    if tournaments and len(tournaments) == limit:
+        response.headers["X-Next-Cursor"] = encode_tournament_cursor(tournaments[-1])
     
     return tournaments
 
 
 @router.get("/my", response_model=List[Tournament])
-async def get_my_tournaments(
+def get_my_tournaments(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -115,84 +81,37 @@ async def get_my_tournaments(
     return get_user_tournaments(db, current_user.id)
 
 
-@router.get("/{tournament_id}", response_model=TournamentWithParticipants)
-async def get_tournament_details(
-    tournament_id: int,
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional)
-):
-    """Get tournament details with participants"""
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Перевірити If-None-Match (може містити кілька ETag через кому або *)"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _viewer_etag(prefix: str, version: int, current_user: Optional[User]) -> str:
+    """ETag залежить від версії турніру та від того, хто дивиться (редакція полів)"""
+    if current_user:
+        role = current_user.role.value if hasattr(current_user.role, "value") else current_user.role
+        return f'W/"{prefix}-v{version}-u{current_user.id}-{role}"'
+    return f'W/"{prefix}-v{version}-anon"'
+
+
+def _build_tournament_detail(db: Session, tournament_id: int) -> Optional[dict]:
+    """
+    Деталі турніру без персональної редакції (для кешу).
+    get_tournament вже заповнює battletag/name та статус фіналістів.
+    """
     tournament = get_tournament(db, tournament_id)
     if not tournament:
-        raise HTTPException(status_code=404, detail="Tournament not found")
-    
-    # Check if user has access to sensitive data
-    has_full_access = False
-    import logging
-    logger = logging.getLogger(__name__)
+        return None
     
-    if current_user:
-        # Порівнюємо enum значення правильно
-        is_admin = current_user.role == UserRole.ADMIN or current_user.role == UserRole.SUPER_ADMIN
-        is_creator = tournament.creator_id == current_user.id
-        has_full_access = is_admin or is_creator
-        # Логування для діагностики
-        logger.info(f"get_tournament_details: current_user_id={current_user.id}, current_user_role={current_user.role}, current_user_role_value={current_user.role.value if hasattr(current_user.role, 'value') else current_user.role}, tournament_creator_id={tournament.creator_id}, is_admin={is_admin}, is_creator={is_creator}, has_full_access={has_full_access}")
-    else:
-        logger.info(f"get_tournament_details: current_user is None (no token or invalid token)")
-        
-    # Calculate finalist status (already done in get_tournament, but ensure it's set)
-    from api.crud.tournament_crud import _calculate_finalist_status
-    original_finalist_ids, actual_finalist_ids = _calculate_finalist_status(db, tournament)
-        
-    # Populate participant details
     for participant in tournament.participants:
-        # Перевіряємо, чи user завантажений
-        if not participant.user:
-            # Якщо user не завантажений, завантажуємо його
-            from models.user import User as UserModel
-            participant.user = db.query(UserModel).filter(UserModel.id == participant.user_id).first()
-        
-        if participant.user:
-            # Always set public info
-            participant.battletag = participant.user.battletag
-            participant.name = participant.user.name
-            
-            # Mark finalist status (only for tournaments with finals)
-            if tournament.with_finals and tournament.finals_started:
-                participant.was_original_finalist = participant.id in original_finalist_ids
-                participant.is_swapped_finalist = (
-                    participant.id in actual_finalist_ids and
-                    participant.id not in original_finalist_ids
-                )
-                participant.plays_in_finals = participant.id in actual_finalist_ids
-            else:
-                participant.was_original_finalist = False
-                participant.is_swapped_finalist = False
-                participant.plays_in_finals = False
-            
-            # Set sensitive data (phone, telegram, rating)
-            # Show for admin/creator (full access) or for user's own participant
-            is_own_participant = current_user and participant.user_id == current_user.id
-            if has_full_access or is_own_participant:
-                participant.phone = participant.user.phone
-                participant.telegram = participant.user.telegram
-                participant.battlegrounds_rating = participant.user.battlegrounds_rating
-                # Логування для діагностики
-                logger.info(f"get_tournament_details: participant_id={participant.id}, user_id={participant.user_id}, phone={participant.user.phone}, telegram={participant.user.telegram}, has_full_access={has_full_access}, is_own_participant={is_own_participant}")
-            else:
-                # Explicitly set to None if no access (for security)
-                participant.phone = None
-                participant.telegram = None
-                participant.battlegrounds_rating = None
-                logger.info(f"get_tournament_details: participant_id={participant.id}, user_id={participant.user_id}, NO ACCESS - phone/telegram set to None, has_full_access={has_full_access}, is_own_participant={is_own_participant}")
-        else:
-            # Якщо user не знайдено, встановлюємо всі поля в None
-            participant.battletag = None
-            participant.name = None
-            participant.phone = None
-            participant.telegram = None
-            participant.battlegrounds_rating = None
+        user = participant.user
+        participant.phone = user.phone if user else None
+        participant.telegram = user.telegram if user else None
+        participant.battlegrounds_rating = user.battlegrounds_rating if user else None
     
     # Add finals participants if finals started
     if tournament.with_finals and tournament.finals_started:
@@ -201,6 +120,9 @@ async def get_tournament_details(
         for p in finals_participants:
             p.battletag = p.user.battletag if p.user else None
             p.name = p.user.name if p.user else None
+            p.phone = p.user.phone if p.user else None
+            p.telegram = p.user.telegram if p.user else None
+            p.battlegrounds_rating = p.user.battlegrounds_rating if p.user else None
         tournament.finals = finals_participants
     else:
         tournament.finals = None
@@ -211,8 +133,55 @@ async def get_tournament_details(
         "final_rounds": tournament.finals_games_count if tournament.with_finals else 0,
         "finals_participants": tournament.finals_participants_count if tournament.with_finals else 0
     }
-            
-    return tournament
+    
+    return TournamentWithParticipants.model_validate(tournament).model_dump(mode="json")
+
+
+@router.get("/{tournament_id}", response_model=TournamentWithParticipants)
+def get_tournament_details(
+    tournament_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """Get tournament details with participants"""
+    from services.tournament_cache import tournament_cache, get_tournament_version, redact_participant
+    
+    version = get_tournament_version(db, tournament_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    
+    etag = _viewer_etag(f"t{tournament_id}", version, current_user)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    cache_key = ("detail", tournament_id, version)
+    payload = tournament_cache.get(cache_key)
+    if payload is None:
+        payload = _build_tournament_detail(db, tournament_id)
+        if payload is None:
+            raise HTTPException(status_code=404, detail="Tournament not found")
+        tournament_cache.set(cache_key, payload)
+    
+    # Sensitive data (phone, telegram, rating): admin/creator (full access) or user's own participant
+    has_full_access = False
+    viewer_id = None
+    if current_user:
+        viewer_id = current_user.id
+        is_admin = current_user.role == UserRole.ADMIN or current_user.role == UserRole.SUPER_ADMIN
+        is_creator = payload["creator_id"] == current_user.id
+        has_full_access = is_admin or is_creator
+    
+    content = dict(payload)
+    content["participants"] = [
+        redact_participant(p, viewer_id, has_full_access) for p in payload["participants"]
+    ]
+    if payload.get("finals") is not None:
+        content["finals"] = [
+            redact_participant(p, viewer_id, has_full_access) for p in payload["finals"]
+        ]
+    
+    return JSONResponse(content=content, headers={"ETag": etag})
 
 
 @router.put("/{tournament_id}", response_model=Tournament)
@@ -261,6 +230,8 @@ async def delete_tournament_endpoint(
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete tournament")
     
+    websocket_manager.remove_tournament(tournament_id)
+    
     return {"message": "Tournament deleted successfully"}
 
 
@@ -325,6 +296,8 @@ async def join_tournament_endpoint(
             from core.exceptions import AlreadyJoined
             raise AlreadyJoined()
         
+        websocket_manager.add_tournament_member(tournament_id, current_user.id)
+        
         # Log the action
         from services.tournament_manager import log_tournament_action
         log_tournament_action(
@@ -361,6 +334,8 @@ async def leave_tournament_endpoint(
     if not success:
         raise HTTPException(status_code=400, detail="Not participating in this tournament")
     
+    websocket_manager.remove_tournament_member(tournament_id, current_user.id)
+    
     # Log the action
     from services.tournament_manager import log_tournament_action
     log_tournament_action(
@@ -422,6 +397,9 @@ async def auto_fill_tournament(
     
     db.commit()
     
+    for user in available_users:
+        websocket_manager.add_tournament_member(tournament_id, user.id)
+    
     return {
         "message": f"Added {added} participants",
         "added": added,
@@ -431,7 +409,7 @@ async def auto_fill_tournament(
 
 
 @router.get("/{tournament_id}/participants", response_model=List[TournamentParticipant])
-async def get_tournament_participants_endpoint(
+def get_tournament_participants_endpoint(
     tournament_id: int,
     db: Session = Depends(get_db)
 ):
@@ -609,11 +587,8 @@ async def swap_finalist_endpoint(
         raise HTTPException(status_code=404, detail="Participants must belong to this tournament")
 
     # Перевірка, що from_participant зараз у фіналі (фактично грає у фінальних іграх)
-    final_game_ids = [g.id for g in final_games]
-    actual_finalist_rows = db.query(GameParticipant.participant_id).filter(
-        GameParticipant.game_id.in_(final_game_ids)
-    ).distinct().all()
-    actual_finalist_ids = {row[0] for row in actual_finalist_rows}
+    from services.finalists import get_finalist_sets
+    actual_finalist_ids = get_finalist_sets(db, tournament).actual
 
     if from_id not in actual_finalist_ids:
         raise HTTPException(status_code=400, detail="from_participant is not in finals")
@@ -741,7 +716,6 @@ async def swap_participant_endpoint(
     # Якщо турнір активний, перевіряємо, що в іграх цього конкретного учасника немає результатів
     if tournament.status == ModelTournamentStatus.ACTIVE and first_round:
         # Перевіряємо тільки GameParticipant для цього конкретного учасника в першому раунді
-        import json
         participant_game_results = db.query(GameParticipant).join(TournamentGame).filter(
             GameParticipant.participant_id == from_participant.id,
             TournamentGame.tournament_id == tournament_id,
@@ -763,23 +737,12 @@ async def swap_participant_endpoint(
                     detail="Cannot swap participant: this participant already has results in the first round"
                 )
             
-            # Перевіряємо positions (має бути None або порожній JSON масив "[]")
-            if gp.positions is not None and gp.positions.strip():
-                try:
-                    positions = json.loads(gp.positions)
-                    # Якщо positions - це не порожній список, значить є результати
-                    if isinstance(positions, list) and len(positions) > 0:
-                        raise HTTPException(
-                            status_code=400,
-                            detail="Cannot swap participant: this participant already has results in the first round"
-                        )
-                except (json.JSONDecodeError, ValueError, TypeError):
-                    # Якщо не вдалося розпарсити як JSON, але positions не порожній - вважаємо, що є результати
-                    if gp.positions.strip() not in ['[]', 'null', '']:
-                        raise HTTPException(
-                            status_code=400,
-                            detail="Cannot swap participant: this participant already has results in the first round"
-                        )
+            # Перевіряємо positions (маска позицій має бути порожня)
+            if gp.position_mask is not None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Cannot swap participant: this participant already has results in the first round"
+                )
 
     # Перевірка, що to_user_id не є учасником турніру
     to_participant_existing = db.query(TPModel).filter(
@@ -805,6 +768,9 @@ async def swap_participant_endpoint(
     # Замінюємо user_id у TournamentParticipant
     from_participant.user_id = to_user_id
     db.commit()
+    
+    websocket_manager.remove_tournament_member(tournament_id, from_user_id)
+    websocket_manager.add_tournament_member(tournament_id, to_user_id)
 
     # Якщо турнір активний (перший раунд вже створений), participant_id залишається той самий
     # бо ми змінили user_id у TournamentParticipant, тому GameParticipant автоматично
@@ -908,6 +874,8 @@ async def add_participant_simple(
             from core.exceptions import AlreadyJoined
             raise AlreadyJoined()
         
+        websocket_manager.add_tournament_member(tournament_id, user_id)
+        
         return participant
     except TournamentException:
         raise
@@ -937,6 +905,8 @@ async def add_participant_manually(
             from core.exceptions import AlreadyJoined
             raise AlreadyJoined()
         
+        websocket_manager.add_tournament_member(tournament_id, request.user_id)
+        
         return participant
     except TournamentException:
         raise
@@ -964,6 +934,8 @@ async def remove_participant_manually(
     if not success:
         raise HTTPException(status_code=400, detail="User not participating in this tournament")
     
+    websocket_manager.remove_tournament_member(tournament_id, user_id)
+    
     return {"message": "Participant removed successfully"}
 
 
@@ -1022,8 +994,13 @@ async def start_tournament_endpoint(
         
         # Send WebSocket notification
         from services.notification_service import notify_tournament_started
-        import asyncio
-        asyncio.create_task(notify_tournament_started(tournament_id, updated_tournament.current_round))
+        from services.games_service import send_websocket_notification_async
+        send_websocket_notification_async(
+            notify_tournament_started,
+            tournament_id=tournament_id,
+            current_round=updated_tournament.current_round,
+            tournament_name=tournament.name
+        )
         
         return {
             "message": "Tournament started successfully",
@@ -1073,7 +1050,7 @@ async def create_next_round_endpoint(
             round_number=next_round.round_number,
             is_final=is_final,
             final_round_number=final_round_number,
-            db=None
+            tournament_name=tournament.name
         )
         
         return {
@@ -1097,8 +1074,6 @@ async def start_finals_endpoint(
     """Start finals for a tournament (only creator can start)"""
     from models.tournament import Tournament as TournamentModel
     from models.tournament_participant import TournamentParticipant
-    from api.crud.round_crud import create_round_with_games, start_round
-    from models.game_participant import GameParticipant
     from api.crud.game_crud import get_round_games
     
     tournament = validate_tournament_exists(db, tournament_id)
@@ -1149,7 +1124,7 @@ async def start_finals_endpoint(
     
     # Complete last round if not already completed
     if last_round.status != RoundStatus.COMPLETED:
-        complete_round(db, last_round.id)
+        complete_round(db, last_round.id, commit=False)
     
     # Get top N participants by total_score
     top_participants = db.query(TournamentParticipant).filter(
@@ -1166,41 +1141,26 @@ async def start_finals_endpoint(
     tournament.total_rounds = tournament.regular_rounds + tournament.finals_games_count
     tournament.finals_started = True
     
-    # Create first final round
-    first_final_round_number = tournament.regular_rounds + 1
-    new_round = create_round_with_games(
-        db, 
-        tournament_id, 
-        first_final_round_number, 
-        tournament.finals_participants_count
-    )
-    
-    # Assign only top participants to games
-    games = get_round_games(db, new_round.id)
-    participants_per_game = 8
-    
-    for i, participant in enumerate(top_participants):
-        game_index = i // participants_per_game
-        if game_index < len(games):
-            game_participant = GameParticipant(
-                game_id=games[game_index].id,
-                participant_id=participant.id
-            )
-            db.add(game_participant)
-    
-    db.flush()
-    
-    # Assign lobby makers
+    # Create first final round with only top participants (one transaction with the checks above)
     from services.tournament_strategies import SwissStrategy
+    first_final_round_number = tournament.regular_rounds + 1
+    games_count = tournament.finals_participants_count // 8
     strategy = SwissStrategy()
-    strategy._assign_lobby_makers(db, new_round, tournament)
-    
-    # Start the round
-    start_round(db, new_round.id)
+    strategy._build_round(
+        db,
+        tournament,
+        first_final_round_number,
+        strategy._plan_by_score(top_participants, games_count),
+        games_count
+    )
     
     # Update current round
     tournament.current_round = first_final_round_number
     
+    # Дані для сповіщень - до commit, поки об'єкти не expired
+    tournament_name = tournament.name
+    finalist_user_ids = [p.user_id for p in top_participants]
+    
     db.commit()
     
     # Log the action
@@ -1222,7 +1182,7 @@ async def start_finals_endpoint(
         round_number=first_final_round_number,
         is_final=True,
         final_round_number=1,  # First final round
-        db=None
+        tournament_name=tournament_name
     )
     
     # Also send finals_started notification to finalists only
@@ -1231,8 +1191,8 @@ async def start_finals_endpoint(
         notify_finals_started,
         tournament_id=tournament_id,
         current_round=first_final_round_number,
-        finalists_count=len(top_participants),
-        db=None
+        finalist_user_ids=finalist_user_ids,
+        tournament_name=tournament_name
     )
     
     return {
@@ -1273,7 +1233,7 @@ async def finish_tournament_endpoint(
         send_websocket_notification_async(
             notify_tournament_finished,
             tournament_id=tournament_id,
-            db=None
+            tournament_name=tournament.name
         )
         
         return {
@@ -1289,120 +1249,75 @@ async def finish_tournament_endpoint(
 
 
 @router.get("/{tournament_id}/logs")
-async def get_tournament_logs(
+def get_tournament_logs(
     tournament_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="Keyset cursor from X-Next-Cursor / next_cursor (replaces skip)"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get all logs for tournament (participants can view)"""
+    from sqlalchemy import exists
     from core.roles import UserRole
-    from models.tournament_round import TournamentRound
-    from models.tournament_game import TournamentGame
-    from api.crud.game_log_crud import get_game_logs, get_game_logs_count
+    from models.tournament import Tournament as TournamentModel
     from models.tournament_participant import TournamentParticipant
+    from api.crud.tournament_log_crud import (
+        get_combined_tournament_logs, count_combined_tournament_logs, encode_log_cursor
+    )
     
-    tournament = get_tournament(db, tournament_id)
-    if not tournament:
+    # Один запит: creator_id та чи є поточний користувач учасником
+    access = db.query(
+        TournamentModel.creator_id,
+        exists().where(
+            TournamentParticipant.tournament_id == TournamentModel.id,
+            TournamentParticipant.user_id == current_user.id
+        )
+    ).filter(
+        TournamentModel.id == tournament_id,
+        TournamentModel.is_deleted == False
+    ).first()
+    if not access:
         raise HTTPException(status_code=404, detail="Tournament not found")
     
     # Check permissions: admin, super_admin, or tournament participant
+    creator_id, is_participant = access
     is_admin = current_user.role in [UserRole.ADMIN, UserRole.SUPER_ADMIN]
-    is_creator = tournament.creator_id == current_user.id
-    is_participant = db.query(TournamentParticipant).filter(
-        TournamentParticipant.tournament_id == tournament_id,
-        TournamentParticipant.user_id == current_user.id
-    ).first() is not None
+    is_creator = creator_id == current_user.id
     
     if not (is_admin or is_creator or is_participant):
         raise HTTPException(status_code=403, detail="Only tournament participants can view tournament logs")
     
-    # Get all games for this tournament
-    rounds = db.query(TournamentRound).filter(
-        TournamentRound.tournament_id == tournament_id
-    ).all()
-    
-    round_ids = [r.id for r in rounds]
-    games = db.query(TournamentGame).filter(
-        TournamentGame.round_id.in_(round_ids)
-    ).all()
-    
-    game_ids = [g.id for g in games]
-    
-    if not game_ids:
-        return {
-            "logs": [],
-            "total": 0,
-            "skip": skip,
-            "limit": limit
-        }
-    
-    # Get all logs from all games
-    from models.game_log import GameLog
-    game_logs = []
-    if game_ids:
-        game_logs = db.query(GameLog).filter(
-            GameLog.game_id.in_(game_ids)
-        ).all()
-    
-    # Get tournament logs
-    from models.tournament_log import TournamentLog
-    tournament_logs = db.query(TournamentLog).filter(
-        TournamentLog.tournament_id == tournament_id
-    ).all()
+    # Логи ігор і турніру сортуються та обмежуються в SQL (UNION ALL)
+    try:
+        logs = get_combined_tournament_logs(db, tournament_id, limit=limit, skip=skip, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    # Combine and sort by date
-    all_logs = []
-    for log in game_logs:
-        all_logs.append({
-            "type": "game",
-            "id": log.id,
-            "game_id": log.game_id,
-            "user_battletag": log.user_battletag,
-            "user_role": log.user_role,
-            "action_type": log.action_type,
-            "action_description": log.action_description,
-            "created_at": log.created_at
-        })
-    
-    for log in tournament_logs:
-        all_logs.append({
-            "type": "tournament",
-            "id": log.id,
-            "game_id": None,
-            "user_battletag": log.user_battletag,
-            "user_role": log.user_role,
-            "action_type": log.action_type,
-            "action_description": log.action_description,
-            "created_at": log.created_at
-        })
-    
-    # Sort by created_at DESC
-    all_logs.sort(key=lambda x: x["created_at"], reverse=True)
-    
-    total = len(all_logs)
-    
-    # Apply pagination
-    paginated_logs = all_logs[skip:skip + limit]
+    # Повна сторінка - віддаємо курсор на наступну
+    next_cursor = encode_log_cursor(logs[-1]) if logs and len(logs) == limit else None
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return {
         "logs": [
             {
-                "id": log["id"],
-                "type": log["type"],
-                "game_id": log["game_id"],
-                "user_battletag": log["user_battletag"],
-                "user_role": log["user_role"],
-                "action_type": log["action_type"],
-                "action_description": log["action_description"],
-                "created_at": log["created_at"].isoformat() + "Z"
+                "id": log.id,
+                "type": log.type,
+                "game_id": log.game_id,
+                "user_battletag": log.user_battletag,
+                "user_role": log.user_role,
+                "action_type": log.action_type,
+                "action_description": log.action_description,
+                "created_at": log.created_at.isoformat() + "Z"
             }
-            for log in paginated_logs
+            for log in logs
         ],
-        "total": total,
+        "total": count_combined_tournament_logs(db, tournament_id),
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor
     }
 
 
@@ -1417,20 +1332,23 @@ async def get_tournament_status_endpoint(
     return manager.get_tournament_status(db)
 
 
-@router.get("/{tournament_id}/rounds/{round_number}/games")
-async def get_round_games(
-    tournament_id: int,
-    round_number: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Get all games for a specific round (user's game first if participating)"""
-    from api.crud.game_crud import get_round_games
+def _build_round_games(db: Session, tournament_id: int, round_number: int) -> Optional[dict]:
+    """
+    Ігри раунду без персональних полів (can_edit / is_my_game / порядок) - для кешу.
+    Повертає None якщо турнір або раунд не знайдено.
+    """
+    from fastapi.encoders import jsonable_encoder
+    from api.crud.game_crud import get_round_games as crud_get_round_games
+    from models.tournament import Tournament as TournamentModel, TournamentStatus as ModelTournamentStatus
     from models.tournament_round import TournamentRound
+    from models.tournament_game import GameStatus
     
-    tournament = get_tournament(db, tournament_id)
+    tournament = db.query(TournamentModel).filter(
+        TournamentModel.id == tournament_id,
+        TournamentModel.is_deleted == False
+    ).first()
     if not tournament:
-        raise HTTPException(status_code=404, detail="Tournament not found")
+        return None
     
     # Find round by tournament_id and round_number
     round_obj = db.query(TournamentRound).filter(
@@ -1439,12 +1357,11 @@ async def get_round_games(
     ).first()
     
     if not round_obj:
-        raise HTTPException(status_code=404, detail="Round not found")
+        return {"round_missing": True}
     
-    games = get_round_games(db, round_obj.id)
+    games = crud_get_round_games(db, round_obj.id)
     
     # Check if all games in current round are completed
-    from models.tournament_game import GameStatus
     all_games_completed = all(
         game.status == GameStatus.COMPLETED and all(
             gp.positions is not None or (gp.points is not None and gp.points > 0)
@@ -1453,44 +1370,19 @@ async def get_round_games(
         for game in games
     )
     
-    # Process games: add can_edit, is_my_game, and sort
-    from models.tournament import TournamentStatus
-    is_tournament_finished = tournament.status == TournamentStatus.FINISHED
-    is_admin = current_user.role.value in ['admin', 'super_admin']
-    is_creator = tournament.creator_id == current_user.id
-    
-    user_game = None
-    other_games = []
-    
-    for game in games:
-        # Check if user is participant
-        participant_user_ids = [gp.user_id for gp in game.participants]
-        is_my_game = current_user.id in participant_user_ids
-        
-        # Determine if user can edit this game
-        can_edit = (
-            not is_tournament_finished and 
-            (is_admin or is_creator or is_my_game)
-        )
-        
-        # Add computed fields to game
-        game.can_edit = can_edit
-        game.is_my_game = is_my_game
-        
-        # Ensure calculated_points is set for all participants
-        for gp in game.participants:
-            if not hasattr(gp, 'calculated_points') or gp.calculated_points is None:
-                if gp.points is not None:
-                    gp.calculated_points = float(gp.points)
-        
-        # Sort games
-        if is_my_game:
-            user_game = game
-        else:
-            other_games.append(game)
-    
-    # Prepare sorted games list
-    sorted_games = [user_game] + other_games if user_game else games
+    encoded_games = jsonable_encoder(games)
+
+    for game, encoded_game in zip(games, encoded_games):
+        for game_participant, gp in zip(game.participants, encoded_game["participants"]):
+            # jsonable_encoder бере vars() ORM-об'єкта і не бачить hybrid positions -
+            # віддаємо старий формат "[6, 7, 8]" замість колонок маски
+            gp.pop("position_mask", None)
+            gp.pop("best_position", None)
+            gp["positions"] = game_participant.positions
+
+            # Ensure calculated_points is set for all participants
+            if gp.get("calculated_points") is None and gp.get("points") is not None:
+                gp["calculated_points"] = float(gp["points"])
     
     # Determine if this is a final round
     is_final = False
@@ -1499,8 +1391,9 @@ async def get_round_games(
         is_final = True
         final_round_number = round_number - tournament.regular_rounds
     
-    # Return tournament info with games
     return {
+        "creator_id": tournament.creator_id,
+        "is_finished": tournament.status == ModelTournamentStatus.FINISHED,
         "tournament": {
             "id": tournament.id,
             "current_round": tournament.current_round,
@@ -1512,7 +1405,7 @@ async def get_round_games(
             "finals_started": tournament.finals_started,
             "finals_games_count": tournament.finals_games_count
         },
-        "round": {
+        "round": jsonable_encoder({
             "id": round_obj.id,
             "number": round_obj.round_number,
             "status": round_obj.status.value,
@@ -1521,11 +1414,82 @@ async def get_round_games(
             "completed_at": round_obj.completed_at,
             "is_final": is_final,
             "final_round_number": final_round_number
-        },
-        "games": sorted_games
+        }),
+        "games": encoded_games
     }
 
 
+@router.get("/{tournament_id}/rounds/{round_number}/games")
+def get_round_games(
+    tournament_id: int,
+    round_number: int,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get all games for a specific round (user's game first if participating)"""
+    from services.tournament_cache import tournament_cache, get_tournament_version
+    
+    version = get_tournament_version(db, tournament_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    
+    etag = _viewer_etag(f"t{tournament_id}-r{round_number}", version, current_user)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    cache_key = ("round_games", tournament_id, round_number, version)
+    cached = tournament_cache.get(cache_key)
+    if cached is None:
+        cached = _build_round_games(db, tournament_id, round_number)
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Tournament not found")
+        tournament_cache.set(cache_key, cached)
+    
+    if cached.get("round_missing"):
+        raise HTTPException(status_code=404, detail="Round not found")
+    
+    # Process games: add can_edit, is_my_game, and sort
+    is_admin = current_user.role.value in ['admin', 'super_admin']
+    is_creator = cached["creator_id"] == current_user.id
+    
+    user_game = None
+    other_games = []
+    
+    for cached_game in cached["games"]:
+        game = dict(cached_game)
+        
+        # Check if user is participant
+        participant_user_ids = [gp["user_id"] for gp in game["participants"]]
+        is_my_game = current_user.id in participant_user_ids
+        
+        # Determine if user can edit this game
+        game["can_edit"] = (
+            not cached["is_finished"] and 
+            (is_admin or is_creator or is_my_game)
+        )
+        game["is_my_game"] = is_my_game
+        
+        # Sort games
+        if is_my_game and user_game is None:
+            user_game = game
+        else:
+            other_games.append(game)
+    
+    # Prepare sorted games list
+    sorted_games = [user_game] + other_games if user_game else other_games
+    
+    # Return tournament info with games
+    return JSONResponse(
+        content={
+            "tournament": cached["tournament"],
+            "round": cached["round"],
+            "games": sorted_games
+        },
+        headers={"ETag": etag}
+    )
+
+
 @router.post("/{tournament_id}/test-next-round-notification")
 async def test_next_round_notification(
     tournament_id: int,
@@ -1566,7 +1530,7 @@ async def test_next_round_notification(
         round_number=round_number,
         is_final=is_final,
         final_round_number=final_round_number,
-        db=db
+        tournament_name=tournament.name
     )
     
     return {
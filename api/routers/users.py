@@ -11,7 +11,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/search", response_model=List[User])
-async def search_users(
+def search_users(
     battletag: str = None,
     name: str = None,
     limit: int = 10,
@@ -32,7 +32,7 @@ async def search_users(
 
 
 @router.get("/{user_id}", response_model=User)
-async def get_user_profile(
+def get_user_profile(
     user_id: int,
     db: Session = Depends(get_db)
 ):
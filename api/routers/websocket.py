@@ -3,7 +3,7 @@ from core.auth import verify_token
 from models.user import User
 from models.tournament import Tournament
 from models.tournament_participant import TournamentParticipant
-from services.websocket_manager import websocket_manager
+from services.websocket_manager import websocket_manager, SUPPORTED_ENCODINGS, ENCODING_COMPACT, COMPACT_KEYS
 from db import SessionLocal
 from fastapi import HTTPException, status
 import logging
@@ -34,7 +34,8 @@ async def send_error(websocket: WebSocket, error_type: str, message: str, code:
 @router.websocket("/ws")
 async def universal_websocket(
     websocket: WebSocket,
-    token: str = Query(None)
+    token: str = Query(None),
+    encoding: str = Query("json")
 ):
     """
     Універсальний WebSocket endpoint для підключення користувача.
@@ -42,6 +43,8 @@ async def universal_websocket(
     
     Використання:
     - Підключення: ws://host/ws?token=JWT_TOKEN
+    - Опційно: &encoding=compact - короткі ключі у повідомленнях (мапа ключів приходить у "connected")
+    - Стиснення permessage-deflate узгоджується на рівні uvicorn автоматично
     - Автоматично отримує сповіщення про події всіх турнірів, де користувач є учасником
     
     Формат помилок:
@@ -59,6 +62,10 @@ async def universal_websocket(
         await send_error(websocket, "authentication_error", "Token required")
         return
     
+    if encoding not in SUPPORTED_ENCODINGS:
+        await send_error(websocket, "validation_error", f"Unsupported encoding: {encoding}")
+        return
+    
     # Створюємо сесію БД
     db = SessionLocal()
     user = None
@@ -101,11 +108,11 @@ async def universal_websocket(
         db.close()
     
     # Підключаємо користувача (універсальне підключення)
-    await websocket_manager.connect(websocket, user.id)
+    await websocket_manager.connect(websocket, user.id, [t.id for t in user_tournaments], encoding)
     
     try:
         # Відправляємо привітальне повідомлення
-        await websocket.send_json({
+        await websocket_manager.send_personal(websocket, {
             "type": "connected",
             "user_id": user.id,
             "user_battletag": user.battletag,
@@ -122,7 +129,9 @@ async def universal_websocket(
             ],
             "message": "Connected successfully. You will receive notifications for all your tournaments.",
             "timestamp": datetime.utcnow().isoformat() + "Z",
-            "heartbeat_interval": 30  # секунди для ping
+            "heartbeat_interval": 30,  # секунди для ping
+            "encoding": encoding,
+            "keys": COMPACT_KEYS if encoding == ENCODING_COMPACT else None
         })
         
         # Heartbeat task для автоматичного перепідключення
@@ -138,7 +147,7 @@ async def universal_websocket(
                     
                     # Обробка ping/pong
                     if data == "ping":
-                        await websocket.send_json({
+                        await websocket_manager.send_personal(websocket, {
                             "type": "pong",
                             "timestamp": datetime.utcnow().isoformat() + "Z"
                         })
@@ -149,7 +158,7 @@ async def universal_websocket(
                         try:
                             command = json.loads(data)
                             if command.get("type") == "ping":
-                                await websocket.send_json({
+                                await websocket_manager.send_personal(websocket, {
                                     "type": "pong",
                                     "timestamp": datetime.utcnow().isoformat() + "Z"
                                 })
@@ -162,7 +171,7 @@ async def universal_websocket(
                         logger.warning(f"Heartbeat timeout for user {user.id}")
                         break
                     # Відправляємо автоматичний ping
-                    await websocket.send_json({
+                    await websocket_manager.send_personal(websocket, {
                         "type": "ping",
                         "timestamp": datetime.utcnow().isoformat() + "Z"
                     })
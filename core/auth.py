@@ -2,17 +2,25 @@ from datetime import datetime, timedelta
 from typing import Optional, List
 from functools import wraps
 from jose import JWTError, jwt
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from core.config import settings
 from core.roles import UserRole
+from core.identity import CurrentUser, identity_cache
+from core.token_cache import VerifiedTokenCache
 from api.deps.db import get_db
 from models.user import User
 from schemas.auth import TokenData
 
 security = HTTPBearer()
 
+TOKEN_AUDIENCE = "blackbears-frontend"
+TOKEN_ISSUER = "blackbears-backend"
+
+# Глобальний кеш перевірених токенів
+token_cache = VerifiedTokenCache(maxsize=settings.jwt_cache_size)
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
@@ -32,8 +40,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update(
         {
             "exp": expire,
-            "iss": "blackbears-backend",
-            "aud": "blackbears-frontend",
+            "iss": TOKEN_ISSUER,
+            "aud": TOKEN_AUDIENCE,
         }
     )
 
@@ -45,6 +53,61 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def _decode_jose(token: str) -> dict:
+    payload = jwt.decode(
+        token,
+        settings.jwt_secret_key,
+        algorithms=[settings.jwt_algorithm],
+        audience=TOKEN_AUDIENCE,
+    )
+
+    # Перевірка issuer
+    if payload.get("iss") != TOKEN_ISSUER:
+        raise JWTError("Invalid issuer")
+    return payload
+
+
+def _decode_pyjwt(token: str) -> dict:
+    import jwt as pyjwt
+
+    try:
+        return pyjwt.decode(
+            token,
+            settings.jwt_secret_key,
+            algorithms=[settings.jwt_algorithm],
+            audience=TOKEN_AUDIENCE,
+            issuer=TOKEN_ISSUER,
+        )
+    except pyjwt.PyJWTError as e:
+        # Назовні - ті самі помилки, що й з jose
+        raise JWTError(str(e))
+
+
+JWT_DECODERS = {
+    "jose": _decode_jose,
+    "pyjwt": _decode_pyjwt,
+}
+
+
+def decode_access_token(token: str) -> dict:
+    """
+    Декодувати та перевірити JWT (підпис, exp, aud, iss, sub).
+    Повертає claims; JWTError якщо токен невалідний.
+    Перевірені токени кешуються до exp (token_cache).
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    decoder = JWT_DECODERS.get(settings.jwt_backend, _decode_jose)
+    payload = decoder(token)
+    if payload.get("sub") is None:
+        raise JWTError("Missing subject")
+
+    token_cache.set(token, payload)
+    return payload
+
+
 def verify_token(token: str, credentials_exception):
     """
     Верифікація JWT токена.
@@ -55,79 +118,116 @@ def verify_token(token: str, credentials_exception):
     - aud == 'blackbears-frontend'
     """
     try:
-        payload = jwt.decode(
-            token,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm],
-            audience="blackbears-frontend",
-        )
-
-        # Перевірка issuer
-        issuer = payload.get("iss")
-        if issuer != "blackbears-backend":
-            raise credentials_exception
-
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-
-        token_data = TokenData(user_id=user_id)
+        payload = decode_access_token(token)
+        token_data = TokenData(user_id=payload.get("sub"))
     except JWTError:
         raise credentials_exception
     return token_data
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+def authenticate_request(request: Request) -> Optional[dict]:
+    """
+    Єдина перевірка Bearer-токена на запит: claims зберігаються в
+    request.state.auth_claims (None - токена немає або він невалідний),
+    тож middleware та залежності не декодують токен повторно.
+    """
+    if hasattr(request.state, "auth_claims"):
+        return request.state.auth_claims
+
+    claims = None
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            claims = decode_access_token(token)
+        except JWTError:
+            claims = None
+    request.state.auth_claims = claims
+    return claims
+
+
+def _load_identity(request: Request, db: Session, user_id: int) -> Optional[CurrentUser]:
+    """Знімок користувача: request.state -> identity_cache -> один SELECT колонок"""
+    identity = getattr(request.state, "current_user", None)
+    if identity is not None and identity.id == user_id:
+        return identity
+
+    identity = identity_cache.get(user_id)
+    if identity is None:
+        row = db.query(User.id, User.role, User.is_active, User.battletag).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        identity = CurrentUser(id=row.id, role=row.role, is_active=row.is_active, battletag=row.battletag)
+        identity_cache.set(identity)
+
+    request.state.current_user = identity
+    return identity
+
+
+def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> CurrentUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    token_data = verify_token(credentials.credentials, credentials_exception)
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    claims = authenticate_request(request)
+    if claims is None:
+        raise credentials_exception
+    try:
+        user_id = int(claims["sub"])
+    except (TypeError, ValueError):
+        raise credentials_exception
+    
+    user = _load_identity(request, db, user_id)
     if user is None:
         raise credentials_exception
     return user
 
 
 def get_current_user_optional(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
-):
+) -> Optional[CurrentUser]:
     if not credentials:
         return None
     
+    claims = authenticate_request(request)
+    if claims is None:
+        return None
     try:
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm],
-            audience="blackbears-frontend"
-        )
-        
-        # Перевірка issuer
-        issuer = payload.get("iss")
-        if issuer != "blackbears-backend":
-            return None
-        
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            return None
-        token_data = TokenData(user_id=user_id)
-    except JWTError:
+        user_id = int(claims["sub"])
+    except (TypeError, ValueError):
         return None
-        
-    user = db.query(User).filter(User.id == token_data.user_id).first()
-    return user
+    
+    return _load_identity(request, db, user_id)
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)):
+def get_current_active_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
+def get_current_db_user(
+    current_user: CurrentUser = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """ORM User поточного користувача - для ендпоінтів, що читають/змінюють інші поля профілю"""
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
 def require_role(required_role: UserRole):
     """
     Декоратор для перевірки ролі користувача.
@@ -138,7 +238,7 @@ def require_role(required_role: UserRole):
     async def admin_endpoint(user: User = Depends(require_role(UserRole.ADMIN))):
         return {"message": "Admin access granted"}
     """
-    def role_checker(current_user: User = Depends(get_current_active_user)):
+    def role_checker(current_user: CurrentUser = Depends(get_current_active_user)):
         if not UserRole.has_permission(current_user.role, required_role):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -148,16 +248,16 @@ def require_role(required_role: UserRole):
     return role_checker
 
 
-def get_super_admin(current_user: User = Depends(require_role(UserRole.SUPER_ADMIN))):
+def get_super_admin(current_user: CurrentUser = Depends(require_role(UserRole.SUPER_ADMIN))):
     """Dependency для ендпоінтів, доступних тільки головному адміну"""
     return current_user
 
 
-def get_admin(current_user: User = Depends(require_role(UserRole.ADMIN))):
+def get_admin(current_user: CurrentUser = Depends(require_role(UserRole.ADMIN))):
     """Dependency для ендпоінтів, доступних адмінам і вище"""
     return current_user
 
 
-def get_premium_user(current_user: User = Depends(require_role(UserRole.PREMIUM))):
+def get_premium_user(current_user: CurrentUser = Depends(require_role(UserRole.PREMIUM))):
     """Dependency для ендпоінтів, доступних преміум користувачам і вище"""
     return current_user
\ No newline at end of file
@@ -9,6 +9,12 @@ class Settings:
     def __init__(self):
         self.database_url: str = os.getenv("DATABASE_URL", "")
         self.debug: bool = os.getenv("DEBUG", "False").lower() == "true"
+        
+        # Старт: auto - alembic upgrade у процесі лише якщо ревізія БД != head; off - не перевіряти
+        # (render.yaml вже робить alembic upgrade head під час build)
+        self.startup_migrations: str = os.getenv("STARTUP_MIGRATIONS", "auto").lower()
+        # create_all на старті - лише для локальної розробки (за замовчуванням = DEBUG)
+        self.startup_create_all: bool = os.getenv("STARTUP_CREATE_ALL", str(self.debug)).lower() == "true"
         self.cors_origins: List[str] = [
             "http://localhost:4200",
             "http://127.0.0.1:4200",
@@ -33,5 +39,47 @@ class Settings:
         self.jwt_algorithm: str = "HS256"
         # Скорочуємо час життя токена до 3 днів для кращої безпеки
         self.jwt_expire_minutes: int = int(os.getenv("JWT_EXPIRE_MINUTES", 60 * 24 * 3))  # 3 days by default
+        # Бібліотека для перевірки токенів: jose або pyjwt (див. scripts/benchmark_jwt.py)
+        self.jwt_backend: str = os.getenv("JWT_BACKEND", "jose").lower()
+        # Кеш уже перевірених токенів (claims до exp)
+        self.jwt_cache_size: int = int(os.getenv("JWT_CACHE_SIZE", 10000))
+        
+        # WebSocket notifications
+        self.notification_queue_size: int = int(os.getenv("NOTIFICATION_QUEUE_SIZE", 1000))
+        self.notification_workers: int = int(os.getenv("NOTIFICATION_WORKERS", 4))
+        
+        # Журнал дій: пакетний запис GameLog/TournamentLog фоновим потоком
+        self.audit_log_queue_size: int = int(os.getenv("AUDIT_LOG_QUEUE_SIZE", 10000))
+        self.audit_log_batch_size: int = int(os.getenv("AUDIT_LOG_BATCH_SIZE", 200))
+        self.audit_log_flush_interval_ms: float = float(os.getenv("AUDIT_LOG_FLUSH_INTERVAL_MS", 200))
+        
+        # Presence (last_seen): як часто писати одного користувача та як часто flush-ити буфер
+        self.presence_write_interval_seconds: float = float(os.getenv("PRESENCE_WRITE_INTERVAL_SECONDS", 60))
+        self.presence_flush_interval_seconds: float = float(os.getenv("PRESENCE_FLUSH_INTERVAL_SECONDS", 15))
+        
+        # Rate limiting: memory (на процес) або sqlite (спільний файл для кількох воркерів на хості)
+        self.rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+        self.rate_limit_sqlite_path: str = os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/blackbears_rate_limit.sqlite3")
+        
+        # In-process кеш деталей турніру / ігор раунду (кількість версій у LRU)
+        self.tournament_cache_size: int = int(os.getenv("TOURNAMENT_CACHE_SIZE", 256))
+        
+        # Кеш ідентичності (id, role, is_active, battletag) для get_current_user
+        self.identity_cache_size: int = int(os.getenv("IDENTITY_CACHE_SIZE", 10000))
+        self.identity_cache_ttl_seconds: float = float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", 60))
+        
+        # Пул з'єднань до БД: size + max_overflow на кожен процес має вміщатися в ліміт Postgres
+        self.db_pool_size: int = int(os.getenv("DB_POOL_SIZE", 10))
+        self.db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+        self.db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+        self.db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", 3600))
+        self.db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+        # Логувати запити, що одночасно тримають більше одного з'єднання
+        self.db_pool_debug: bool = os.getenv("DB_POOL_DEBUG", "False").lower() == "true"
+        
+        # Потоки для sync (def) ендпоінтів: запити до БД виконуються в threadpool, а не в event loop.
+        # За замовчуванням - ємність пулу БД: зайві потоки чекали б з'єднання до pool_timeout
+        # замість того, щоб чекати в черзі threadpool
+        self.threadpool_size: int = int(os.getenv("THREADPOOL_SIZE", self.db_pool_size + self.db_max_overflow))
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,208 @@
+"""
+Інструментований пул з'єднань до БД.
+
+- InstrumentedQueuePool міряє час очікування checkout (гістограма) та таймаути;
+- події checkout/checkin пулу ведуть gauges (in use, overflow, пік) і
+  рахують з'єднання, взяті в межах одного HTTP-запиту;
+- PoolCheckoutMiddleware відкриває облік на час запиту. Запит, що одночасно
+  тримав більше одного з'єднання, рахується в multi_connection_requests,
+  а з DB_POOL_DEBUG=true ще й логується.
+
+Метрики віддає /internal/metrics; за ними підбираємо DB_POOL_SIZE /
+DB_MAX_OVERFLOW під ліміт з'єднань керованого Postgres.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from fastapi import Request
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from core.logging import logger
+
+# Межі кошиків гістограми очікування checkout (мс); останній кошик - усе, що більше
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# Кошики кількості checkout-ів на запит: 0, 1, 2, 3+
+CHECKOUTS_PER_REQUEST_BUCKETS = 3
+
+
+class RequestUsage:
+    """З'єднання, взяті в межах одного запиту"""
+
+    __slots__ = ("checkouts", "held", "max_held")
+
+    def __init__(self):
+        self.checkouts = 0
+        self.held = 0
+        self.max_held = 0
+
+
+_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar("db_request_usage", default=None)
+
+
+class PoolMetrics:
+    """Лічильники пулу; оновлюються з потоків запитів, тому під lock-ом"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool: Optional[QueuePool] = None
+        self.debug = False
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+            self.wait_count = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.timeouts = 0
+            self.connects = 0
+            self.checkouts = 0
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.requests = 0
+            self.checkouts_per_request = [0] * (CHECKOUTS_PER_REQUEST_BUCKETS + 1)
+            self.multi_connection_requests = 0
+
+    def observe_wait(self, elapsed_ms: float):
+        index = len(WAIT_BUCKETS_MS)
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self.wait_buckets[index] += 1
+            self.wait_count += 1
+            self.wait_total_ms += elapsed_ms
+            if elapsed_ms > self.wait_max_ms:
+                self.wait_max_ms = elapsed_ms
+
+    def observe_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        usage = _request_usage.get()
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            if self.in_use > self.peak_in_use:
+                self.peak_in_use = self.in_use
+            if usage is not None:
+                usage.checkouts += 1
+                usage.held += 1
+                if usage.held > usage.max_held:
+                    usage.max_held = usage.held
+        # checkin може статися в іншому контексті - запит запам'ятовуємо на record-і
+        connection_record.info["request_usage"] = usage
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        usage = connection_record.info.pop("request_usage", None)
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+            if usage is not None:
+                usage.held = max(0, usage.held - 1)
+
+    def finish_request(self, usage: RequestUsage, path: str):
+        with self._lock:
+            self.requests += 1
+            self.checkouts_per_request[min(usage.checkouts, CHECKOUTS_PER_REQUEST_BUCKETS)] += 1
+            multi = usage.max_held > 1
+            if multi:
+                self.multi_connection_requests += 1
+        if multi and self.debug:
+            logger.warning(
+                f"Request {path} held {usage.max_held} DB connections at once "
+                f"({usage.checkouts} checkouts)"
+            )
+
+    def get_metrics(self) -> Dict:
+        """Gauges пулу, гістограма очікування та облік по запитах"""
+        pool = self.pool
+        with self._lock:
+            wait_histogram = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+            wait_histogram["inf"] = self.wait_buckets[-1]
+            per_request = {str(i): count for i, count in enumerate(self.checkouts_per_request)}
+            per_request[f"{CHECKOUTS_PER_REQUEST_BUCKETS}+"] = per_request.pop(str(CHECKOUTS_PER_REQUEST_BUCKETS))
+            metrics = {
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "checkout_wait": {
+                    "count": self.wait_count,
+                    "avg_ms": round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                    "max_ms": round(self.wait_max_ms, 3),
+                    "histogram": wait_histogram,
+                },
+                "requests": {
+                    "count": self.requests,
+                    "checkouts_per_request": per_request,
+                    "multi_connection": self.multi_connection_requests,
+                },
+            }
+        if pool is not None:
+            metrics.update({
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+            })
+        return metrics
+
+
+# Глобальні метрики пулу основного engine
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool, що міряє час очікування з'єднання (включно з відкриттям нового)"""
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe_timeout()
+            raise
+        self.metrics.observe_wait((time.perf_counter() - started) * 1000)
+        return connection
+
+
+def instrument_pool(pool: QueuePool, metrics: PoolMetrics = pool_metrics, debug: bool = False) -> PoolMetrics:
+    """Підписати метрики на події пулу"""
+    metrics.pool = pool
+    metrics.debug = debug
+    event.listen(pool, "connect", metrics.on_connect)
+    event.listen(pool, "checkout", metrics.on_checkout)
+    event.listen(pool, "checkin", metrics.on_checkin)
+    return metrics
+
+
+class PoolCheckoutMiddleware(BaseHTTPMiddleware):
+    """Облік з'єднань, взятих запитом (включно з dependency та threadpool)"""
+
+    def __init__(self, app, metrics: PoolMetrics = pool_metrics):
+        super().__init__(app)
+        self.metrics = metrics
+
+    async def dispatch(self, request: Request, call_next):
+        usage = RequestUsage()
+        token = _request_usage.set(usage)
+        try:
+            return await call_next(request)
+        finally:
+            _request_usage.reset(token)
+            self.metrics.finish_request(usage, request.url.path)
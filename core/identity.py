@@ -0,0 +1,96 @@
+"""
+Кеш ідентичності автентифікованих користувачів.
+
+get_current_user / get_current_user_optional та ролі (require_role) потребують
+лише id, role, is_active та battletag. Замість SELECT users на кожен запит
+знімок цих полів живе в LRU з коротким TTL; адмінські зміни ролі /
+деактивація інвалідовують запис одразу (в межах процесу, інші воркери
+побачать зміну не пізніше ніж через TTL).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from core.config import settings
+from core.roles import UserRole
+
+
+class CurrentUser:
+    """Незмінний знімок автентифікованого користувача (замість ORM User)"""
+
+    __slots__ = ("id", "role", "is_active", "battletag")
+
+    def __init__(self, id: int, role: UserRole, is_active: bool, battletag: str):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "role", role)
+        object.__setattr__(self, "is_active", is_active)
+        object.__setattr__(self, "battletag", battletag)
+
+    def __setattr__(self, name, value):
+        # Знімок спільний для запитів з кешу - змінювати треба ORM User
+        raise AttributeError("CurrentUser is read-only; load models.user.User to modify the user")
+
+    def __repr__(self):
+        return f"CurrentUser(id={self.id}, role={self.role}, is_active={self.is_active})"
+
+
+class IdentityCache:
+    """LRU user_id -> CurrentUser з TTL на запис"""
+
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self._data: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> Optional[CurrentUser]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._data[user_id]
+                self.misses += 1
+                return None
+            self._data.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, identity: CurrentUser):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[identity.id] = (identity, time.monotonic() + self.ttl)
+            self._data.move_to_end(identity.id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            if self._data.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_metrics(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+# Глобальний кеш ідентичності
+identity_cache = IdentityCache(
+    maxsize=settings.identity_cache_size,
+    ttl_seconds=settings.identity_cache_ttl_seconds,
+)
@@ -0,0 +1,161 @@
+"""
+Write-behind трекер активності користувачів (last_seen).
+
+Замість UPDATE + commit на кожен авторизований запит middleware лише
+оновлює in-memory буфер. Фоновий потік періодично записує накопичені
+значення одним UPDATE users ... FROM (VALUES ...). Запис для одного
+користувача коалесується: не частіше ніж раз на write_interval секунд.
+"""
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import Integer, DateTime, column, or_, update, values
+
+from core.config import settings
+from core.logging import logger
+
+# Поріг "онлайн" (той самий, що й у User.is_online)
+ONLINE_THRESHOLD = timedelta(minutes=5)
+
+
+class PresenceTracker:
+    """In-memory буфер last_seen з періодичним bulk-flush у БД"""
+
+    def __init__(self, write_interval: float = 60.0, flush_interval: float = 15.0):
+        self.write_interval = timedelta(seconds=write_interval)
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        # Найсвіжіший last_seen, відомий процесу (для читання)
+        self._seen: Dict[int, datetime] = {}
+        # Значення, що очікують запису в БД
+        self._pending: Dict[int, datetime] = {}
+        # Коли значення користувача востаннє ставилось у чергу на запис
+        self._last_queued: Dict[int, datetime] = {}
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Метрики
+        self.touches = 0
+        self.flushes = 0
+        self.rows_written = 0
+
+    def touch(self, user_id: int, now: Optional[datetime] = None):
+        """Зафіксувати активність користувача (без звернення до БД)"""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            self.touches += 1
+            self._seen[user_id] = now
+            last_queued = self._last_queued.get(user_id)
+            if last_queued is None or now - last_queued >= self.write_interval:
+                self._pending[user_id] = now
+                self._last_queued[user_id] = now
+
+    def get_last_seen(self, user_id: int, db_value: Optional[datetime] = None) -> Optional[datetime]:
+        """Найсвіжіше значення з буфера та БД"""
+        buffered = self._seen.get(user_id)
+        if buffered is None:
+            return db_value
+        if db_value is None:
+            return buffered
+        if db_value.tzinfo is None:
+            db_value = db_value.replace(tzinfo=timezone.utc)
+        return max(buffered, db_value)
+
+    def flush(self) -> int:
+        """Записати накопичені last_seen одним UPDATE ... FROM (VALUES ...)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if pending:
+            from db import SessionLocal
+            from models.user import User
+
+            rows = list(pending.items())
+            presence = values(
+                column("id", Integer),
+                column("last_seen", DateTime(timezone=True)),
+                name="presence",
+            ).data(rows)
+
+            stmt = (
+                update(User.__table__)
+                .where(User.__table__.c.id == presence.c.id)
+                .where(or_(
+                    User.__table__.c.last_seen.is_(None),
+                    User.__table__.c.last_seen < presence.c.last_seen,
+                ))
+                .values(last_seen=presence.c.last_seen)
+            )
+
+            db = SessionLocal()
+            try:
+                db.execute(stmt)
+                db.commit()
+                self.flushes += 1
+                self.rows_written += len(rows)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error flushing last_seen for {len(rows)} users: {e}")
+                # Повертаємо значення в чергу, якщо їх не перезаписали новіші
+                with self._lock:
+                    for user_id, seen in rows:
+                        if self._pending.get(user_id, seen) <= seen:
+                            self._pending[user_id] = seen
+                return 0
+            finally:
+                db.close()
+
+        self._evict_stale()
+        return len(pending)
+
+    def _evict_stale(self):
+        """Прибрати давні записи: вони вже в БД і не впливають на is_online"""
+        cutoff = datetime.now(timezone.utc) - ONLINE_THRESHOLD - self.write_interval
+        with self._lock:
+            for user_id in [uid for uid, seen in self._seen.items() if seen < cutoff]:
+                if user_id not in self._pending:
+                    self._seen.pop(user_id, None)
+                    self._last_queued.pop(user_id, None)
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Presence flush loop error: {e}")
+
+    def start(self):
+        """Запустити фоновий flush"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="presence-flush", daemon=True)
+        self._thread.start()
+        logger.info(f"Presence tracker started (flush every {self.flush_interval}s)")
+
+    def stop(self):
+        """Зупинити фоновий flush і записати залишок"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval)
+            self._thread = None
+        self.flush()
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "tracked_users": len(self._seen),
+            "pending": len(self._pending),
+            "touches": self.touches,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+        }
+
+
+# Глобальний екземпляр трекера
+presence_tracker = PresenceTracker(
+    write_interval=settings.presence_write_interval_seconds,
+    flush_interval=settings.presence_flush_interval_seconds,
+)
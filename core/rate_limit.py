@@ -1,115 +1,305 @@
-from fastapi import Request, HTTPException, status
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Dict, Tuple
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+import math
+import re
+import sqlite3
+import threading
 import time
 
 
+# (ліміт, вікно в секундах)
+Limit = Tuple[int, int]
+
+
+def sliding_window_estimate(previous: int, current: int, elapsed: float, window: int) -> float:
+    """
+    Оцінка кількості запитів за останні `window` секунд (sliding window counter):
+    лічильник попереднього вікна зважується на частку, що ще потрапляє у вікно.
+    """
+    return previous * (1 - elapsed / window) + current
+
+
+def sliding_window_retry_after(previous: int, current: int, elapsed: float, window: int, limit: int) -> float:
+    """Через скільки секунд оцінка опуститься нижче ліміту"""
+    if current >= limit:
+        # Чекаємо наступного вікна, де поточний лічильник стане "попереднім"
+        # і його вага (1 - e/window) має впасти так, щоб current * вага < limit
+        return (window - elapsed) + window * (1 - limit / current)
+    if previous <= 0:
+        return 0.0
+    # previous * (1 - (elapsed + t) / window) + current < limit
+    return max(0.0, window * (1 - (limit - current) / previous) - elapsed)
+
+
+class RateLimitStore(ABC):
+    """
+    Інтерфейс сховища лічильників.
+    hit() атомарно перевіряє всі ліміти ключа і, якщо всі дозволяють, зараховує запит.
+    Повертає (allowed, retry_after_seconds, limit, window) - останні два для ліміту, що спрацював.
+    """
+
+    # True - виклики роблять блокуючий I/O, middleware виконує їх у threadpool
+    blocking: bool = False
+
+    @abstractmethod
+    def hit(self, key: str, limits: Sequence[Limit], now: float) -> Tuple[bool, float, int, int]:
+        ...
+
+    @abstractmethod
+    def evict(self, now: float) -> int:
+        """Прибрати лічильники ключів, неактивних більше двох вікон"""
+        ...
+
+
+def _evaluate(counters: List[List[int]], limits: Sequence[Limit], now: float) -> Tuple[bool, float, int, int]:
+    """
+    Спільна логіка для сховищ. counters[i] = [window_index, previous, current] для limits[i]
+    (вже зсунуті на поточне вікно). Якщо дозволено - інкрементує current.
+    """
+    for (limit, window), (_, previous, current) in zip(limits, counters):
+        elapsed = now % window
+        if sliding_window_estimate(previous, current, elapsed, window) >= limit:
+            retry_after = sliding_window_retry_after(previous, current, elapsed, window, limit)
+            return False, retry_after, limit, window
+
+    for counter in counters:
+        counter[2] += 1
+    return True, 0.0, 0, 0
+
+
+def _roll(counter: Optional[List[int]], window: int, now: float) -> List[int]:
+    """Зсунути лічильник [index, previous, current] на поточне вікно"""
+    index = int(now // window)
+    if counter is None:
+        return [index, 0, 0]
+    if counter[0] == index:
+        return counter
+    if counter[0] == index - 1:
+        return [index, counter[2], 0]
+    return [index, 0, 0]
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Лічильники в пам'яті процесу: фіксований розмір на ключ, O(1) на запит"""
+
+    def __init__(self):
+        # {(key, window): [window_index, previous, current]}
+        self._counters: Dict[Tuple[str, int], List[int]] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limits: Sequence[Limit], now: float) -> Tuple[bool, float, int, int]:
+        with self._lock:
+            counters = []
+            for _, window in limits:
+                counter = _roll(self._counters.get((key, window)), window, now)
+                self._counters[(key, window)] = counter
+                counters.append(counter)
+            return _evaluate(counters, limits, now)
+
+    def evict(self, now: float) -> int:
+        with self._lock:
+            stale = [
+                (key, window) for (key, window), counter in self._counters.items()
+                if counter[0] < int(now // window) - 1
+            ]
+            for item in stale:
+                del self._counters[item]
+            return len(stale)
+
+    def __len__(self):
+        return len(self._counters)
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """
+    Спільне для кількох uvicorn воркерів сховище на локальному SQLite файлі
+    (заміна для Redis на одному хості). Атомарність - через BEGIN IMMEDIATE.
+    Файловий I/O і очікування блокування (busy timeout 5 с) - блокуючі.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            " key TEXT NOT NULL,"
+            " window INTEGER NOT NULL,"
+            " idx INTEGER NOT NULL,"
+            " previous INTEGER NOT NULL,"
+            " current INTEGER NOT NULL,"
+            " PRIMARY KEY (key, window))"
+        )
+
+    def hit(self, key: str, limits: Sequence[Limit], now: float) -> Tuple[bool, float, int, int]:
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                counters = []
+                for _, window in limits:
+                    row = cursor.execute(
+                        "SELECT idx, previous, current FROM rate_limits WHERE key = ? AND window = ?",
+                        (key, window)
+                    ).fetchone()
+                    counters.append(_roll(list(row) if row else None, window, now))
+
+                result = _evaluate(counters, limits, now)
+
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO rate_limits (key, window, idx, previous, current) VALUES (?, ?, ?, ?, ?)",
+                    [(key, window, *counter) for (_, window), counter in zip(limits, counters)]
+                )
+                cursor.execute("COMMIT")
+                return result
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def evict(self, now: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM rate_limits WHERE idx < CAST(? / window AS INTEGER) - 1",
+                (now,)
+            )
+            return cursor.rowcount
+
+
+@dataclass
+class RateLimitRule:
+    """
+    Окремий бюджет для групи маршрутів.
+    path_pattern - регулярний вираз для request.url.path, methods - порожньо = всі методи.
+    """
+    name: str
+    path_pattern: str
+    requests_per_minute: int
+    requests_per_hour: int
+    methods: FrozenSet[str] = field(default_factory=frozenset)
+
+    def __post_init__(self):
+        self._regex = re.compile(self.path_pattern)
+        self.methods = frozenset(m.upper() for m in self.methods)
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods and method.upper() not in self.methods:
+            return False
+        return bool(self._regex.match(path))
+
+    @property
+    def limits(self) -> List[Limit]:
+        return [(self.requests_per_minute, 60), (self.requests_per_hour, 3600)]
+
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """
     Rate limiting middleware для захисту від DDoS.
-    Обмежує кількість запитів з одного IP.
+    Обмежує кількість запитів з одного IP (sliding window counter, O(1) на запит).
     """
-    
-    def __init__(self, app, requests_per_minute: int = 60, requests_per_hour: int = 1000):
+
+    EXEMPT_PATHS = {"/health", "/docs", "/openapi.json", "/redoc"}
+
+    def __init__(
+        self,
+        app,
+        requests_per_minute: int = 60,
+        requests_per_hour: int = 1000,
+        rules: Optional[Sequence[RateLimitRule]] = None,
+        store: Optional[RateLimitStore] = None,
+        eviction_interval: float = 300.0
+    ):
         super().__init__(app)
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
-        # {ip: [(timestamp, ...), ...]}
-        self.request_history: Dict[str, list] = defaultdict(list)
-        self._cleanup_interval = timedelta(minutes=5)
-        self._last_cleanup = datetime.now()
-    
+        self.rules = list(rules or [])
+        self.default_rule = RateLimitRule("default", r".*", requests_per_minute, requests_per_hour)
+        self.store = store or InMemoryRateLimitStore()
+        self._eviction_interval = eviction_interval
+        self._last_eviction = time.time()
+
     def _get_client_ip(self, request: Request) -> str:
         """Отримати IP клієнта"""
         # Перевіряємо заголовки проксі
         forwarded = request.headers.get("X-Forwarded-For")
         if forwarded:
             return forwarded.split(",")[0].strip()
-        
+
         real_ip = request.headers.get("X-Real-IP")
         if real_ip:
             return real_ip
-        
+
         if request.client:
             return request.client.host
-        
+
         return "unknown"
-    
-    def _cleanup_old_requests(self):
-        """Очистити старі запити (старше 1 години)"""
-        now = datetime.now()
-        if now - self._last_cleanup < self._cleanup_interval:
+
+    def _get_rule(self, request: Request) -> RateLimitRule:
+        """Перше правило, що підходить під маршрут, або загальний бюджет"""
+        for rule in self.rules:
+            if rule.matches(request.method, request.url.path):
+                return rule
+        return self.default_rule
+
+    def _evict_idle_keys(self, now: float):
+        """Періодично прибирати лічильники неактивних IP"""
+        if now - self._last_eviction < self._eviction_interval:
             return
-        
-        cutoff_minute = now - timedelta(minutes=1)
-        cutoff_hour = now - timedelta(hours=1)
-        
-        for ip in list(self.request_history.keys()):
-            # Залишити тільки запити за останню хвилину та годину
-            self.request_history[ip] = [
-                ts for ts in self.request_history[ip]
-                if ts > cutoff_hour
-            ]
-            
-            # Видалити порожні записи
-            if not self.request_history[ip]:
-                del self.request_history[ip]
-        
-        self._last_cleanup = now
-    
-    def _check_rate_limit(self, ip: str) -> Tuple[bool, str]:
-        """Перевірити чи не перевищено ліміт"""
-        now = datetime.now()
-        cutoff_minute = now - timedelta(minutes=1)
-        cutoff_hour = now - timedelta(hours=1)
-        
-        # Підрахувати запити за останню хвилину
-        requests_last_minute = sum(
-            1 for ts in self.request_history[ip]
-            if ts > cutoff_minute
-        )
-        
-        # Підрахувати запити за останню годину
-        requests_last_hour = sum(
-            1 for ts in self.request_history[ip]
-            if ts > cutoff_hour
-        )
-        
-        # Перевірити ліміти
-        if requests_last_minute >= self.requests_per_minute:
-            return False, f"Rate limit exceeded: {requests_per_minute} requests per minute"
-        
-        if requests_last_hour >= self.requests_per_hour:
-            return False, f"Rate limit exceeded: {requests_per_hour} requests per hour"
-        
-        # Додати поточний запит
-        self.request_history[ip].append(now)
-        
-        return True, ""
-    
+        self._last_eviction = now
+        self.store.evict(now)
+
+    def _check_rate_limit(self, ip: str, rule: RateLimitRule, now: float) -> Tuple[bool, str, int]:
+        """Перевірити чи не перевищено ліміт. Повертає (allowed, error, retry_after)"""
+        allowed, retry_after, limit, window = self.store.hit(f"{rule.name}:{ip}", rule.limits, now)
+        if allowed:
+            return True, "", 0
+
+        period = "minute" if window == 60 else "hour"
+        # floor + 1: на самій межі оцінка ще дорівнює ліміту, тож округлюємо строго вгору
+        return False, f"Rate limit exceeded: {limit} requests per {period}", math.floor(retry_after) + 1
+
+    async def _call_store(self, func, *args):
+        """Виклик, що звертається до сховища: блокуюче сховище - у threadpool, щоб не тримати event loop"""
+        if self.store.blocking:
+            return await run_in_threadpool(func, *args)
+        return func(*args)
+
     async def dispatch(self, request: Request, call_next):
         # Пропускаємо rate limiting для health check та статичних файлів
-        if request.url.path in ["/health", "/docs", "/openapi.json", "/redoc"]:
+        if request.url.path in self.EXEMPT_PATHS:
             return await call_next(request)
-        
-        # Очистити старі запити
-        self._cleanup_old_requests()
-        
-        # Отримати IP клієнта
+
+        now = time.time()
+        await self._call_store(self._evict_idle_keys, now)
+
+        # Отримати IP клієнта та бюджет маршруту
         client_ip = self._get_client_ip(request)
-        
+        rule = self._get_rule(request)
+
         # Перевірити rate limit
-        allowed, error_msg = self._check_rate_limit(client_ip)
-        
+        allowed, error_msg, retry_after = await self._call_store(self._check_rate_limit, client_ip, rule, now)
+
         if not allowed:
-            raise HTTPException(
+            # HTTPException з middleware не обробляється exception handler-ами - повертаємо відповідь
+            return JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=error_msg,
-                headers={"Retry-After": "60"}
+                content={"detail": error_msg, "type": "rate_limit_error"},
+                headers={"Retry-After": str(retry_after)}
             )
-        
+
         response = await call_next(request)
         return response
 
+
+def create_rate_limit_store(backend: str, sqlite_path: str = "") -> RateLimitStore:
+    """Створити сховище лічильників за налаштуванням RATE_LIMIT_BACKEND"""
+    if backend == "sqlite":
+        return SQLiteRateLimitStore(sqlite_path)
+    return InMemoryRateLimitStore()
@@ -0,0 +1,97 @@
+"""
+Швидкий старт застосунку.
+
+- міграції: один SELECT version_num з alembic_version; alembic upgrade
+  запускається в тому ж процесі (без другого інтерпретатора) лише якщо
+  ревізія БД відрізняється від head;
+- create_all - тільки за STARTUP_CREATE_ALL (локальна розробка);
+- тривалість фаз (імпорти, міграції, фонові сервіси) пишеться в лог
+  і віддається в /internal/metrics.
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Set
+
+from core.logging import logger
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_INI = os.path.join(PROJECT_ROOT, "alembic.ini")
+
+
+class PhaseTimer:
+    """Тривалість фаз старту в мілісекундах (у порядку виконання)"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, elapsed_ms: float):
+        self.phases[name] = round(elapsed_ms, 1)
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    def summary(self) -> str:
+        total = sum(self.phases.values())
+        parts = ", ".join(f"{name}={ms:.0f}ms" for name, ms in self.phases.items())
+        return f"{parts} (total {total:.0f}ms)"
+
+    def get_metrics(self) -> Dict[str, float]:
+        return dict(self.phases)
+
+
+# Глобальні таймінги старту процесу
+startup_timer = PhaseTimer()
+
+
+def alembic_config(connection=None):
+    """Config з alembic.ini; connection передається в env.py замість нового engine"""
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "alembic"))
+    # env.py не переналаштовує logging застосунку через fileConfig
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def get_head_revisions(config) -> Set[str]:
+    from alembic.script import ScriptDirectory
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def get_db_revisions(connection) -> Set[str]:
+    """Поточні ревізії БД (SELECT version_num FROM alembic_version; порожньо, якщо таблиці немає)"""
+    from alembic.runtime.migration import MigrationContext
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def run_migrations_if_needed(engine, config=None) -> bool:
+    """
+    alembic upgrade head в поточному процесі, якщо ревізія БД != head.
+    Повертає True, якщо міграції запускались.
+    """
+    from alembic import command
+
+    with engine.begin() as connection:
+        config = config or alembic_config()
+        config.attributes["connection"] = connection
+        current = get_db_revisions(connection)
+        heads = get_head_revisions(config)
+        if current == heads:
+            logger.info(f"Database is at head ({', '.join(sorted(heads))}), skipping migrations")
+            return False
+
+        logger.info(
+            f"Upgrading database {', '.join(sorted(current)) or '<empty>'} -> {', '.join(sorted(heads))}"
+        )
+        command.upgrade(config, "head")
+        return True
+
@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from core.config import settings
+from core.db_pool import InstrumentedQueuePool, instrument_pool
 
 # Завантажуємо змінні з .env
 load_dotenv()
@@ -17,16 +18,21 @@ if not DATABASE_URL:
 engine = create_engine(
     DATABASE_URL, 
     echo=settings.debug,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    pool_recycle=3600,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_recycle=settings.db_pool_recycle,
     connect_args={
         "sslmode": "require",
         "connect_timeout": 10
     }
 )
 
+# Метрики пулу (очікування checkout, in use / overflow, з'єднання на запит)
+instrument_pool(engine.pool, debug=settings.db_pool_debug)
+
 # Створюємо базовий клас для моделей
 Base = declarative_base()
 
@@ -1,3 +1,8 @@
+import time
+
+# Початок імпорту застосунку - для таймінгів холодного старту
+_IMPORT_STARTED = time.perf_counter()
+
 import asyncio
 
 from fastapi import FastAPI, Request
@@ -5,11 +10,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from core.exceptions import TournamentException
 from core.middleware import ActivityTrackingMiddleware
-from core.rate_limit import RateLimitMiddleware
+from core.db_pool import PoolCheckoutMiddleware
+from core.rate_limit import RateLimitMiddleware, RateLimitRule, create_rate_limit_store
 
 from db import Base, engine
 from core.config import settings
 from core.logging import logger
+from core.startup import startup_timer
 
 from models.user import User  # noqa: F401
 from models.tournament import Tournament  # noqa: F401
@@ -17,6 +24,12 @@ from models.tournament_participant import TournamentParticipant  # noqa: F401
 from models.tournament_round import TournamentRound  # noqa: F401
 from models.tournament_game import TournamentGame  # noqa: F401
 from models.game_participant import GameParticipant  # noqa: F401
+from models.player_stats import PlayerStats  # noqa: F401
+
+# Registers the after_flush hook that bumps Tournament.version on every change
+import services.tournament_cache  # noqa: F401
+# Registers the hooks that keep player_stats in sync on commit
+import services.player_stats  # noqa: F401
 
 # ROUTES
 from api.routers.auth import router as auth_router
@@ -27,22 +40,52 @@ from api.routers.stats import router as stats_router
 from api.routers.admin import router as admin_router
 from api.routers.premium import router as premium_router
 from api.routers.websocket import router as websocket_router
+from api.routers.internal import router as internal_router
+
+startup_timer.record("imports", (time.perf_counter() - _IMPORT_STARTED) * 1000)
 
 
 app = FastAPI(title="Game API", version="1.0.0")
 
 # Rate limiting middleware (має бути першим для захисту від DDoS)
-app.add_middleware(RateLimitMiddleware, requests_per_minute=150, requests_per_hour=2100)
+app.add_middleware(
+    RateLimitMiddleware,
+    requests_per_minute=150,
+    requests_per_hour=2100,
+    rules=[
+        # Внесення результатів - окремий, жорсткіший бюджет
+        RateLimitRule(
+            "results",
+            r"^/games/\d+/(results|positions/batch|participant/\d+/(result|position))$",
+            requests_per_minute=60,
+            requests_per_hour=1200,
+            methods=frozenset({"POST", "PUT", "DELETE"})
+        ),
+        # Списки турнірів - часто опитуються фронтендом
+        RateLimitRule(
+            "lists",
+            r"^/tournaments(/my)?/?$",
+            requests_per_minute=120,
+            requests_per_hour=2100,
+            methods=frozenset({"GET"})
+        ),
+    ],
+    store=create_rate_limit_store(settings.rate_limit_backend, settings.rate_limit_sqlite_path)
+)
 
 # Activity tracking middleware (має бути перед CORS)
 app.add_middleware(ActivityTrackingMiddleware)
 
+# Облік з'єднань пулу БД на запит (для /internal/metrics)
+app.add_middleware(PoolCheckoutMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -81,27 +124,61 @@ async def generic_exception_handler(request: Request, exc: Exception):
 async def startup_event():
     logger.info("Starting up application...")
     
-    # Run database migrations automatically
-    try:
-        import subprocess
-        logger.info("Running database migrations...")
-        result = subprocess.run(
-            ["python3", "-m", "alembic", "upgrade", "head"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        logger.info(f"Migrations completed successfully: {result.stdout}")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Migration failed: {e.stderr}")
-        raise RuntimeError(f"Database migration failed: {e.stderr}")
+    # Міграції в цьому ж процесі і лише якщо ревізія БД відстає від head
+    if settings.startup_migrations != "off":
+        from core.startup import run_migrations_if_needed
+        with startup_timer.phase("migrations"):
+            try:
+                run_migrations_if_needed(engine)
+            except Exception as e:
+                logger.error(f"Migration failed: {e}")
+                raise RuntimeError(f"Database migration failed: {e}")
+    
+    if settings.startup_create_all:
+        with startup_timer.phase("create_all"):
+            Base.metadata.create_all(bind=engine)
+        logger.info("Database tables created")
+    
+    with startup_timer.phase("background_services"):
+        # Sync (def) ендпоінти з запитами до БД працюють у threadpool, щоб не блокувати
+        # event loop, на якому живуть і всі /ws з'єднання
+        from anyio.to_thread import current_default_thread_limiter
+        current_default_thread_limiter().total_tokens = settings.threadpool_size
+        logger.info(f"Threadpool size: {settings.threadpool_size}")
+        db_pool_capacity = settings.db_pool_size + settings.db_max_overflow
+        if settings.threadpool_size > db_pool_capacity:
+            logger.warning(
+                f"THREADPOOL_SIZE={settings.threadpool_size} exceeds DB pool capacity {db_pool_capacity} "
+                f"(DB_POOL_SIZE + DB_MAX_OVERFLOW): under load threads will wait up to "
+                f"{settings.db_pool_timeout}s for a connection"
+            )
+        
+        # WebSocket notifications are dispatched from this event loop
+        from services.notification_dispatcher import notification_dispatcher
+        notification_dispatcher.start()
+        
+        # Background flush of buffered last_seen values
+        from core.presence import presence_tracker
+        presence_tracker.start()
+        
+        # Batched GameLog / TournamentLog writes
+        from services.audit_log import audit_log_writer
+        audit_log_writer.start()
     
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created")
+    logger.info(f"Startup timings: {startup_timer.summary()}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down application...")
+    
+    from services.notification_dispatcher import notification_dispatcher
+    await notification_dispatcher.stop()
+    
+    from core.presence import presence_tracker
+    presence_tracker.stop()
+    
+    from services.audit_log import audit_log_writer
+    audit_log_writer.stop()
 
 
 app.include_router(auth_router, tags=["Authentication"])
@@ -112,5 +189,6 @@ app.include_router(stats_router)
 app.include_router(admin_router)
 app.include_router(premium_router)
 app.include_router(websocket_router)
+app.include_router(internal_router)
 
 
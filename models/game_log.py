@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from db import Base
 from datetime import datetime
@@ -20,3 +20,7 @@ class GameLog(Base):
     game = relationship("TournamentGame", backref="logs")
     user = relationship("User", backref="game_logs")
 
+    # Логи гри (і стрічка логів турніру): WHERE game_id = ? ORDER BY created_at DESC
+    __table_args__ = (
+        Index('ix_game_logs_game_id_created_at', 'game_id', 'created_at'),
+    )
@@ -1,26 +1,113 @@
-from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint, String, Float, Boolean
+import json
+from typing import Iterable, List, Optional, Union
+
+from sqlalchemy import Column, Integer, SmallInteger, ForeignKey, UniqueConstraint, Index, Float, Boolean
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from db import Base
 
 
+def positions_to_mask(positions: Iterable[int]) -> int:
+    """[2, 3] -> 0b110 (біт i-1 для позиції i)"""
+    mask = 0
+    for pos in positions:
+        mask |= 1 << (pos - 1)
+    return mask
+
+
+def mask_to_positions(mask: Optional[int]) -> List[int]:
+    """0b110 -> [2, 3]"""
+    if not mask:
+        return []
+    return [pos for pos in range(1, 9) if mask & (1 << (pos - 1))]
+
+
 class GameParticipant(Base):
     __tablename__ = "game_participants"
 
     id = Column(Integer, primary_key=True, index=True)
     game_id = Column(Integer, ForeignKey("tournament_games.id"), nullable=False)
     participant_id = Column(Integer, ForeignKey("tournament_participants.id"), nullable=False)
-    
+
     # Game results
     points = Column(Integer, nullable=True)    # Points earned (1-8) - deprecated
-    positions = Column(String, nullable=True)  # JSON array of shared positions e.g. "[6,7,8]"
+    # Shared positions as a bitmask: bit i-1 = position i, e.g. [6,7,8] -> 0b11100000
+    position_mask = Column(SmallInteger, nullable=True)
+    best_position = Column(SmallInteger, nullable=True)  # min(positions), for tiebreaks and stats
     calculated_points = Column(Float, nullable=True)  # Points calculated from positions
     is_lobby_maker = Column(Boolean, default=False)
-    
+
     # Relationships
     game = relationship("TournamentGame", back_populates="participants")
     participant = relationship("TournamentParticipant", back_populates="game_results")
-    
+
     # Constraints
     __table_args__ = (
         UniqueConstraint('game_id', 'participant_id', name='unique_game_participant'),
-    )
\ No newline at end of file
+        # Tiebreak (MIN best_position) та статистика ігор гравця (PostgreSQL - index-only scan)
+        Index(
+            'ix_game_participants_participant_best_position', 'participant_id', 'best_position',
+            postgresql_include=['game_id', 'position_mask']
+        ),
+    )
+
+    @property
+    def positions_list(self) -> List[int]:
+        """Позиції гравця у грі, відсортовані ([] якщо результату ще немає)"""
+        return mask_to_positions(self.position_mask)
+
+    def set_positions(self, positions: Optional[Iterable[int]]):
+        """Записати позиції (None або [] - очистити результат)"""
+        positions = sorted(positions) if positions else []
+        if not positions:
+            self.position_mask = None
+            self.best_position = None
+            return
+        self.position_mask = positions_to_mask(positions)
+        self.best_position = positions[0]
+
+    @hybrid_property
+    def position_count(self) -> int:
+        """Скільки позицій ділить гравець (popcount маски)"""
+        return bin(self.position_mask or 0).count("1")
+
+    @position_count.expression
+    def position_count(cls):
+        # Portable popcount: сума бітів маски (працює і в PostgreSQL, і в SQLite)
+        bits = [cls.position_mask.bitwise_rshift(i).bitwise_and(1) for i in range(8)]
+        total = bits[0]
+        for bit in bits[1:]:
+            total = total + bit
+        return total
+
+    @hybrid_property
+    def average_position(self) -> Optional[float]:
+        """Середня позиція групи: [6,7,8] -> 7.0 (позиції послідовні)"""
+        if not self.position_mask:
+            return None
+        return self.best_position + (self.position_count - 1) / 2.0
+
+    @average_position.expression
+    def average_position(cls):
+        return cls.best_position + (cls.position_count - 1) / 2.0
+
+    @hybrid_property
+    def positions(self) -> Optional[str]:
+        """
+        Сумісність зі старим форматом: JSON-рядок "[6, 7, 8]" або None.
+        Саме його віддає API (schemas.tournament.GameParticipant.positions).
+        """
+        if not self.position_mask:
+            return None
+        return json.dumps(self.positions_list)
+
+    @positions.setter
+    def positions(self, value: Union[str, Iterable[int], None]):
+        if isinstance(value, str):
+            value = json.loads(value) if value.strip() else None
+        self.set_positions(value)
+
+    @positions.expression
+    def positions(cls):
+        # У SQL "є результат" == є маска: GameParticipant.positions.isnot(None)
+        return cls.position_mask
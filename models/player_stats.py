@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from db import Base
+
+
+# tournament_size = 0 - підсумковий рядок гравця (усі розміри + статистика ігор)
+OVERALL_SIZE = 0
+
+
+class PlayerStats(Base):
+    """Передпорахована статистика гравця (services.player_stats), по розміру турніру"""
+    __tablename__ = "player_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tournament_size = Column(Integer, primary_key=True)  # total_participants, 0 - overall
+
+    # Завершені турніри (final_position визначено)
+    tournaments_played = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    second_places = Column(Integer, nullable=False, default=0)
+    third_places = Column(Integer, nullable=False, default=0)
+    position_sum = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+
+    # Завершені ігри з результатом (лише в рядку OVERALL_SIZE)
+    games_played = Column(Integer, nullable=False, default=0)
+    game_position_sum = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
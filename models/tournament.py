@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum, JSON, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db import Base
 import enum
+import secrets
 
 
 class TournamentStatus(enum.Enum):
@@ -46,6 +47,8 @@ class Tournament(Base):
     finals_participants_count = Column(Integer, nullable=True)  # How many top players go to finals
     regular_rounds = Column(Integer, nullable=True)  # Original rounds count (before finals)
     finals_started = Column(Boolean, default=False, nullable=False)  # Whether finals have started
+    # Seed for the last-resort tiebreak in final standings (deterministic per tournament)
+    tiebreak_seed = Column(Integer, default=lambda: secrets.randbelow(2**31 - 1), nullable=True)
     
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -54,8 +57,26 @@ class Tournament(Base):
     # Soft-delete flag
     is_deleted = Column(Boolean, default=False, nullable=False)
 
+    # Monotonic version of the tournament read model (bumped on every change of the
+    # tournament, its participants, rounds or games); used by the read cache and ETag
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+
     # Relationships
     creator = relationship("User", back_populates="created_tournaments", lazy='select')
     participants = relationship("TournamentParticipant", back_populates="tournament", cascade="all, delete-orphan", lazy='select')
     rounds = relationship("TournamentRound", back_populates="tournament", cascade="all, delete-orphan", lazy='select')
-    games = relationship("TournamentGame", back_populates="tournament", cascade="all, delete-orphan", lazy='select')
\ No newline at end of file
+    games = relationship("TournamentGame", back_populates="tournament", cascade="all, delete-orphan", lazy='select')
+
+    # Індекси лише по невидалених турнірах (усі читання фільтрують is_deleted = false)
+    __table_args__ = (
+        # Список турнірів: фільтр по status, сортування start_date / created_at
+        Index(
+            'ix_tournaments_listing', 'status', 'start_date', 'created_at',
+            postgresql_where=text('is_deleted = false')
+        ),
+        # "Мої турніри" та перевірки прав creator-а
+        Index(
+            'ix_tournaments_creator_id', 'creator_id',
+            postgresql_where=text('is_deleted = false')
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db import Base
@@ -37,4 +37,6 @@ class TournamentGame(Base):
     # Constraints
     __table_args__ = (
         UniqueConstraint('round_id', 'game_number', name='unique_round_game'),
+        # Ігри турніру (логи, історія суперників, фіналісти): WHERE tournament_id = ? [AND round_id ...]
+        Index('ix_tournament_games_tournament_id_round_id', 'tournament_id', 'round_id'),
     )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from db import Base
 from datetime import datetime
@@ -20,3 +20,7 @@ class TournamentLog(Base):
     tournament = relationship("Tournament", backref="logs")
     user = relationship("User", backref="tournament_logs")
 
+    # Стрічка логів турніру: WHERE tournament_id = ? ORDER BY created_at DESC
+    __table_args__ = (
+        Index('ix_tournament_logs_tournament_id_created_at', 'tournament_id', 'created_at'),
+    )
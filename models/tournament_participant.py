@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db import Base
@@ -27,4 +27,9 @@ class TournamentParticipant(Base):
     # Constraints
     __table_args__ = (
         UniqueConstraint('tournament_id', 'user_id', name='unique_tournament_participant'),
+        # Статистика гравця: WHERE user_id = ? (PostgreSQL - index-only scan)
+        Index(
+            'ix_tournament_participants_user_id', 'user_id',
+            postgresql_include=['id', 'tournament_id', 'final_position', 'total_score', 'finals_score']
+        ),
     )
\ No newline at end of file
@@ -31,13 +31,20 @@ class User(Base):
     # Global list of favorite lobby makers (ordered list of user IDs)
     favorite_lobby_makers = Column(JSON, nullable=True)
     
+    @property
+    def current_last_seen(self):
+        """last_seen з урахуванням ще не записаного в БД буфера активності"""
+        from core.presence import presence_tracker
+        return presence_tracker.get_last_seen(self.id, self.last_seen)
+    
     @property
     def is_online(self) -> bool:
         """Користувач онлайн якщо last_seen < 5 хвилин"""
-        if not self.last_seen:
+        last_seen = self.current_last_seen
+        if not last_seen:
             return False
         from datetime import datetime, timezone, timedelta
-        return datetime.now(timezone.utc) - self.last_seen < timedelta(minutes=5)
+        return datetime.now(timezone.utc) - last_seen < timedelta(minutes=5)
     
     # Tournament relationships
     created_tournaments = relationship("Tournament", back_populates="creator")
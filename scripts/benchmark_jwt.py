@@ -0,0 +1,45 @@
+"""
+Бенчмарк перевірки JWT: python-jose vs PyJWT та кеш перевірених токенів.
+
+Для кожного бекенду міряє повну перевірку (підпис HS256, exp, aud, iss)
+того самого токена, що видає create_access_token, і окремо - повторну
+перевірку через decode_access_token з кешем. БД не потрібна.
+
+    python scripts/benchmark_jwt.py
+    python scripts/benchmark_jwt.py --iterations 50000
+"""
+import argparse
+import time
+
+from core.auth import JWT_DECODERS, create_access_token, decode_access_token, token_cache
+from core.config import settings
+
+
+def measure(func, token: str, iterations: int) -> float:
+    """Середній час виклику в мікросекундах"""
+    func(token)  # прогрів
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(token)
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main(iterations: int):
+    token = create_access_token({"sub": "42"})
+    print(f"{'backend':<16}{'us/op':>10}{'ops/s':>12}")
+
+    for name, decoder in JWT_DECODERS.items():
+        us = measure(decoder, token, iterations)
+        print(f"{name:<16}{us:>10.2f}{1_000_000 / us:>12.0f}")
+
+    for name in JWT_DECODERS:
+        settings.jwt_backend = name
+        token_cache.clear()
+        us = measure(decode_access_token, token, iterations)
+        print(f"{name + ' + cache':<16}{us:>10.2f}{1_000_000 / us:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JWT verification microbenchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    main(parser.parse_args().iterations)
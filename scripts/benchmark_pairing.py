@@ -0,0 +1,84 @@
+"""
+Бенчмарк pairing engine: час розподілу та якість лобі для 8-1024 гравців.
+
+Симулює турнір: перший раунд за рейтингом (BALANCED), далі кожен раунд
+розподіляється SCORE (послідовні блоки) та SWISS (з мінімізацією повторних
+зустрічей), результати ігор - випадкові з перевагою сильніших гравців.
+Працює повністю в пам'яті, БД не потрібна.
+
+    python scripts/benchmark_pairing.py
+    python scripts/benchmark_pairing.py --rounds 8 --seed 42 --sizes 64 256 1024
+"""
+import argparse
+import random
+import time
+
+from services.pairing_engine import plan_lobbies, lobby_metrics
+
+DEFAULT_SIZES = [8, 16, 32, 64, 128, 256, 512, 1024]
+POINTS = [8, 7, 6, 5, 4, 3, 2, 1]
+
+
+def play_lobby(lobby, rating, rng):
+    """Випадкові місця: сильніший гравець частіше вище"""
+    return sorted(lobby, key=lambda pid: -(rating[pid] + rng.gauss(0, 1500)))
+
+
+def simulate(players: int, rounds: int, seed: int):
+    rng = random.Random(seed)
+    ids = list(range(1, players + 1))
+    rating = {pid: rng.randint(4000, 10000) for pid in ids}
+    games_count = players // 8
+
+    plan = plan_lobbies("BALANCED", ids, games_count, strength=[rating[pid] for pid in ids], seed=seed)
+    history = []
+    score = {pid: 0 for pid in ids}
+    totals = {name: {"ms": 0.0, "repeat_pairs": 0, "avg_spread": 0.0} for name in ("SCORE", "SWISS")}
+
+    for round_number in range(2, rounds + 1):
+        history.extend(plan)
+        for lobby in plan:
+            for place, pid in enumerate(play_lobby(lobby, rating, rng)):
+                score[pid] += POINTS[place]
+
+        ordered = sorted(ids, key=lambda pid: -score[pid])
+        strength = [score[pid] for pid in ordered]
+        plans = {}
+        for name in ("SCORE", "SWISS"):
+            started = time.perf_counter()
+            plans[name] = plan_lobbies(name, ordered, games_count, strength=strength, history=history)
+            totals[name]["ms"] += (time.perf_counter() - started) * 1000
+            metrics = lobby_metrics(plans[name], score, history)
+            totals[name]["repeat_pairs"] += metrics["repeat_pairs"]
+            totals[name]["avg_spread"] += metrics["avg_spread"]
+        plan = plans["SWISS"]
+
+    paired_rounds = max(rounds - 1, 1)
+    for name in totals:
+        totals[name]["ms"] /= paired_rounds
+        totals[name]["avg_spread"] /= paired_rounds
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pairing engine benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--rounds", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'players':>8} | {'strategy':>8} | {'ms/round':>9} | {'repeat pairs':>12} | {'avg spread':>10}")
+    for players in args.sizes:
+        if players % 8:
+            print(f"⚠️  {players} не ділиться на 8, пропускаю")
+            continue
+        totals = simulate(players, args.rounds, args.seed)
+        for name, result in totals.items():
+            print(
+                f"{players:>8} | {name:>8} | {result['ms']:>9.3f} | "
+                f"{result['repeat_pairs']:>12} | {result['avg_spread']:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Навантажувальний тест: затримка ping/pong на /ws, поки HTTP-читачі навантажують API.
+
+Два етапи з однаковою тривалістю:
+1. idle - лише ping по WebSocket кожні --ping-interval секунд;
+2. load - ті самі ping-и + --readers паралельних клієнтів, що без пауз
+   запитують список турнірів, деталі турніру, ігри раунду, статистику гравця
+   та пошук користувачів.
+
+Якщо запити до БД виконуються в event loop, p95/p99 ping-у під навантаженням
+ростуть разом з часом запитів; у threadpool - лишаються близькими до idle.
+
+    python scripts/load_test_ws_latency.py --base-url http://localhost:8000 --token JWT \\
+        --tournament-id 1 --round 1 --user-id 1 --readers 50 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+import websockets
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def is_pong(message: str) -> bool:
+    try:
+        data = json.loads(message)
+    except ValueError:
+        return False
+    # Повні ключі ({"type": "pong"}) або compact-кодування (значення "pong" під коротким ключем)
+    return isinstance(data, dict) and "pong" in data.values()
+
+
+async def ping_loop(ws_url: str, duration: float, interval: float) -> list:
+    """RTT ping -> pong у мілісекундах"""
+    latencies = []
+    async with websockets.connect(ws_url) as websocket:
+        await websocket.recv()  # привітальне повідомлення
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            await websocket.send("ping")
+            while not is_pong(await websocket.recv()):
+                pass
+            latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(interval)
+    return latencies
+
+
+async def reader(client: httpx.AsyncClient, paths: list, deadline: float, stats: dict):
+    """Один HTTP-читач: запити по колу без пауз до дедлайну"""
+    i = 0
+    while time.monotonic() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        try:
+            response = await client.get(path)
+            stats["requests"] += 1
+            if response.status_code >= 400:
+                stats["errors"] += 1
+        except httpx.HTTPError:
+            stats["errors"] += 1
+
+
+def read_paths(args) -> list:
+    return [
+        "/tournaments/?limit=20",
+        f"/tournaments/{args.tournament_id}",
+        f"/tournaments/{args.tournament_id}/rounds/{args.round}/games",
+        f"/stats/player/{args.user_id}",
+        "/users/search?battletag=a&limit=10",
+    ]
+
+
+def report(name: str, latencies: list, stats: dict = None, duration: float = 0):
+    line = (
+        f"{name:<5} pings={len(latencies):<5} "
+        f"p50={percentile(latencies, 50):7.2f}ms p95={percentile(latencies, 95):7.2f}ms "
+        f"p99={percentile(latencies, 99):7.2f}ms max={max(latencies, default=0):7.2f}ms "
+        f"mean={statistics.fmean(latencies) if latencies else 0:7.2f}ms"
+    )
+    if stats is not None:
+        line += f"  http={stats['requests'] / duration:.0f} req/s errors={stats['errors']}"
+    print(line)
+
+
+async def main(args):
+    ws_base = args.base_url.replace("http://", "ws://").replace("https://", "wss://")
+    ws_url = f"{ws_base}/ws?token={args.token}"
+
+    idle = await ping_loop(ws_url, args.duration, args.ping_interval)
+    report("idle", idle)
+
+    stats = {"requests": 0, "errors": 0}
+    limits = httpx.Limits(max_connections=args.readers, max_keepalive_connections=args.readers)
+    headers = {"Authorization": f"Bearer {args.token}"}
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, limits=limits, timeout=30) as client:
+        deadline = time.monotonic() + args.duration
+        paths = read_paths(args)
+        readers = [asyncio.create_task(reader(client, paths, deadline, stats)) for _ in range(args.readers)]
+        loaded = await ping_loop(ws_url, args.duration, args.ping_interval)
+        await asyncio.gather(*readers)
+    report("load", loaded, stats, args.duration)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WebSocket ping latency under HTTP read load")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="JWT користувача (для /ws та авторизованих ендпоінтів)")
+    parser.add_argument("--tournament-id", type=int, default=1)
+    parser.add_argument("--round", type=int, default=1)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--readers", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0, help="секунди на кожен етап")
+    parser.add_argument("--ping-interval", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
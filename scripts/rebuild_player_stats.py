@@ -0,0 +1,33 @@
+"""
+Скрипт для повного перерахунку таблиці player_stats (backfill після міграції)
+"""
+from db import SessionLocal
+from models.user import User
+from models.tournament import Tournament
+from models.tournament_participant import TournamentParticipant
+from models.tournament_round import TournamentRound
+from models.tournament_game import TournamentGame
+from models.game_participant import GameParticipant
+from models.player_stats import PlayerStats
+from services.player_stats import rebuild_player_stats
+
+
+def rebuild_all_player_stats():
+    """Перерахувати статистику всіх гравців"""
+    db = SessionLocal()
+    
+    try:
+        users_count = rebuild_player_stats(db)
+        rows_count = db.query(PlayerStats).count()
+        print(f"✅ Перераховано статистику {users_count} гравців ({rows_count} рядків player_stats)")
+        
+    except Exception as e:
+        print(f"❌ Помилка: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("Перерахунок player_stats...")
+    rebuild_all_player_stats()
@@ -1,35 +1,34 @@
 """
-Скрипт для перерахунку всіх total_score з calculated_points
+Скрипт для перерахунку всіх total_score / finals_score з calculated_points
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import func, text
 from db import SessionLocal
+from models.user import User
+from models.tournament import Tournament
+from models.tournament_participant import TournamentParticipant
+from models.tournament_round import TournamentRound
+from models.tournament_game import TournamentGame
+from models.game_participant import GameParticipant
+from services.score_engine import recalculate_scores
 
 
 def recalculate_all_scores():
-    """Перерахувати всі total_score для всіх учасників"""
+    """Перерахувати всі total_score та finals_score для всіх учасників"""
     db = SessionLocal()
     
     try:
-        # Використовуємо SQL напряму
-        result = db.execute(text("""
-            UPDATE tournament_participants tp
-            SET total_score = COALESCE(
-                (SELECT SUM(gp.calculated_points)
-                 FROM game_participants gp
-                 WHERE gp.participant_id = tp.id),
-                0.0
-            )
-            RETURNING id, total_score;
-        """))
+        tournament_ids = [row[0] for row in db.query(Tournament.id).order_by(Tournament.id).all()]
         
-        updated_rows = result.fetchall()
-        
-        print(f"✅ Оновлено {len(updated_rows)} записів")
-        for row in updated_rows:
-            print(f"  Учасник {row[0]}: total_score = {row[1]}")
+        total_updated = 0
+        for tournament_id in tournament_ids:
+            # Один UPDATE ... FROM на турнір, з урахуванням регулярних і фінальних раундів
+            updated = recalculate_scores(db, tournament_id)
+            total_updated += len(updated)
+            
+            for participant_id, (total_score, finals_score) in sorted(updated.items()):
+                print(f"  Учасник {participant_id}: total_score = {total_score}, finals_score = {finals_score}")
         
         db.commit()
+        print(f"✅ Оновлено {total_updated} записів у {len(tournament_ids)} турнірах")
         
     except Exception as e:
         print(f"❌ Помилка: {e}")
@@ -0,0 +1,267 @@
+"""
+Пакетний запис журналу дій (GameLog / TournamentLog).
+
+Замість окремого потоку + сесії + commit на кожен лог, log_game_action /
+log_tournament_action лише кладуть запис у чергу. Один фоновий потік
+збирає пакет (до batch_size записів або flush_interval мс), одним SELECT
+підтягує battletag/роль авторів і пише пакет multi-row INSERT-ами в одній
+транзакції. На shutdown черга дописується.
+"""
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from core.config import settings
+from core.logging import logger
+
+GAME = "game"
+TOURNAMENT = "tournament"
+
+# Як часто фоновий потік перевіряє запит на зупинку під час очікування
+STOP_POLL_SECONDS = 0.1
+
+# (kind, target_id, user_id, action_type, action_description, created_at)
+AuditEntry = Tuple[str, int, int, str, str, datetime]
+
+
+class AuditLogWriter:
+    """Обмежена черга записів журналу + один фоновий batch-writer"""
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval_ms: float = 200,
+        session_factory: Optional[Callable] = None,
+        autostart: bool = True,
+    ):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.autostart = autostart
+        self._session_factory = session_factory
+
+        self._queue: "queue.Queue[AuditEntry]" = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        # Один запис пакета в БД за раз (фоновий потік або flush на shutdown)
+        self._write_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Метрики
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.skipped = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_depth = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def log_game(self, game_id: int, user_id: int, action_type: str, action_description: str) -> bool:
+        return self._enqueue((GAME, game_id, user_id, action_type, action_description, datetime.utcnow()))
+
+    def log_tournament(self, tournament_id: int, user_id: int, action_type: str, action_description: str) -> bool:
+        return self._enqueue((TOURNAMENT, tournament_id, user_id, action_type, action_description, datetime.utcnow()))
+
+    def _enqueue(self, entry: AuditEntry) -> bool:
+        """Поставити запис у чергу; False якщо черга переповнена (запис відкинуто)"""
+        if self.autostart and not self.is_running:
+            with self._lock:
+                # Ліниве піднімання потоку, якщо startup-хук ще не спрацював
+                if not self.is_running:
+                    self.start()
+
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(
+                f"Audit log queue is full ({self.max_queue_size}), "
+                f"dropping {entry[0]} log '{entry[3]}' for #{entry[1]}"
+            )
+            return False
+
+        self.enqueued += 1
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def _take_batch(self, timeout: Optional[float]) -> List[AuditEntry]:
+        """
+        Дочекатися першого запису (timeout=None - не чекати), потім добирати
+        пакет до batch_size, але не довше flush_interval від першого запису.
+        """
+        try:
+            first = self._queue.get(timeout=min(timeout, STOP_POLL_SECONDS)) if timeout else self._queue.get_nowait()
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + (self.flush_interval if timeout else 0)
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0 and not self._stop_event.is_set():
+                    # Чекаємо шматками, щоб stop() не чекав повний flush_interval
+                    batch.append(self._queue.get(timeout=min(remaining, STOP_POLL_SECONDS)))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                if remaining <= 0 or self._stop_event.is_set():
+                    break
+        return batch
+
+    def _write(self, batch: List[AuditEntry]):
+        """Записати пакет: один SELECT авторів + INSERT для кожної таблиці, один commit"""
+        from models.user import User
+        from models.game_log import GameLog
+        from models.tournament_log import TournamentLog
+
+        session_factory = self._session_factory
+        if session_factory is None:
+            from db import SessionLocal
+            session_factory = SessionLocal
+
+        with self._write_lock:
+            db = session_factory()
+            try:
+                user_ids = {entry[2] for entry in batch}
+                try:
+                    authors: Dict[int, Tuple[str, str]] = {
+                        user_id: (
+                            battletag or "Unknown",
+                            role.value if hasattr(role, "value") else str(role),
+                        )
+                        for user_id, battletag, role in db.query(User.id, User.battletag, User.role).filter(
+                            User.id.in_(user_ids)
+                        )
+                    }
+                except Exception as e:
+                    db.rollback()
+                    self.failed += len(batch)
+                    logger.error(f"Error writing {len(batch)} audit log entries: {e}")
+                    return
+
+                rows = []
+                for kind, target_id, user_id, action_type, action_description, created_at in batch:
+                    author = authors.get(user_id)
+                    if author is None:
+                        # Як і раніше: без користувача лог не пишемо
+                        self.skipped += 1
+                        continue
+                    row = {
+                        "user_id": user_id,
+                        "user_battletag": author[0],
+                        "user_role": author[1],
+                        "action_type": action_type,
+                        "action_description": action_description,
+                        "created_at": created_at,
+                    }
+                    if kind == GAME:
+                        row["game_id"] = target_id
+                        rows.append((GameLog, row))
+                    else:
+                        row["tournament_id"] = target_id
+                        rows.append((TournamentLog, row))
+
+                if rows:
+                    self.written += self._insert_rows(db, rows)
+                self.batches += 1
+            finally:
+                db.close()
+
+    def _insert_rows(self, db, rows: List[tuple]) -> int:
+        """
+        INSERT рядків (model, values) однією транзакцією. Якщо вона падає
+        (напр. FK: гру/турнір видалили одразу після дії), пакет ділиться навпіл
+        і кожна половина пишеться окремо - втрачаються лише справді погані рядки.
+        Повертає кількість записаних рядків.
+        """
+        try:
+            for model in dict.fromkeys(model for model, _ in rows):
+                db.execute(insert(model), [values for row_model, values in rows if row_model is model])
+            db.commit()
+            return len(rows)
+        except Exception as e:
+            db.rollback()
+            if len(rows) == 1:
+                model, values = rows[0]
+                self.failed += 1
+                logger.error(f"Error writing {model.__tablename__} entry '{values['action_type']}': {e}")
+                return 0
+
+        middle = len(rows) // 2
+        return self._insert_rows(db, rows[:middle]) + self._insert_rows(db, rows[middle:])
+
+    def flush(self) -> int:
+        """Синхронно дописати все, що зараз у черзі; повертає кількість записів"""
+        total = 0
+        while True:
+            batch = self._take_batch(timeout=None)
+            if not batch:
+                return total
+            self._write(batch)
+            total += len(batch)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                batch = self._take_batch(timeout=self.flush_interval)
+                if batch:
+                    self._write(batch)
+            except Exception as e:
+                logger.error(f"Audit log writer loop error: {e}")
+
+    def start(self):
+        """Запустити фоновий writer"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Audit log writer started (batch {self.batch_size}, "
+            f"every {int(self.flush_interval * 1000)}ms)"
+        )
+
+    def stop(self, timeout: float = 5.0):
+        """Зупинити writer і дописати залишок черги"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        written = self.flush()
+        if written:
+            logger.info(f"Audit log writer flushed {written} entries on shutdown")
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Метрики черги для моніторингу"""
+        return {
+            "running": self.is_running,
+            "queue_size": self.max_queue_size,
+            "depth": self._queue.qsize(),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "written": self.written,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+# Глобальний екземпляр writer-а
+audit_log_writer = AuditLogWriter(
+    max_queue_size=settings.audit_log_queue_size,
+    batch_size=settings.audit_log_batch_size,
+    flush_interval_ms=settings.audit_log_flush_interval_ms,
+)
@@ -0,0 +1,95 @@
+"""
+Спільне визначення фіналістів турніру.
+
+- original: top-N за total_score (склад фіналу до будь-яких свапів)
+- actual:   учасники ігор фінальних раундів (round_number > regular_rounds),
+            тобто з урахуванням свапів і ручних замін
+
+Обидві множини рахуються одним запитом і запам'ятовуються в db.info на
+час сесії (запиту / unit of work). Запис інвалідується, коли в цій сесії
+піднімається версія турніру (after_flush або bump_tournament_version),
+тож повторні виклики в межах однієї версії турніру не ходять у БД.
+"""
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional
+
+from sqlalchemy import case, exists, func, select
+from sqlalchemy.orm import Session
+
+from models.tournament import Tournament
+from models.tournament_participant import TournamentParticipant
+from models.tournament_round import TournamentRound
+from models.tournament_game import TournamentGame
+from models.game_participant import GameParticipant
+
+# Ключ кешу в Session.info
+SESSION_INFO_KEY = "finalist_sets"
+
+DEFAULT_FINALS_COUNT = 8
+
+
+@dataclass(frozen=True)
+class FinalistSets:
+    original: FrozenSet[int]
+    actual: FrozenSet[int]
+
+    @property
+    def effective(self) -> FrozenSet[int]:
+        """Фактичні фіналісти, а якщо фінальних ігор ще немає - top-N"""
+        return self.actual or self.original
+
+
+def in_final_games(tournament: Tournament):
+    """
+    EXISTS: учасник (TournamentParticipant.id) грає хоча б в одній грі фінального раунду.
+    Корелюється з TournamentParticipant у зовнішньому запиті.
+    """
+    regular_rounds = tournament.regular_rounds or tournament.total_rounds
+    return exists().where(
+        GameParticipant.participant_id == TournamentParticipant.id,
+        GameParticipant.game_id == TournamentGame.id,
+        TournamentGame.tournament_id == tournament.id,
+        TournamentGame.round_id == TournamentRound.id,
+        TournamentRound.round_number > regular_rounds,
+    )
+
+
+def _load_finalist_sets(db: Session, tournament: Tournament) -> FinalistSets:
+    finals_count = tournament.finals_participants_count or DEFAULT_FINALS_COUNT
+
+    total_rank = func.row_number().over(
+        order_by=(func.coalesce(TournamentParticipant.total_score, 0).desc(), TournamentParticipant.id.asc())
+    )
+    rows = db.execute(
+        select(
+            TournamentParticipant.id,
+            total_rank.label("total_rank"),
+            case((in_final_games(tournament), True), else_=False).label("in_finals"),
+        ).where(TournamentParticipant.tournament_id == tournament.id)
+    ).all()
+
+    return FinalistSets(
+        original=frozenset(row.id for row in rows if row.total_rank <= finals_count),
+        actual=frozenset(row.id for row in rows if row.in_finals),
+    )
+
+
+def get_finalist_sets(db: Session, tournament: Tournament) -> FinalistSets:
+    """Оригінальні та фактичні фіналісти турніру (мемоізовано в межах сесії)"""
+    memo: Dict[int, FinalistSets] = db.info.setdefault(SESSION_INFO_KEY, {})
+    sets = memo.get(tournament.id)
+    if sets is None:
+        sets = _load_finalist_sets(db, tournament)
+        memo[tournament.id] = sets
+    return sets
+
+
+def invalidate_finalist_sets(db: Session, tournament_id: Optional[int] = None):
+    """Скинути мемоізовані множини (одного турніру або всі)"""
+    memo = db.info.get(SESSION_INFO_KEY)
+    if not memo:
+        return
+    if tournament_id is None:
+        memo.clear()
+    else:
+        memo.pop(tournament_id, None)
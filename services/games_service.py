@@ -2,7 +2,6 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from fastapi import HTTPException, status
-import json
 
 from models.user import User
 from models.tournament import Tournament, TournamentStatus
@@ -12,12 +11,11 @@ from models.game_participant import GameParticipant
 from core.roles import UserRole
 from core.exceptions import TournamentException
 from api.crud.game_crud import (
-    get_tournament_game, update_game_result, get_game_participants,
+    get_tournament_game, get_game_participants,
     get_round_games
 )
-from api.crud.participant_crud import update_participant_total_score
+from services.score_engine import recalculate_scores
 from schemas.game_results import GameResultsSubmission, GameResultInput
-from schemas.tournament import GameParticipantUpdate
 from schemas.game_results_v2 import calculate_points_from_positions
 
 
@@ -28,45 +26,19 @@ def log_game_action(
     action_type: str,
     action_description: str
 ):
-    """Helper функція для асинхронного логування дій в грі"""
-    import threading
-    from db import SessionLocal
-    
-    def _log_async():
-        """Асинхронне логування в окремій сесії"""
-        try:
-            log_db = SessionLocal()
-            try:
-                from api.crud.game_log_crud import create_game_log
-                create_game_log(log_db, game_id, user_id, action_type, action_description)
-            finally:
-                log_db.close()
-        except Exception:
-            # Не падаємо якщо логування не вдалось
-            pass
-    
-    # Запускаємо в окремому потоці
-    thread = threading.Thread(target=_log_async, daemon=True)
-    thread.start()
+    """Helper функція для асинхронного логування дій в грі (пакетний запис у фоні)"""
+    from services.audit_log import audit_log_writer
+    
+    # Лише ставимо в чергу: без окремого потоку, сесії та commit на кожен лог
+    audit_log_writer.log_game(game_id, user_id, action_type, action_description)
 
 
 def send_websocket_notification_async(notification_func, **kwargs):
     """Helper функція для асинхронного виклику WebSocket повідомлень"""
-    import threading
-    import asyncio
-    
-    def _send_async():
-        """Асинхронна відправка WebSocket повідомлення"""
-        try:
-            asyncio.run(notification_func(**kwargs))
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error sending WebSocket notification: {e}")
-    
-    # Запускаємо в окремому потоці
-    thread = threading.Thread(target=_send_async, daemon=True)
-    thread.start()
+    from services.notification_dispatcher import notification_dispatcher
+    
+    # Ставимо в чергу диспетчера, який працює в event loop застосунку
+    notification_dispatcher.enqueue(notification_func, **kwargs)
 
 
 def validate_tournament_not_finished(tournament: Tournament):
@@ -129,14 +101,15 @@ def can_submit_game_results(db: Session, game_id: int, tournament_id: int, user:
     if tournament and tournament.creator_id == user.id:
         return True
     
-    # Перевірити чи користувач - учасник цієї гри
-    game_participants = get_game_participants(db, game_id)
-    for gp in game_participants:
-        participant = db.query(TournamentParticipant).filter_by(id=gp.participant_id).first()
-        if participant and participant.user_id == user.id:
-            return True
+    # Перевірити чи користувач - учасник цієї гри (один запит замість запиту на кожного учасника)
+    is_game_participant = db.query(GameParticipant.id).join(
+        TournamentParticipant, GameParticipant.participant_id == TournamentParticipant.id
+    ).filter(
+        GameParticipant.game_id == game_id,
+        TournamentParticipant.user_id == user.id
+    ).first()
     
-    return False
+    return is_game_participant is not None
 
 
 def submit_game_results_logic(
@@ -176,7 +149,7 @@ def submit_game_results_logic(
     is_final = tournament.finals_started and tournament.regular_rounds and round_number > tournament.regular_rounds
     
     # Update results for each participant
-    updated_count = 0
+    updated_ids = []
     for result in results_data.results:
         # Find the game participant record
         game_participant = next(
@@ -185,14 +158,14 @@ def submit_game_results_logic(
         )
         
         if game_participant:
-            update_data = GameParticipantUpdate(
-                points=result.points
-            )
-            update_game_result(db, game_participant.id, update_data)
-            
-            # Update participant's total score
-            update_participant_total_score(db, result.participant_id)
-            updated_count += 1
+            # Лише змінюємо завантажений об'єкт: flush робить recalculate_scores,
+            # commit - один на весь submit
+            game_participant.points = result.points
+            updated_ids.append(result.participant_id)
+    updated_count = len(updated_ids)
+    
+    # Update participants' total scores (one set-based UPDATE)
+    recalculate_scores(db, tournament.id, updated_ids)
     
     # Mark game as completed if all participants have results
     game = get_tournament_game(db, game_id)
@@ -200,7 +173,7 @@ def submit_game_results_logic(
     if all_have_results:
         game.status = GameStatus.COMPLETED
         game.finished_at = func.now()
-        db.commit()
+    db.commit()
     
     # Send WebSocket notifications
     from services.notification_service import notify_game_result_updated, notify_position_updated, notify_game_completed
@@ -224,13 +197,8 @@ def submit_game_results_logic(
         participant = get_participant(db, result.participant_id)
         participant_battletag = participant.user.battletag if participant and participant.user else "Unknown"
         
-        # Parse positions from JSON if exists
-        positions = None
-        if game_participant.positions:
-            try:
-                positions = json.loads(game_participant.positions)
-            except:
-                positions = None
+        # Positions as a list (None if not set)
+        positions = game_participant.positions_list or None
         
         # Send game_result_updated
         send_websocket_notification_async(
@@ -296,15 +264,16 @@ def clear_game_results_logic(
     
     # Get game participants and clear their results
     game_participants = get_game_participants(db, game_id)
-    cleared_count = 0
+    cleared_ids = []
     
     for game_participant in game_participants:
         if game_participant.points is not None:
             game_participant.points = None
-            cleared_count += 1
-            
-            # Recalculate participant's total score
-            update_participant_total_score(db, game_participant.participant_id)
+            cleared_ids.append(game_participant.participant_id)
+    cleared_count = len(cleared_ids)
+    
+    # Recalculate participants' total scores
+    recalculate_scores(db, game.tournament_id, cleared_ids)
     
     # Reset game status
     game.status = GameStatus.PENDING
@@ -334,7 +303,7 @@ def clear_participant_result_logic(
         raise HTTPException(status_code=404, detail="Participant not found in this game")
     
     # Get old values for logging
-    old_positions = json.loads(game_participant.positions) if game_participant.positions else None
+    old_positions = game_participant.positions_list or None
     old_points = game_participant.points
     
     # Get participant battletag for logging
@@ -342,7 +311,7 @@ def clear_participant_result_logic(
     participant_battletag = participant.user.battletag if participant and participant.user else "Unknown"
     
     # Clear results
-    game_participant.positions = None
+    game_participant.set_positions(None)
     game_participant.points = None
     game_participant.calculated_points = None
     
@@ -353,12 +322,10 @@ def clear_participant_result_logic(
     round_number = round_obj.round_number if round_obj else 1
     is_final = tournament.finals_started and tournament.regular_rounds and round_number > tournament.regular_rounds if tournament else False
     
-    # Спочатку закомітимо очищення, щоб update_participant_total_score бачив очищені значення
+    # Перераховуємо очки в тій самій транзакції (flush робить score engine)
+    recalculate_scores(db, game.tournament_id, [participant_id])
     db.commit()
     
-    # Recalculate participant's total score (тепер він побачить очищені calculated_points)
-    update_participant_total_score(db, participant_id)
-    
     # Send WebSocket notification: game_result_updated (with null positions)
     from services.notification_service import notify_game_result_updated
     send_websocket_notification_async(
@@ -444,14 +411,11 @@ def submit_participant_result_logic(
     if not game_participant:
         raise HTTPException(status_code=404, detail="Participant not found in this game")
     
-    # Update participant result
-    update_data = GameParticipantUpdate(
-        points=result.points
-    )
-    update_game_result(db, game_participant.id, update_data)
+    # Update participant result (у поточній транзакції, commit - нижче)
+    game_participant.points = result.points
     
     # Recalculate participant's total score
-    update_participant_total_score(db, participant_id)
+    recalculate_scores(db, tournament.id, [participant_id])
     
     # Check if all participants have results and mark game as completed
     all_have_results = all(
@@ -503,11 +467,10 @@ def clear_participant_result_logic(
     
     # Очищаємо всі поля результату
     game_participant.points = None
-    game_participant.positions = None
+    game_participant.set_positions(None)
     game_participant.calculated_points = None
     
     # Позначаємо змінені поля
-    attributes.flag_modified(game_participant, "positions")
     attributes.flag_modified(game_participant, "calculated_points")
     
     # Отримуємо турнір та раунд для WebSocket
@@ -522,11 +485,9 @@ def clear_participant_result_logic(
         else False
     )
     
-    # Спочатку закомітимо очищення, щоб update_participant_total_score бачив очищені значення
+    # Перераховуємо total_score та finals_score в тій самій транзакції
+    recalculate_scores(db, game.tournament_id, [participant_id])
     db.commit()
-    
-    # Перераховуємо total_score та finals_score (тепер він побачить очищені calculated_points)
-    update_participant_total_score(db, participant_id)
 
     # Дані про учасника для WebSocket
     participant = get_participant(db, participant_id)
@@ -584,6 +545,8 @@ def submit_positions_batch_logic(
     tournament: Tournament,
     game: TournamentGame
 ):
+    from services.position_board import PositionBoard, validate_positions_shape
+    
     # Check if round is completed
     validate_round_not_completed(db, game)
     
@@ -596,155 +559,118 @@ def submit_positions_batch_logic(
         
     validate_lobby_maker_assigned(game)
     
-    # First, validate all positions for conflicts
-    # Build a map of participant_id -> positions from updates
+    # Build a map of participant_id -> positions from updates (last update wins)
     update_map = {}
     for update in updates:
         participant_id = update.get("participant_id")
         positions = update.get("positions", update.get("position", []))
         
         if participant_id and positions:
-            update_map[participant_id] = positions
+            validate_positions_shape(positions)
+            update_map[participant_id] = sorted(positions)
     
-    # Check for conflicts between updates and existing positions
-    for participant_id, new_positions in update_map.items():
-        validate_position_conflicts(db, game_id, participant_id, new_positions)
+    # Учасники гри з користувачами - одним запитом; далі працюємо лише з цими об'єктами
+    board = PositionBoard.load(db, game_id)
     
-    # Check for conflicts within the batch itself
-    all_positions_in_batch = {}
-    for participant_id, positions in update_map.items():
-        for pos in positions:
-            if pos in all_positions_in_batch:
-                # Get participant info for error message
-                other_participant_id = all_positions_in_batch[pos]
-                p1 = db.query(TournamentParticipant).filter_by(id=participant_id).first()
-                p2 = db.query(TournamentParticipant).filter_by(id=other_participant_id).first()
-                
-                battletag1 = p1.user.battletag if p1 and p1.user else "Unknown"
-                battletag2 = p2.user.battletag if p2 and p2.user else "Unknown"
-                
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Position conflict in batch: Position {pos} assigned to both {battletag1} and {battletag2}"
-                )
-            all_positions_in_batch[pos] = participant_id
-        
-    updated_count = 0
+    # Оновлення для учасників, яких немає в цій грі, пропускаються
+    update_map = {
+        participant_id: positions
+        for participant_id, positions in update_map.items()
+        if board.get(participant_id) is not None
+    }
     
-    for update in updates:
-        participant_id = update.get("participant_id")
-        positions = update.get("positions", update.get("position", []))
-        
-        if not participant_id or not positions:
-            continue
-        
-        # Find game participant
-        game_participants = get_game_participants(db, game_id)
-        game_participant = next(
-            (gp for gp in game_participants if gp.participant_id == participant_id), None
-        )
-        
-        if not game_participant:
-            continue
+    # Validate the final state of the whole game in one pass
+    board.validate(update_map)
+    
+    from sqlalchemy.orm import attributes
+    
+    for participant_id, positions in update_map.items():
+        game_participant = board.get(participant_id)
         
         # Calculate and update
         calculated_points = calculate_points_from_positions(positions)
-        game_participant.positions = json.dumps(sorted(positions))
+        game_participant.set_positions(positions)
         game_participant.calculated_points = calculated_points
         game_participant.points = int(calculated_points)
         
-        from sqlalchemy.orm import attributes
-        attributes.flag_modified(game_participant, "positions")
         attributes.flag_modified(game_participant, "calculated_points")
         attributes.flag_modified(game_participant, "points")
-        
-        updated_count += 1
+    
+    updated_ids = list(update_map)
+    updated_count = len(updated_ids)
     
     # Check if all participants have positions
-    all_have_positions = all(
-        gp.positions is not None for gp in get_game_participants(db, game_id)
-    )
+    all_have_positions = board.all_have_positions()
     
     if all_have_positions:
         game.status = GameStatus.COMPLETED
         game.finished_at = func.now()
     
-    db.commit()
+    # Update total scores for all updated participants (one set-based UPDATE)
+    recalculate_scores(db, tournament.id, updated_ids)
     
     # Get tournament and round info for WebSocket
     from models.tournament_round import TournamentRound
     round_obj = db.query(TournamentRound).filter(TournamentRound.id == game.round_id).first()
     round_number = round_obj.round_number if round_obj else 1
     is_final = tournament.finals_started and tournament.regular_rounds and round_number > tournament.regular_rounds
+    game_status = game.status.value if isinstance(game.status, GameStatus) else "active"
+    
+    # Payload-и сповіщень збираємо до commit: після нього об'єкти expire-ються
+    # і кожне звернення до атрибутів було б окремим SELECT
+    notifications = []
+    for participant_id, positions in update_map.items():
+        game_participant = board.get(participant_id)
+        participant = game_participant.participant
+        notifications.append({
+            "game_participant_id": game_participant.id,
+            "participant_id": participant_id,
+            "user_id": participant.user_id if participant else None,
+            "battletag": board.battletag(participant_id),
+            "positions": positions,
+            "calculated_points": game_participant.calculated_points,
+            "is_lobby_maker": game_participant.is_lobby_maker,
+            # recalculate_scores вже оновив total_score завантажених учасників
+            "total_score": (participant.total_score or 0.0) if participant else 0.0,
+            "final_position": participant.final_position if participant else None,
+        })
+    
+    db.commit()
     
     # Send WebSocket notifications for each updated participant
     from services.notification_service import notify_game_result_updated, notify_position_updated, notify_game_completed
-    from models.tournament_participant import TournamentParticipant
-    from api.crud.participant_crud import get_participant
     
-    for update in updates:
-        participant_id = update.get("participant_id")
-        positions = update.get("positions", update.get("position", []))
-        
-        if not participant_id or not positions:
-            continue
-        
-        # Find game participant
-        game_participants = get_game_participants(db, game_id)
-        game_participant = next(
-            (gp for gp in game_participants if gp.participant_id == participant_id), None
-        )
-        
-        if not game_participant:
-            continue
-        
-        # Get participant info
-        participant = get_participant(db, participant_id)
-        participant_battletag = participant.user.battletag if participant and participant.user else "Unknown"
-        
-        # Send game_result_updated
-        from services.notification_service import notify_game_result_updated
+    for item in notifications:
         send_websocket_notification_async(
             notify_game_result_updated,
             tournament_id=tournament.id,
             game_id=game_id,
             round_number=round_number,
             is_final=is_final,
-            game_participant_id=game_participant.id,
-            participant_id=participant_id,
-            user_id=participant.user_id if participant else None,
-            battletag=participant_battletag,
-            positions=sorted(positions),
-            calculated_points=game_participant.calculated_points,
-            is_lobby_maker=game_participant.is_lobby_maker,
-            game_status=game.status.value if game.status else "active",
+            game_participant_id=item["game_participant_id"],
+            participant_id=item["participant_id"],
+            user_id=item["user_id"],
+            battletag=item["battletag"],
+            positions=item["positions"],
+            calculated_points=item["calculated_points"],
+            is_lobby_maker=item["is_lobby_maker"],
+            game_status=game_status,
             db=None
         )
         
-        # Update total score
-        update_participant_total_score(db, participant_id)
-        
-        # Get updated participant for position_updated
-        updated_participant = db.query(TournamentParticipant).filter(
-            TournamentParticipant.id == participant_id
-        ).first()
-        
-        # Send position_updated
-        if updated_participant:
-            from services.notification_service import notify_position_updated
+        if item["user_id"] is not None:
             send_websocket_notification_async(
                 notify_position_updated,
                 tournament_id=tournament.id,
-                participant_id=participant_id,
-                user_id=updated_participant.user_id,
-                total_score=updated_participant.total_score or 0.0,
-                final_position=updated_participant.final_position,
+                participant_id=item["participant_id"],
+                user_id=item["user_id"],
+                total_score=item["total_score"],
+                final_position=item["final_position"],
                 db=None
             )
     
     # Send game_completed if all positions set
     if all_have_positions:
-        from services.notification_service import notify_game_completed
         send_websocket_notification_async(
             notify_game_completed,
             tournament_id=tournament.id,
@@ -771,70 +697,9 @@ def validate_position_conflicts(
     - Shared positions like [2,3,4] can be used max 3 times
     - Different groups cannot overlap (if [2] is taken, [2,3] cannot be used)
     """
-    game_participants = get_game_participants(db, game_id)
-    new_positions_tuple = tuple(sorted(new_positions))
-    
-    # Count how many times each position group is used
-    position_groups = {}  # {(2,3): count, (5,): count}
+    from services.position_board import PositionBoard
     
-    # Track individual positions and their groups
-    position_to_groups = {}  # {2: [(2,3)], 5: [(5,)]}
-    
-    for gp in game_participants:
-        # Skip the participant we're updating
-        if gp.participant_id == participant_id:
-            continue
-            
-        # Skip participants without positions
-        if not gp.positions:
-            continue
-            
-        try:
-            existing_positions = json.loads(gp.positions)
-            existing_tuple = tuple(sorted(existing_positions))
-            
-            # Count this group
-            position_groups[existing_tuple] = position_groups.get(existing_tuple, 0) + 1
-            
-            # Track which positions belong to which groups
-            for pos in existing_positions:
-                if pos not in position_to_groups:
-                    position_to_groups[pos] = []
-                position_to_groups[pos].append(existing_tuple)
-                
-        except json.JSONDecodeError:
-            continue
-    
-    # Check if new positions conflict
-    # Rule 1: Check if any position in new_positions is already used in a DIFFERENT group
-    for pos in new_positions:
-        if pos in position_to_groups:
-            for existing_group in position_to_groups[pos]:
-                if existing_group != new_positions_tuple:
-                    # This position is used in a different group - conflict!
-                    participant = db.query(TournamentParticipant).join(
-                        GameParticipant, GameParticipant.participant_id == TournamentParticipant.id
-                    ).filter(
-                        GameParticipant.game_id == game_id,
-                        GameParticipant.positions == json.dumps(list(existing_group))
-                    ).first()
-                    
-                    battletag = participant.user.battletag if participant and participant.user else "Unknown"
-                    
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Position conflict: Position {pos} is already used in group {list(existing_group)} by {battletag}. Cannot use in group {new_positions}."
-                    )
-    
-    # Rule 2: Check if this exact group is already used max times
-    current_count = position_groups.get(new_positions_tuple, 0)
-    max_allowed = len(new_positions)  # Group of 2 can be used 2 times, group of 3 can be used 3 times
-    
-    if current_count >= max_allowed:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Position group {new_positions} can only be used {max_allowed} times. Already used {current_count} times."
-        )
+    PositionBoard.load(db, game_id).validate({participant_id: sorted(new_positions)})
 
 
 def submit_participant_position_logic(
@@ -885,7 +750,7 @@ def submit_participant_position_logic(
         raise HTTPException(status_code=404, detail="Participant not found in this game")
     
     # Get old values for logging
-    old_positions = json.loads(game_participant.positions) if game_participant.positions else None
+    old_positions = game_participant.positions_list or None
     old_points = game_participant.points
     
     # Get participant battletag for logging
@@ -895,13 +760,12 @@ def submit_participant_position_logic(
     
     # Calculate points and update
     calculated_points = calculate_points_from_positions(positions)
-    game_participant.positions = json.dumps(sorted(positions))
+    game_participant.set_positions(positions)
     game_participant.calculated_points = calculated_points
     game_participant.points = int(calculated_points)
     
     # Mark as modified to ensure SQLAlchemy tracks the change
     from sqlalchemy.orm import attributes
-    attributes.flag_modified(game_participant, "positions")
     attributes.flag_modified(game_participant, "calculated_points")
     attributes.flag_modified(game_participant, "points")
     
@@ -914,7 +778,9 @@ def submit_participant_position_logic(
         game.status = GameStatus.COMPLETED
         game.finished_at = func.now()
     
-    # Commit changes first before recalculating total score
+    # Recalculate total score in the same transaction
+    recalculate_scores(db, tournament.id, [participant_id])
+    
     db.commit()
     db.refresh(game_participant)
     
@@ -950,9 +816,6 @@ def submit_participant_position_logic(
         db=None
     )
     
-    # Now recalculate total score after commit
-    update_participant_total_score(db, participant_id)
-    
     # Get updated participant for position_updated notification
     from models.tournament_participant import TournamentParticipant
     updated_participant = db.query(TournamentParticipant).filter(
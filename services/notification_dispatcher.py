@@ -0,0 +1,165 @@
+"""
+Диспетчер WebSocket сповіщень, що живе в event loop застосунку.
+
+Замість окремого потоку + asyncio.run на кожне повідомлення всі notify_*
+корутини ставляться в обмежену чергу і виконуються фіксованим пулом
+воркерів у тому ж loop, якому належать websocket-з'єднання uvicorn.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+NotificationJob = Tuple[Callable[..., Awaitable[Any]], Dict[str, Any]]
+
+
+class NotificationDispatcher:
+    """Обмежена черга сповіщень + пул воркерів у event loop застосунку"""
+
+    def __init__(self, max_queue_size: int = 1000, workers: int = 4):
+        self.max_queue_size = max_queue_size
+        self.workers_count = workers
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list = []
+        self._lock = threading.Lock()
+
+        # Метрики backpressure
+        self.enqueued = 0
+        self.dropped = 0
+        self.processed = 0
+        self.failed = 0
+        self.max_depth = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop is not None and not self._loop.is_closed() and bool(self._workers)
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Запустити воркери в поточному (або переданому) event loop"""
+        if self.is_running:
+            return
+
+        self._loop = loop or asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            self._loop.create_task(self._worker(i))
+            for i in range(self.workers_count)
+        ]
+        logger.info(
+            f"Notification dispatcher started: {self.workers_count} workers, "
+            f"queue size {self.max_queue_size}"
+        )
+
+    async def stop(self, timeout: float = 5.0):
+        """Дочекатися відправки черги (з таймаутом) і зупинити воркери"""
+        if not self._workers:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Notification dispatcher stopped with {self._queue.qsize()} pending notifications"
+            )
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+        self._workers = []
+        self._queue = None
+        self._loop = None
+        logger.info("Notification dispatcher stopped")
+
+    def enqueue(self, notification_func: Callable[..., Awaitable[Any]], **kwargs) -> bool:
+        """
+        Поставити сповіщення в чергу. Безпечно викликати як з event loop,
+        так і з інших потоків (threadpool для sync-ендпоінтів).
+
+        Повертає False, якщо сповіщення відкинуто (черга переповнена
+        або event loop недоступний).
+        """
+        job = (notification_func, kwargs)
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        with self._lock:
+            # Ліниве піднімання воркерів, якщо startup-хук ще не спрацював
+            if not self.is_running and running_loop is not None:
+                self.start(running_loop)
+
+        if not self.is_running:
+            self.dropped += 1
+            logger.warning(
+                f"Notification {getattr(notification_func, '__name__', notification_func)} "
+                f"dropped: dispatcher is not running"
+            )
+            return False
+
+        if running_loop is self._loop:
+            return self._put(job)
+
+        # Виклик з іншого потоку - передаємо в loop, якому належать websocket-и
+        self._loop.call_soon_threadsafe(self._put, job)
+        return True
+
+    def _put(self, job: NotificationJob) -> bool:
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(
+                f"Notification queue is full ({self.max_queue_size}), "
+                f"dropping {getattr(job[0], '__name__', job[0])}"
+            )
+            return False
+
+        self.enqueued += 1
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    async def _worker(self, worker_id: int):
+        while True:
+            notification_func, kwargs = await self._queue.get()
+            try:
+                await notification_func(**kwargs)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(
+                    f"Error sending WebSocket notification "
+                    f"{getattr(notification_func, '__name__', notification_func)}: {e}"
+                )
+            finally:
+                self._queue.task_done()
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Метрики черги для моніторингу"""
+        return {
+            "workers": len(self._workers),
+            "queue_size": self.max_queue_size,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+
+# Глобальний екземпляр диспетчера
+notification_dispatcher = NotificationDispatcher(
+    max_queue_size=settings.notification_queue_size,
+    workers=settings.notification_workers,
+)
@@ -1,143 +1,104 @@
 """
 Сервіс для відправки WebSocket повідомлень про події турніру.
+
+Корутини виконуються воркерами notification_dispatcher в event loop застосунку
+(там же обслуговуються всі /ws сокети), тому БД тут не читається: назву турніру,
+фіналістів тощо передає той, хто ставить повідомлення в чергу.
 """
-import asyncio
 import logging
 from datetime import datetime
 from services.websocket_manager import websocket_manager
-from db import SessionLocal
 
 logger = logging.getLogger(__name__)
 
 
-async def notify_tournament_started(tournament_id: int, current_round: int, db=None):
+async def notify_tournament_started(tournament_id: int, current_round: int, tournament_name: str = None):
     """Відправити сповіщення про старт турніру"""
-    # Створюємо нову сесію якщо не передана
-    if db is None:
-        db = SessionLocal()
-        should_close = True
-    else:
-        should_close = False
+    message = {
+        "type": "tournament_started",
+        "tournament_id": tournament_id,
+        "tournament_name": tournament_name,
+        "current_round": current_round,
+        "priority": "high",
+        "requires_action": True,
+        "sound": "tournament_start",
+        "title": "🏆 Tournament Started!",
+        "message": f"Tournament '{tournament_name or 'Unknown'}' has started! Check your round and add the lobby maker as a friend in-game.",
+        "action_text": "Add lobby maker as friend",
+        "icon": "🏆"
+    }
     
-    try:
-        # Отримуємо інформацію про турнір
-        from models.tournament import Tournament
-        tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
-        
-        message = {
-            "type": "tournament_started",
-            "tournament_id": tournament_id,
-            "tournament_name": tournament.name if tournament else None,
-            "current_round": current_round,
-            "priority": "high",
-            "requires_action": True,
-            "sound": "tournament_start",
-            "title": "🏆 Tournament Started!",
-            "message": f"Tournament '{tournament.name if tournament else 'Unknown'}' has started! Check your round and add the lobby maker as a friend in-game.",
-            "action_text": "Add lobby maker as friend",
-            "icon": "🏆"
-        }
-        
-        await websocket_manager.broadcast_to_tournament(tournament_id, message, db)
-        logger.info(f"Sent tournament_started notification for tournament {tournament_id}")
-    finally:
-        if should_close:
-            db.close()
+    await websocket_manager.broadcast_to_tournament(tournament_id, message)
+    logger.info(f"Sent tournament_started notification for tournament {tournament_id}")
 
 
-async def notify_round_started(tournament_id: int, round_number: int, is_final: bool = False, final_round_number: int = None, db=None):
+async def notify_round_started(
+    tournament_id: int,
+    round_number: int,
+    is_final: bool = False,
+    final_round_number: int = None,
+    tournament_name: str = None
+):
     """Відправити сповіщення про старт раунду"""
-    # Створюємо нову сесію якщо не передана
-    if db is None:
-        db = SessionLocal()
-        should_close = True
+    if is_final and final_round_number:
+        round_name = f"Final {final_round_number}"
+        round_display = f"Final {final_round_number}"
+        icon = "🏆"
+    elif is_final:
+        round_name = f"Final {round_number}"
+        round_display = f"Final {round_number}"
+        icon = "🏆"
     else:
-        should_close = False
+        round_name = f"Round {round_number}"
+        round_display = f"Round {round_number}"
+        icon = "⚔️"
+    
+    message = {
+        "type": "round_started",
+        "tournament_id": tournament_id,
+        "tournament_name": tournament_name,
+        "round_number": round_number,
+        "is_final": is_final,
+        "round_name": round_name,
+        "priority": "high",
+        "requires_action": True,
+        "sound": "round_start",
+        "title": f"{icon} {round_display} Started!",
+        "message": f"{round_display} of tournament '{tournament_name or 'Unknown'}' has started! Check your game and add the lobby maker as a friend.",
+        "action_text": "Add lobby maker as friend",
+        "icon": icon
+    }
     
-    try:
-        if is_final and final_round_number:
-            round_name = f"Final {final_round_number}"
-            round_display = f"Final {final_round_number}"
-            icon = "🏆"
-        elif is_final:
-            round_name = f"Final {round_number}"
-            round_display = f"Final {round_number}"
-            icon = "🏆"
-        else:
-            round_name = f"Round {round_number}"
-            round_display = f"Round {round_number}"
-            icon = "⚔️"
-        
-        # Отримуємо інформацію про турнір
-        from models.tournament import Tournament
-        tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
-        
-        message = {
-            "type": "round_started",
-            "tournament_id": tournament_id,
-            "tournament_name": tournament.name if tournament else None,
-            "round_number": round_number,
-            "is_final": is_final,
-            "round_name": round_name,
-            "priority": "high",
-            "requires_action": True,
-            "sound": "round_start",
-            "title": f"{icon} {round_display} Started!",
-            "message": f"{round_display} of tournament '{tournament.name if tournament else 'Unknown'}' has started! Check your game and add the lobby maker as a friend.",
-            "action_text": "Add lobby maker as friend",
-            "icon": icon
-        }
-        
-        await websocket_manager.broadcast_to_tournament(tournament_id, message, db)
-        logger.info(f"Sent round_started notification for tournament {tournament_id}, round {round_number}")
-    finally:
-        if should_close:
-            db.close()
+    await websocket_manager.broadcast_to_tournament(tournament_id, message)
+    logger.info(f"Sent round_started notification for tournament {tournament_id}, round {round_number}")
 
 
-async def notify_finals_started(tournament_id: int, current_round: int, finalists_count: int, db=None):
+async def notify_finals_started(
+    tournament_id: int,
+    current_round: int,
+    finalist_user_ids: list,
+    tournament_name: str = None
+):
     """Відправити сповіщення про старт фіналів тільки фіналістам (топ-N гравцям)"""
-    # Створюємо нову сесію якщо не передана
-    if db is None:
-        db = SessionLocal()
-        should_close = True
-    else:
-        should_close = False
+    finalists_count = len(finalist_user_ids)
+    message = {
+        "type": "finals_started",
+        "tournament_id": tournament_id,
+        "tournament_name": tournament_name,
+        "current_round": current_round,
+        "finalists_count": finalists_count,
+        "priority": "high",
+        "requires_action": True,
+        "sound": "finals_start",
+        "title": "🏆 Finals Started!",
+        "message": f"Finals of tournament '{tournament_name or 'Unknown'}' have started! You are in the top {finalists_count} players. Check your game and add the lobby maker as a friend.",
+        "action_text": "Add lobby maker as friend",
+        "icon": "🏆"
+    }
     
-    try:
-        # Отримуємо інформацію про турнір
-        from models.tournament import Tournament
-        from models.tournament_participant import TournamentParticipant
-        tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
-        
-        # Отримуємо тільки топ-N гравців (фіналістів)
-        top_participants = db.query(TournamentParticipant).filter(
-            TournamentParticipant.tournament_id == tournament_id
-        ).order_by(TournamentParticipant.total_score.desc()).limit(finalists_count).all()
-        
-        finalist_user_ids = [p.user_id for p in top_participants]
-        
-        message = {
-            "type": "finals_started",
-            "tournament_id": tournament_id,
-            "tournament_name": tournament.name if tournament else None,
-            "current_round": current_round,
-            "finalists_count": finalists_count,
-            "priority": "high",
-            "requires_action": True,
-            "sound": "finals_start",
-            "title": "🏆 Finals Started!",
-            "message": f"Finals of tournament '{tournament.name if tournament else 'Unknown'}' have started! You are in the top {finalists_count} players. Check your game and add the lobby maker as a friend.",
-            "action_text": "Add lobby maker as friend",
-            "icon": "🏆"
-        }
-        
-        # Відправляємо тільки фіналістам (якщо вони підключені)
-        await websocket_manager.broadcast_to_users(finalist_user_ids, message)
-        logger.info(f"Sent finals_started notification to {len(finalist_user_ids)} finalists for tournament {tournament_id}")
-    finally:
-        if should_close:
-            db.close()
+    # Відправляємо тільки фіналістам (якщо вони підключені)
+    await websocket_manager.broadcast_to_users(finalist_user_ids, message)
+    logger.info(f"Sent finals_started notification to {finalists_count} finalists for tournament {tournament_id}")
 
 
 async def notify_next_round_created(
@@ -145,100 +106,70 @@ async def notify_next_round_created(
     round_number: int,
     is_final: bool = False,
     final_round_number: int = None,
-    db=None
+    tournament_name: str = None
 ):
     """Відправити сповіщення про створення нового раунду (з force_reload для перезавантаження табу)"""
     logger.info(f"[NOTIFY] Starting next_round_created for tournament {tournament_id}, round {round_number}, is_final={is_final}")
     
-    # Створюємо нову сесію якщо не передана
-    if db is None:
-        db = SessionLocal()
-        should_close = True
+    if is_final and final_round_number:
+        round_name = f"Final {final_round_number}"
+        round_display = f"Final {final_round_number}"
+        icon = "🏆"
+    elif is_final:
+        round_name = f"Final {round_number}"
+        round_display = f"Final {round_number}"
+        icon = "🏆"
     else:
-        should_close = False
+        round_name = f"Round {round_number}"
+        round_display = f"Round {round_number}"
+        icon = "⚔️"
+    
+    message = {
+        "type": "next_round_created",
+        "tournament_id": tournament_id,
+        "tournament_name": tournament_name,
+        "round_number": round_number,
+        "is_final": is_final,
+        "round_name": round_name,
+        "force_reload": True,  # Змусити фронтенд перезавантажити таб
+        "show_notification": False,  # За замовчуванням false - фронтенд сам вирішить, чи показувати пушап
+        "priority": "high",
+        "requires_action": True,
+        "sound": "round_start",
+        "title": f"{icon} {round_display} Created!",
+        "message": f"{round_display} of tournament '{tournament_name or 'Unknown'}' has been created. The page will reload to show the new round.",
+        "action_text": "Add lobby maker as friend",
+        "icon": icon,
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
+    
+    logger.info(f"[NOTIFY] Message prepared: type={message['type']}, tournament_id={message['tournament_id']}, round_number={message['round_number']}, force_reload={message['force_reload']}, show_notification={message['show_notification']}")
+    
+    # Відправляємо всім підключеним (для оновлення UI)
+    # Фронтенд сам вирішить, чи показувати пушап, перевіривши чи користувач є учасником
+    await websocket_manager.broadcast_to_all(message)
     
-    try:
-        if is_final and final_round_number:
-            round_name = f"Final {final_round_number}"
-            round_display = f"Final {final_round_number}"
-            icon = "🏆"
-        elif is_final:
-            round_name = f"Final {round_number}"
-            round_display = f"Final {round_number}"
-            icon = "🏆"
-        else:
-            round_name = f"Round {round_number}"
-            round_display = f"Round {round_number}"
-            icon = "⚔️"
-        
-        # Отримуємо інформацію про турнір
-        from models.tournament import Tournament
-        tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
-        
-        message = {
-            "type": "next_round_created",
-            "tournament_id": tournament_id,
-            "tournament_name": tournament.name if tournament else None,
-            "round_number": round_number,
-            "is_final": is_final,
-            "round_name": round_name,
-            "force_reload": True,  # Змусити фронтенд перезавантажити таб
-            "show_notification": False,  # За замовчуванням false - фронтенд сам вирішить, чи показувати пушап
-            "priority": "high",
-            "requires_action": True,
-            "sound": "round_start",
-            "title": f"{icon} {round_display} Created!",
-            "message": f"{round_display} of tournament '{tournament.name if tournament else 'Unknown'}' has been created. The page will reload to show the new round.",
-            "action_text": "Add lobby maker as friend",
-            "icon": icon,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
-        
-        logger.info(f"[NOTIFY] Message prepared: type={message['type']}, tournament_id={message['tournament_id']}, round_number={message['round_number']}, force_reload={message['force_reload']}, show_notification={message['show_notification']}")
-        
-        # Відправляємо всім підключеним (для оновлення UI)
-        # Фронтенд сам вирішить, чи показувати пушап, перевіривши чи користувач є учасником
-        await websocket_manager.broadcast_to_all(message)
-        
-        logger.info(f"[NOTIFY] Sent next_round_created notification to all connected users for tournament {tournament_id}, round {round_number}")
-    finally:
-        if should_close:
-            db.close()
+    logger.info(f"[NOTIFY] Sent next_round_created notification to all connected users for tournament {tournament_id}, round {round_number}")
 
 
-async def notify_tournament_finished(tournament_id: int, db=None):
+async def notify_tournament_finished(tournament_id: int, tournament_name: str = None):
     """Відправити сповіщення про завершення турніру (з force_reload для перезавантаження табу)"""
-    # Створюємо нову сесію якщо не передана
-    if db is None:
-        db = SessionLocal()
-        should_close = True
-    else:
-        should_close = False
+    message = {
+        "type": "tournament_finished",
+        "tournament_id": tournament_id,
+        "tournament_name": tournament_name,
+        "force_reload": True,  # Змусити фронтенд перезавантажити таб
+        "priority": "high",  # Змінено з "medium" на "high"
+        "requires_action": False,
+        "sound": "tournament_finished",
+        "title": "✅ Tournament Finished",
+        "message": f"Tournament '{tournament_name or 'Unknown'}' has finished. The page will reload to show the final results.",
+        "icon": "✅",
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
     
-    try:
-        # Отримуємо інформацію про турнір
-        from models.tournament import Tournament
-        tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
-        
-        message = {
-            "type": "tournament_finished",
-            "tournament_id": tournament_id,
-            "tournament_name": tournament.name if tournament else None,
-            "force_reload": True,  # Змусити фронтенд перезавантажити таб
-            "priority": "high",  # Змінено з "medium" на "high"
-            "requires_action": False,
-            "sound": "tournament_finished",
-            "title": "✅ Tournament Finished",
-            "message": f"Tournament '{tournament.name if tournament else 'Unknown'}' has finished. The page will reload to show the final results.",
-            "icon": "✅",
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
-        
-        await websocket_manager.broadcast_to_tournament(tournament_id, message, db)
-        logger.info(f"Sent tournament_finished notification for tournament {tournament_id}")
-    finally:
-        if should_close:
-            db.close()
+    await websocket_manager.broadcast_to_tournament(tournament_id, message)
+    logger.info(f"Sent tournament_finished notification for tournament {tournament_id}")
 
 
 async def notify_game_result_updated(
@@ -257,39 +188,29 @@ async def notify_game_result_updated(
     db=None
 ):
     """Відправити сповіщення про оновлення результату гри"""
-    if db is None:
-        db = SessionLocal()
-        should_close = True
-    else:
-        should_close = False
+    from datetime import datetime
+    message = {
+        "type": "game_result_updated",
+        "tournament_id": tournament_id,
+        "game_id": game_id,
+        "round_number": round_number,
+        "is_final": is_final,
+        "updated_participant": {
+            "id": game_participant_id,  # ID з game_participants
+            "participant_id": participant_id,  # ID з tournament_participants
+            "user_id": user_id,
+            "battletag": battletag,
+            "position": positions,  # Масив позицій або null
+            "calculated_points": calculated_points,
+            "is_lobby_maker": is_lobby_maker
+        },
+        "game_status": game_status,  # 'pending' | 'active' | 'completed'
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
     
-    try:
-        from datetime import datetime
-        message = {
-            "type": "game_result_updated",
-            "tournament_id": tournament_id,
-            "game_id": game_id,
-            "round_number": round_number,
-            "is_final": is_final,
-            "updated_participant": {
-                "id": game_participant_id,  # ID з game_participants
-                "participant_id": participant_id,  # ID з tournament_participants
-                "user_id": user_id,
-                "battletag": battletag,
-                "position": positions,  # Масив позицій або null
-                "calculated_points": calculated_points,
-                "is_lobby_maker": is_lobby_maker
-            },
-            "game_status": game_status,  # 'pending' | 'active' | 'completed'
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
-        
-        # Відправляємо всім підключеним (не тільки учасникам турніру)
-        await websocket_manager.broadcast_to_all(message)
-        logger.info(f"Sent game_result_updated notification for game {game_id}, participant {participant_id}")
-    finally:
-        if should_close:
-            db.close()
+    # Відправляємо всім підключеним (не тільки учасникам турніру)
+    await websocket_manager.broadcast_to_all(message)
+    logger.info(f"Sent game_result_updated notification for game {game_id}, participant {participant_id}")
 
 
 async def notify_game_completed(
@@ -300,29 +221,19 @@ async def notify_game_completed(
     db=None
 ):
     """Відправити сповіщення про завершення гри"""
-    if db is None:
-        db = SessionLocal()
-        should_close = True
-    else:
-        should_close = False
+    from datetime import datetime
+    message = {
+        "type": "game_completed",
+        "tournament_id": tournament_id,
+        "game_id": game_id,
+        "round_number": round_number,
+        "is_final": is_final,
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
     
-    try:
-        from datetime import datetime
-        message = {
-            "type": "game_completed",
-            "tournament_id": tournament_id,
-            "game_id": game_id,
-            "round_number": round_number,
-            "is_final": is_final,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
-        
-        # Відправляємо всім підключеним (не тільки учасникам турніру)
-        await websocket_manager.broadcast_to_all(message)
-        logger.info(f"Sent game_completed notification for game {game_id}")
-    finally:
-        if should_close:
-            db.close()
+    # Відправляємо всім підключеним (не тільки учасникам турніру)
+    await websocket_manager.broadcast_to_all(message)
+    logger.info(f"Sent game_completed notification for game {game_id}")
 
 
 async def notify_position_updated(
@@ -335,34 +246,24 @@ async def notify_position_updated(
     db=None
 ):
     """Відправити сповіщення про оновлення загальних очок учасника"""
-    if db is None:
-        db = SessionLocal()
-        should_close = True
-    else:
-        should_close = False
+    from datetime import datetime
+    message = {
+        "type": "position_updated",
+        "tournament_id": tournament_id,
+        "participant_id": participant_id,  # ID з tournament_participants
+        "user_id": user_id,
+        "total_score": total_score,
+        "final_position": final_position,  # Фінальна позиція (якщо є)
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
     
-    try:
-        from datetime import datetime
-        message = {
-            "type": "position_updated",
-            "tournament_id": tournament_id,
-            "participant_id": participant_id,  # ID з tournament_participants
-            "user_id": user_id,
-            "total_score": total_score,
-            "final_position": final_position,  # Фінальна позиція (якщо є)
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
-        
-        # Додаємо finals_score, якщо передано (для фінальних ігор)
-        if finals_score is not None:
-            message["finals_score"] = finals_score
-        
-        # Відправляємо всім підключеним (не тільки учасникам турніру)
-        await websocket_manager.broadcast_to_all(message)
-        logger.info(f"Sent position_updated notification for participant {participant_id}, total_score: {total_score}, finals_score: {finals_score}")
-    finally:
-        if should_close:
-            db.close()
+    # Додаємо finals_score, якщо передано (для фінальних ігор)
+    if finals_score is not None:
+        message["finals_score"] = finals_score
+    
+    # Відправляємо всім підключеним (не тільки учасникам турніру)
+    await websocket_manager.broadcast_to_all(message)
+    logger.info(f"Sent position_updated notification for participant {participant_id}, total_score: {total_score}, finals_score: {finals_score}")
 
 
 async def notify_lobby_maker_assigned(
@@ -371,42 +272,26 @@ async def notify_lobby_maker_assigned(
     round_number: int,
     lobby_maker_id: int,
     lobby_maker_participant_id: int,
-    lobby_maker_battletag: str = None,
+    lobby_maker_battletag: str = "Unknown",
     db=None
 ):
     """Відправити сповіщення про призначення лоббі мейкера"""
-    if db is None:
-        db = SessionLocal()
-        should_close = True
-    else:
-        should_close = False
+    from datetime import datetime
+    
+    message = {
+        "type": "lobby_maker_assigned",
+        "tournament_id": tournament_id,
+        "game_id": game_id,
+        "round_number": round_number,
+        "lobby_maker_id": lobby_maker_id,  # ID користувача (user_id)
+        "lobby_maker_participant_id": lobby_maker_participant_id,  # ID з game_participants
+        "lobby_maker_battletag": lobby_maker_battletag,
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
     
-    try:
-        from datetime import datetime
-        
-        # Якщо battletag не передано, отримуємо з БД
-        if lobby_maker_battletag is None:
-            from models.user import User
-            user = db.query(User).filter(User.id == lobby_maker_id).first()
-            lobby_maker_battletag = user.battletag if user else "Unknown"
-        
-        message = {
-            "type": "lobby_maker_assigned",
-            "tournament_id": tournament_id,
-            "game_id": game_id,
-            "round_number": round_number,
-            "lobby_maker_id": lobby_maker_id,  # ID користувача (user_id)
-            "lobby_maker_participant_id": lobby_maker_participant_id,  # ID з game_participants
-            "lobby_maker_battletag": lobby_maker_battletag,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
-        
-        # Відправляємо всім підключеним (для оновлення UI)
-        await websocket_manager.broadcast_to_all(message)
-        logger.info(f"[NOTIFY] Sent lobby_maker_assigned notification for game {game_id}, lobby_maker_id: {lobby_maker_id}")
-    finally:
-        if should_close:
-            db.close()
+    # Відправляємо всім підключеним (для оновлення UI)
+    await websocket_manager.broadcast_to_all(message)
+    logger.info(f"[NOTIFY] Sent lobby_maker_assigned notification for game {game_id}, lobby_maker_id: {lobby_maker_id}")
 
 
 async def notify_lobby_maker_removed(
@@ -416,28 +301,18 @@ async def notify_lobby_maker_removed(
     db=None
 ):
     """Відправити сповіщення про видалення лоббі мейкера"""
-    if db is None:
-        db = SessionLocal()
-        should_close = True
-    else:
-        should_close = False
+    from datetime import datetime
+    message = {
+        "type": "lobby_maker_removed",
+        "tournament_id": tournament_id,
+        "game_id": game_id,
+        "round_number": round_number,
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
     
-    try:
-        from datetime import datetime
-        message = {
-            "type": "lobby_maker_removed",
-            "tournament_id": tournament_id,
-            "game_id": game_id,
-            "round_number": round_number,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
-        
-        # Відправляємо всім підключеним (для оновлення UI)
-        await websocket_manager.broadcast_to_all(message)
-        logger.info(f"[NOTIFY] Sent lobby_maker_removed notification for game {game_id}")
-    finally:
-        if should_close:
-            db.close()
+    # Відправляємо всім підключеним (для оновлення UI)
+    await websocket_manager.broadcast_to_all(message)
+    logger.info(f"[NOTIFY] Sent lobby_maker_removed notification for game {game_id}")
 
 
 def send_notification_async(tournament_id: int, notification_type: str, **kwargs):
@@ -445,37 +320,36 @@ def send_notification_async(tournament_id: int, notification_type: str, **kwargs
     Асинхронна відправка повідомлення (не блокує основний потік).
     Використовується для неблокуючих сповіщень.
     """
-    async def _send():
-        try:
-            if notification_type == "tournament_started":
-                await notify_tournament_started(tournament_id, kwargs.get("current_round", 1))
-            elif notification_type == "round_started":
-                await notify_round_started(
-                    tournament_id, 
-                    kwargs.get("round_number", 1),
-                    kwargs.get("is_final", False)
-                )
-            elif notification_type == "finals_started":
-                await notify_finals_started(
-                    tournament_id,
-                    kwargs.get("current_round", 1),
-                    kwargs.get("finalists_count", 0)
-                )
-            elif notification_type == "tournament_finished":
-                await notify_tournament_finished(tournament_id)
-        except Exception as e:
-            logger.error(f"Error sending notification {notification_type} for tournament {tournament_id}: {e}")
+    from services.notification_dispatcher import notification_dispatcher
     
-    # Запускаємо в окремому потоці (не блокує основний запит)
-    try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # Якщо loop вже запущений, створюємо task
-            asyncio.create_task(_send())
-        else:
-            # Якщо loop не запущений, запускаємо
-            loop.run_until_complete(_send())
-    except RuntimeError:
-        # Якщо немає event loop, створюємо новий
-        asyncio.run(_send())
-
+    if notification_type == "tournament_started":
+        notification_dispatcher.enqueue(
+            notify_tournament_started,
+            tournament_id=tournament_id,
+            current_round=kwargs.get("current_round", 1),
+            tournament_name=kwargs.get("tournament_name")
+        )
+    elif notification_type == "round_started":
+        notification_dispatcher.enqueue(
+            notify_round_started,
+            tournament_id=tournament_id,
+            round_number=kwargs.get("round_number", 1),
+            is_final=kwargs.get("is_final", False),
+            tournament_name=kwargs.get("tournament_name")
+        )
+    elif notification_type == "finals_started":
+        notification_dispatcher.enqueue(
+            notify_finals_started,
+            tournament_id=tournament_id,
+            current_round=kwargs.get("current_round", 1),
+            finalist_user_ids=kwargs.get("finalist_user_ids", []),
+            tournament_name=kwargs.get("tournament_name")
+        )
+    elif notification_type == "tournament_finished":
+        notification_dispatcher.enqueue(
+            notify_tournament_finished,
+            tournament_id=tournament_id,
+            tournament_name=kwargs.get("tournament_name")
+        )
+    else:
+        logger.warning(f"Unknown notification type {notification_type} for tournament {tournament_id}")
@@ -0,0 +1,204 @@
+"""
+Pairing engine: розподіл учасників по лобі (по 8) для раунду.
+
+Стратегії зареєстровані в PAIRING_STRATEGIES і працюють лише в пам'яті,
+на компактних цілочисельних масивах: учасники перенумеровуються в індекси
+0..n-1, сила (рейтинг або total_score) - список, історія зустрічей -
+матриця співпадінь n*n у array('H'). Стратегія повертає лобі як списки
+індексів, plan_lobbies мапить їх назад у participant_id.
+
+- RANDOM:            перемішування (seedable RNG)
+- SCORE:             послідовні блоки по 8 за силою (проста швейцарка)
+- BALANCED:          snake draft за силою: 1->A, 2->B, 3->B, 4->A, ...
+- STRONG_VS_STRONG:  те саме, що SCORE, але для першого раунду за рейтингом
+- SWISS:             score-bracket швейцарка з мінімізацією повторних зустрічей
+"""
+import random
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+PLAYERS_PER_GAME = 8
+
+# Скільки наступних за силою кандидатів SWISS розглядає для кожного місця в лобі
+DEFAULT_SWISS_WINDOW = 8
+
+DEFAULT_STRATEGY = "RANDOM"
+
+
+class CoOccurrence:
+    """Скільки разів кожна пара індексів уже грала в одному лобі (матриця n*n)"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.counts = array("H", bytes(2 * n * n))
+
+    @classmethod
+    def from_games(cls, index_of: Dict[int, int], games: Iterable[Iterable[int]]) -> "CoOccurrence":
+        """games - склад попередніх ігор у participant_id; невідомі id ігноруються"""
+        matrix = cls(len(index_of))
+        for game in games:
+            matrix.add_lobby([index_of[pid] for pid in game if pid in index_of])
+        return matrix
+
+    def add_lobby(self, lobby: Sequence[int]):
+        n, counts = self.n, self.counts
+        for a in lobby:
+            row = a * n
+            for b in lobby:
+                if a != b:
+                    counts[row + b] += 1
+
+    def get(self, a: int, b: int) -> int:
+        return self.counts[a * self.n + b]
+
+    def cost(self, candidate: int, lobby: Sequence[int]) -> int:
+        """Кількість повторних зустрічей candidate з уже набраним лобі"""
+        row = candidate * self.n
+        counts = self.counts
+        return sum(counts[row + member] for member in lobby)
+
+
+PairingFunc = Callable[[Sequence[float], int, random.Random, Optional[CoOccurrence]], List[List[int]]]
+
+PAIRING_STRATEGIES: Dict[str, PairingFunc] = {}
+
+
+def register_pairing(name: str):
+    """Декоратор реєстрації стратегії: fn(strength, games_count, rng, history) -> лобі з індексів"""
+    def decorator(fn: PairingFunc) -> PairingFunc:
+        PAIRING_STRATEGIES[name] = fn
+        return fn
+    return decorator
+
+
+def get_pairing(name: Optional[str]) -> PairingFunc:
+    """Стратегія за назвою; невідомі назви (і None) - RANDOM, як і раніше"""
+    return PAIRING_STRATEGIES.get(name or DEFAULT_STRATEGY, PAIRING_STRATEGIES[DEFAULT_STRATEGY])
+
+
+def _by_strength(strength: Sequence[float]) -> List[int]:
+    """Індекси за спаданням сили; при рівності - у вхідному порядку (стабільне сортування)"""
+    return sorted(range(len(strength)), key=strength.__getitem__, reverse=True)
+
+
+def _fill(order: Sequence[int], games_count: int) -> List[List[int]]:
+    """Послідовні блоки по 8 (зайві учасники не потрапляють у раунд)"""
+    return [
+        list(order[g * PLAYERS_PER_GAME:(g + 1) * PLAYERS_PER_GAME])
+        for g in range(games_count)
+    ]
+
+
+@register_pairing("RANDOM")
+def pair_random(strength, games_count, rng, history=None):
+    order = list(range(len(strength)))
+    rng.shuffle(order)
+    return _fill(order, games_count)
+
+
+@register_pairing("SCORE")
+@register_pairing("STRONG_VS_STRONG")
+def pair_by_strength(strength, games_count, rng, history=None):
+    return _fill(_by_strength(strength), games_count)
+
+
+@register_pairing("BALANCED")
+def pair_balanced(strength, games_count, rng, history=None):
+    lobbies = [[] for _ in range(games_count)]
+    if not games_count:
+        return lobbies
+    # Цикл: 0, 1, ... N-1, N-1, ... 1, 0
+    cycle_len = games_count * 2
+    for i, index in enumerate(_by_strength(strength)[:games_count * PLAYERS_PER_GAME]):
+        pos_in_cycle = i % cycle_len
+        game_idx = pos_in_cycle if pos_in_cycle < games_count else cycle_len - 1 - pos_in_cycle
+        lobbies[game_idx].append(index)
+    return lobbies
+
+
+@register_pairing("SWISS")
+def pair_swiss(strength, games_count, rng, history=None, window: int = DEFAULT_SWISS_WINDOW):
+    """
+    Лобі набираються зверху вниз за силою. Перше місце - найсильніший вільний
+    гравець, кожне наступне - кандидат із найменшою кількістю повторних зустрічей
+    серед `window` наступних за силою (при рівності - ближчий за силою).
+    Без історії результат збігається з SCORE.
+    """
+    order = _by_strength(strength)[:games_count * PLAYERS_PER_GAME]
+    if history is None:
+        return _fill(order, games_count)
+
+    lobbies = []
+    remaining = order
+    for _ in range(games_count):
+        lobby = [remaining.pop(0)]
+        while len(lobby) < PLAYERS_PER_GAME and remaining:
+            best_k, best_cost = 0, None
+            for k in range(min(window, len(remaining))):
+                cost = history.cost(remaining[k], lobby)
+                if best_cost is None or cost < best_cost:
+                    best_k, best_cost = k, cost
+                    if not cost:
+                        break
+            lobby.append(remaining.pop(best_k))
+        lobbies.append(lobby)
+    return lobbies
+
+
+def plan_lobbies(
+    strategy: Optional[str],
+    participant_ids: Sequence[int],
+    games_count: int,
+    strength: Optional[Sequence[float]] = None,
+    history: Optional[Iterable[Iterable[int]]] = None,
+    rng: Optional[random.Random] = None,
+    seed: Optional[int] = None,
+) -> List[List[int]]:
+    """
+    Розподілити participant_ids по games_count лобі.
+    strength - рейтинг/очки в тому ж порядку (None - усі рівні),
+    history - склад попередніх ігор (списки participant_id) для SWISS.
+    Повертає план: список participant_id для кожної гри.
+    """
+    if rng is None:
+        rng = random.Random(seed)
+    if strength is None:
+        strength = [0] * len(participant_ids)
+    matrix = None
+    if history is not None:
+        matrix = CoOccurrence.from_games({pid: i for i, pid in enumerate(participant_ids)}, history)
+
+    lobbies = get_pairing(strategy)(strength, games_count, rng, matrix)
+    return [[participant_ids[i] for i in lobby] for lobby in lobbies]
+
+
+def lobby_metrics(
+    plan: Sequence[Sequence[int]],
+    strength: Dict[int, float],
+    history: Optional[Iterable[Iterable[int]]] = None,
+) -> Dict[str, float]:
+    """
+    Якість розподілу (для бенчмарків і тестів):
+    - repeat_pairs:   пари в одному лобі, що вже зустрічались (з кратністю)
+    - avg_spread:     середній розкид сили всередині лобі (max - min)
+    - strength_stdev: стандартне відхилення середньої сили лобі (баланс між лобі)
+    """
+    ids = [pid for lobby in plan for pid in lobby]
+    index_of = {pid: i for i, pid in enumerate(ids)}
+    repeat_pairs = 0
+    if history is not None:
+        matrix = CoOccurrence.from_games(index_of, history)
+        for lobby in plan:
+            idx = [index_of[pid] for pid in lobby]
+            for pos, a in enumerate(idx):
+                for b in idx[pos + 1:]:
+                    repeat_pairs += matrix.get(a, b)
+
+    lobbies = [[strength.get(pid, 0) for pid in lobby] for lobby in plan if lobby]
+    if not lobbies:
+        return {"repeat_pairs": repeat_pairs, "avg_spread": 0.0, "strength_stdev": 0.0}
+    avg_spread = sum(max(values) - min(values) for values in lobbies) / len(lobbies)
+    means = [sum(values) / len(values) for values in lobbies]
+    overall = sum(means) / len(means)
+    strength_stdev = (sum((m - overall) ** 2 for m in means) / len(means)) ** 0.5
+    return {"repeat_pairs": repeat_pairs, "avg_spread": avg_spread, "strength_stdev": strength_stdev}
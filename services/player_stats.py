@@ -0,0 +1,420 @@
+"""
+Передпорахована статистика гравців (таблиця player_stats).
+
+/stats/player/{user_id} читає готові рядки по PK (user_id, tournament_size)
+замість того, щоб щоразу проходити всю історію турнірів та ігор гравця.
+
+Зміни збираються в after_flush (як і версії турнірів у services.tournament_cache)
+і застосовуються в before_commit:
+- результати в іграх і статус гри - дельтою games_played / game_position_sum
+  загального рядка (старе vs нове average_position, лише для COMPLETED ігор);
+- статус / видалення / налаштування фіналів турніру, видалення учасників, а
+  також підсумки учасників завершених турнірів - повним перерахунком рядків
+  гравця агрегатними запитами (GROUP BY розміру турніру).
+Первинне заповнення: scripts/rebuild_player_stats.py.
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, case, delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from models.player_stats import PlayerStats, OVERALL_SIZE
+from models.tournament import Tournament, TournamentStatus
+from models.tournament_participant import TournamentParticipant
+from models.tournament_game import TournamentGame, GameStatus
+from models.game_participant import GameParticipant
+from models.user import User
+
+# Ключ у Session.info зі змінами, що чекають перерахунку
+PENDING_KEY = "player_stats_pending"
+
+# Поля, зміна яких впливає на статистику
+_TOURNAMENT_FIELDS = ("status", "is_deleted", "total_participants", "with_finals", "finals_started")
+_PARTICIPANT_FIELDS = ("final_position", "total_score", "finals_score")
+_GAME_PARTICIPANT_FIELDS = ("position_mask", "best_position")
+
+# Для дельт потрібні значення до зміни, навіть якщо атрибут був expired на момент set
+for _attribute in (GameParticipant.position_mask, GameParticipant.best_position, TournamentGame.status):
+    event.listen(_attribute, "set", lambda target, value, oldvalue, initiator: None, active_history=True)
+
+
+def _tournament_aggregates(db: Session, user_ids: Iterable[int]):
+    """Завершені турніри гравців: (user_id, size, played, wins, 2nd, 3rd, position_sum, score_sum)"""
+    # Для турнірів з фіналами у фіналістів рахується finals_score, інакше total_score
+    score = case(
+        (and_(
+            Tournament.with_finals == True,
+            Tournament.finals_started == True,
+            TournamentParticipant.finals_score.isnot(None)
+        ), TournamentParticipant.finals_score),
+        else_=TournamentParticipant.total_score
+    )
+    return db.execute(
+        select(
+            TournamentParticipant.user_id,
+            Tournament.total_participants.label("size"),
+            func.count().label("tournaments_played"),
+            func.count().filter(TournamentParticipant.final_position == 1).label("wins"),
+            func.count().filter(TournamentParticipant.final_position == 2).label("second_places"),
+            func.count().filter(TournamentParticipant.final_position == 3).label("third_places"),
+            func.sum(TournamentParticipant.final_position).label("position_sum"),
+            func.sum(func.coalesce(score, 0)).label("score_sum"),
+        ).join(
+            Tournament, Tournament.id == TournamentParticipant.tournament_id
+        ).where(
+            TournamentParticipant.user_id.in_(user_ids),
+            Tournament.status == TournamentStatus.FINISHED,
+            Tournament.is_deleted == False,
+            TournamentParticipant.final_position.isnot(None)
+        ).group_by(
+            TournamentParticipant.user_id, Tournament.total_participants
+        )
+    ).all()
+
+
+def _game_aggregates(db: Session, user_ids: Iterable[int]):
+    """Завершені ігри з результатом: (user_id, games_played, game_position_sum)"""
+    return db.execute(
+        select(
+            TournamentParticipant.user_id,
+            func.count().label("games_played"),
+            func.sum(GameParticipant.average_position).label("game_position_sum"),
+        ).join(
+            TournamentParticipant, GameParticipant.participant_id == TournamentParticipant.id
+        ).join(
+            TournamentGame, GameParticipant.game_id == TournamentGame.id
+        ).join(
+            Tournament, Tournament.id == TournamentGame.tournament_id
+        ).where(
+            TournamentParticipant.user_id.in_(user_ids),
+            TournamentGame.status == GameStatus.COMPLETED,
+            GameParticipant.position_mask.isnot(None),
+            Tournament.is_deleted == False
+        ).group_by(TournamentParticipant.user_id)
+    ).all()
+
+
+def compute_player_stats(db: Session, user_ids: Iterable[int]) -> Dict[int, List[PlayerStats]]:
+    """
+    Порахувати рядки статистики (не приєднані до сесії) для гравців.
+    Кожен гравець отримує рядок OVERALL_SIZE, навіть якщо ще не грав.
+    """
+    user_ids = set(user_ids)
+    result: Dict[int, List[PlayerStats]] = {}
+    overall: Dict[int, PlayerStats] = {}
+    for user_id in user_ids:
+        overall[user_id] = PlayerStats(
+            user_id=user_id, tournament_size=OVERALL_SIZE,
+            tournaments_played=0, wins=0, second_places=0, third_places=0,
+            position_sum=0, score_sum=0.0, games_played=0, game_position_sum=0.0
+        )
+        result[user_id] = [overall[user_id]]
+    if not user_ids:
+        return result
+
+    for row in _tournament_aggregates(db, user_ids):
+        stats = PlayerStats(
+            user_id=row.user_id, tournament_size=row.size,
+            tournaments_played=row.tournaments_played, wins=row.wins,
+            second_places=row.second_places, third_places=row.third_places,
+            position_sum=row.position_sum or 0, score_sum=float(row.score_sum or 0),
+            games_played=0, game_position_sum=0.0
+        )
+        result[row.user_id].append(stats)
+
+        total = overall[row.user_id]
+        total.tournaments_played += stats.tournaments_played
+        total.wins += stats.wins
+        total.second_places += stats.second_places
+        total.third_places += stats.third_places
+        total.position_sum += stats.position_sum
+        total.score_sum += stats.score_sum
+
+    for row in _game_aggregates(db, user_ids):
+        overall[row.user_id].games_played = row.games_played
+        overall[row.user_id].game_position_sum = float(row.game_position_sum or 0)
+
+    return result
+
+
+def refresh_player_stats(db: Session, user_ids: Iterable[int]) -> int:
+    """Перерахувати player_stats для гравців у поточній транзакції (без commit)"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return 0
+
+    # Агрегати читають БД - незбережені зміни сесії мають бути там
+    db.flush()
+    computed = compute_player_stats(db, user_ids)
+    rows = [
+        {column.name: getattr(stats, column.name) for column in PlayerStats.__table__.columns if column.name != "updated_at"}
+        for user_stats in computed.values()
+        for stats in user_stats
+    ]
+
+    db.execute(delete(PlayerStats).where(PlayerStats.user_id.in_(user_ids)))
+    db.execute(insert(PlayerStats), rows)
+    return len(rows)
+
+
+def rebuild_player_stats(db: Session, batch_size: int = 500) -> int:
+    """Перерахувати статистику всіх гравців пакетами (commit після кожного пакета)"""
+    user_ids = [row[0] for row in db.query(User.id).order_by(User.id).all()]
+    for start in range(0, len(user_ids), batch_size):
+        refresh_player_stats(db, user_ids[start:start + batch_size])
+        db.commit()
+    return len(user_ids)
+
+
+def get_player_stats_rows(db: Session, user_id: int) -> List[PlayerStats]:
+    """Готові рядки гравця (PK-префікс user_id); [] якщо ще не пораховані"""
+    return db.query(PlayerStats).filter(PlayerStats.user_id == user_id).all()
+
+
+def build_player_stats_response(user: User, rows: List[PlayerStats]) -> dict:
+    """Відповідь /stats/player/{user_id} з рядків статистики"""
+    overall = next((row for row in rows if row.tournament_size == OVERALL_SIZE), None)
+    total_games = overall.games_played if overall else 0
+
+    response = {
+        "user_id": user.id,
+        "battletag": user.battletag,
+        "name": user.name,
+        "last_seen": user.current_last_seen,
+        "is_online": user.is_online,
+        "tournaments_played": overall.tournaments_played if overall else 0,
+        "games_played": total_games,
+    }
+
+    if not overall or not overall.tournaments_played:
+        response["stats_by_size"] = {}
+        response["game_stats"] = {
+            "total_games": total_games,
+            "average_game_position": 0
+        }
+        return response
+
+    stats_by_size = {}
+    for row in sorted(rows, key=lambda r: r.tournament_size):
+        if row.tournament_size == OVERALL_SIZE or not row.tournaments_played:
+            continue
+        stats_by_size[row.tournament_size] = {
+            "tournaments_played": row.tournaments_played,
+            "wins": row.wins,
+            "second_places": row.second_places,
+            "third_places": row.third_places,
+            "average_position": round(row.position_sum / row.tournaments_played, 2),
+            "total_score": row.score_sum,
+            "average_score": round(row.score_sum / row.tournaments_played, 2),
+        }
+
+    response["stats_by_size"] = stats_by_size
+    response["overall"] = {
+        "wins": overall.wins,
+        "second_places": overall.second_places,
+        "third_places": overall.third_places,
+        "average_position": round(overall.position_sum / overall.tournaments_played, 2),
+        "total_score": overall.score_sum,
+    }
+    response["game_stats"] = {
+        "total_games": total_games,
+        "average_game_position": round(
+            overall.game_position_sum / total_games, 2
+        ) if total_games > 0 else 0
+    }
+    return response
+
+
+def _has_changes(obj, fields) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def _pending(session: Session) -> dict:
+    return session.info.setdefault(PENDING_KEY, {
+        "tournaments": set(), "participants": set(), "scores": set(), "users": set(), "game_deltas": {}
+    })
+
+
+def mark_player_stats_changes(session: Session, kind: str, values: Iterable[Optional[int]]):
+    """
+    Позначити зміни для перерахунку перед commit. Для змін в обхід ORM (Core UPDATE),
+    які after_flush не бачить. kind:
+    - tournaments / users - повний перерахунок гравців турніру / гравців;
+    - participants - повний перерахунок гравців за id учасників (TournamentParticipant);
+    - scores - id учасників зі зміненими очками / місцем: перерахунок лише для
+      завершених турнірів (незавершені в агрегати не входять).
+    """
+    values = {value for value in values if value is not None}
+    if not values:
+        return
+    _pending(session)[kind].update(values)
+
+
+def _old_value(obj, field: str):
+    """Значення атрибута до flush (active_history гарантує, що старе значення завантажене)"""
+    state = inspect(obj)
+    history = state.attrs[field].history
+    if history.has_changes():
+        return history.deleted[0] if history.deleted else None
+    return state.dict.get(field)
+
+
+def _game_contribution(position_mask: Optional[int], best_position: Optional[int]) -> Tuple[int, float]:
+    """Внесок результату в (games_played, game_position_sum), як GameParticipant.average_position"""
+    if not position_mask or best_position is None:
+        return 0, 0.0
+    return 1, best_position + (bin(position_mask).count("1") - 1) / 2.0
+
+
+def _collect_game_deltas(session: Session):
+    """
+    Дельти games_played / game_position_sum для результатів, змінених у flush.
+    Результат рахується, якщо гра COMPLETED (і турнір не видалений), тож зміна
+    позицій у незавершеній грі не коштує нічого, а завершення гри додає внески
+    всіх її учасників. Порівнюється стан до і після саме цього flush.
+    """
+    # gp id -> (старі (mask, best), нові (mask, best), game_id, participant_id)
+    results: Dict[int, tuple] = {}
+    old_statuses: Dict[int, GameStatus] = {}
+
+    for obj in session.dirty:
+        if isinstance(obj, GameParticipant) and _has_changes(obj, _GAME_PARTICIPANT_FIELDS):
+            results[obj.id] = (
+                (_old_value(obj, "position_mask"), _old_value(obj, "best_position")),
+                (obj.position_mask, obj.best_position), obj.game_id, obj.participant_id
+            )
+        elif isinstance(obj, TournamentGame) and _has_changes(obj, ("status",)):
+            old_statuses[obj.id] = _old_value(obj, "status")
+
+    for obj in session.new:
+        if isinstance(obj, GameParticipant) and obj.position_mask is not None:
+            results[obj.id] = ((None, None), (obj.position_mask, obj.best_position), obj.game_id, obj.participant_id)
+
+    if not results and not old_statuses:
+        return
+
+    game_ids = {game_id for _, _, game_id, _ in results.values()} | set(old_statuses)
+    completed_now, completed_before = {}, {}
+    for game_id, game_status, is_deleted in session.execute(
+        select(TournamentGame.id, TournamentGame.status, Tournament.is_deleted)
+        .join(Tournament, Tournament.id == TournamentGame.tournament_id)
+        .where(TournamentGame.id.in_(game_ids))
+    ):
+        completed_now[game_id] = game_status == GameStatus.COMPLETED and not is_deleted
+        completed_before[game_id] = old_statuses.get(game_id, game_status) == GameStatus.COMPLETED and not is_deleted
+
+    # Гра завершилась / перестала бути завершеною - внесок усіх її учасників
+    if old_statuses:
+        for row in session.execute(
+            select(
+                GameParticipant.id, GameParticipant.game_id, GameParticipant.participant_id,
+                GameParticipant.position_mask, GameParticipant.best_position
+            ).where(GameParticipant.game_id.in_(old_statuses))
+        ):
+            if row.id not in results:
+                values = (row.position_mask, row.best_position)
+                results[row.id] = (values, values, row.game_id, row.participant_id)
+
+    participant_users = dict(session.execute(
+        select(TournamentParticipant.id, TournamentParticipant.user_id)
+        .where(TournamentParticipant.id.in_({participant_id for *_, participant_id in results.values()}))
+    ).all())
+
+    deltas = _pending(session)["game_deltas"]
+    for old, new, game_id, participant_id in results.values():
+        old_games, old_sum = _game_contribution(*old) if completed_before.get(game_id) else (0, 0.0)
+        new_games, new_sum = _game_contribution(*new) if completed_now.get(game_id) else (0, 0.0)
+        user_id = participant_users.get(participant_id)
+        if user_id is None or (old_games, old_sum) == (new_games, new_sum):
+            continue
+        delta = deltas.setdefault(user_id, [0, 0.0])
+        delta[0] += new_games - old_games
+        delta[1] += new_sum - old_sum
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_player_stats_changes(session: Session, flush_context):
+    """Запам'ятати турніри / учасників / гравців, чия статистика змінилась, і дельти результатів"""
+    def mark(kind: str, value: Optional[int]):
+        mark_player_stats_changes(session, kind, (value,))
+
+    for obj in session.dirty:
+        if isinstance(obj, Tournament) and _has_changes(obj, _TOURNAMENT_FIELDS):
+            mark("tournaments", obj.id)
+        elif isinstance(obj, TournamentParticipant) and _has_changes(obj, _PARTICIPANT_FIELDS):
+            mark("scores", obj.id)
+        elif isinstance(obj, GameParticipant) and _has_changes(obj, ("game_id", "participant_id")):
+            # Результат переїхав в іншу гру / до іншого учасника - дельтою не порахувати
+            mark("participants", obj.participant_id)
+
+    for obj in session.deleted:
+        if isinstance(obj, TournamentParticipant):
+            mark("users", obj.user_id)
+        elif isinstance(obj, GameParticipant):
+            mark("participants", obj.participant_id)
+
+    _collect_game_deltas(session)
+
+
+def _resolve_user_ids(session: Session, pending: dict) -> Set[int]:
+    """Гравці, яким потрібен повний перерахунок"""
+    user_ids = set(pending["users"])
+    if pending["participants"]:
+        user_ids.update(session.execute(
+            select(TournamentParticipant.user_id).where(TournamentParticipant.id.in_(pending["participants"]))
+        ).scalars())
+    if pending["scores"]:
+        user_ids.update(session.execute(
+            select(TournamentParticipant.user_id).join(
+                Tournament, Tournament.id == TournamentParticipant.tournament_id
+            ).where(
+                TournamentParticipant.id.in_(pending["scores"]),
+                Tournament.status == TournamentStatus.FINISHED
+            )
+        ).scalars())
+    if pending["tournaments"]:
+        user_ids.update(session.execute(
+            select(TournamentParticipant.user_id).where(TournamentParticipant.tournament_id.in_(pending["tournaments"]))
+        ).scalars())
+    return user_ids
+
+
+def _apply_game_deltas(session: Session, deltas: Dict[int, list], skip: Set[int]) -> Set[int]:
+    """
+    Додати дельти до загального рядка гравця (UPDATE по PK).
+    Повертає гравців без рядка статистики - їм потрібен повний перерахунок.
+    """
+    missing = set()
+    for user_id, (games, position_sum) in deltas.items():
+        if user_id in skip or (games == 0 and position_sum == 0):
+            continue
+        result = session.execute(
+            update(PlayerStats)
+            .where(PlayerStats.user_id == user_id, PlayerStats.tournament_size == OVERALL_SIZE)
+            .values(
+                games_played=PlayerStats.games_played + games,
+                game_position_sum=PlayerStats.game_position_sum + position_sum
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            missing.add(user_id)
+    return missing
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_player_stats_before_commit(session: Session):
+    # Спершу flush: after_flush може додати останні зміни
+    session.flush()
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    user_ids = _resolve_user_ids(session, pending)
+    user_ids |= _apply_game_deltas(session, pending["game_deltas"], skip=user_ids)
+    refresh_player_stats(session, user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_player_stats_changes(session: Session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,139 @@
+"""
+In-memory модель зайнятості позицій 1-8 у грі.
+
+Учасники гри (разом з TournamentParticipant та User) завантажуються одним
+запитом, після чого весь batch результатів перевіряється за один прохід:
+кожна група позицій - це бітова маска, зайнятість гри - OR усіх масок.
+Правила ті ж, що й у validate_position_conflicts:
+- позиція належить лише одній групі (маски різних груп не перетинаються)
+- група [2,3] може бути використана не більше 2 разів, [2,3,4] - 3 і т.д.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, joinedload
+
+from models.game_participant import GameParticipant, positions_to_mask, mask_to_positions
+from models.tournament_participant import TournamentParticipant
+
+MIN_POSITION = 1
+MAX_POSITION = 8
+
+
+def validate_positions_shape(positions: List[int]):
+    """Позиції в межах 1-8 і, якщо їх кілька, послідовні"""
+    if not positions or len(positions) > MAX_POSITION:
+        raise HTTPException(status_code=400, detail="Positions must be 1-8 items")
+
+    for pos in positions:
+        if not (MIN_POSITION <= pos <= MAX_POSITION):
+            raise HTTPException(status_code=400, detail="All positions must be between 1-8")
+
+    sorted_pos = sorted(positions)
+    for i in range(1, len(sorted_pos)):
+        if sorted_pos[i] != sorted_pos[i - 1] + 1:
+            raise HTTPException(status_code=400, detail="Shared positions must be consecutive")
+
+
+class PositionBoard:
+    """Учасники однієї гри та їх поточні позиції"""
+
+    def __init__(self, game_participants: List[GameParticipant]):
+        self.game_participants = game_participants
+        self.by_participant_id: Dict[int, GameParticipant] = {
+            gp.participant_id: gp for gp in game_participants
+        }
+
+    @classmethod
+    def load(cls, db: Session, game_id: int) -> "PositionBoard":
+        """Один запит: учасники гри + TournamentParticipant + User"""
+        game_participants = (
+            db.query(GameParticipant)
+            .options(joinedload(GameParticipant.participant).joinedload(TournamentParticipant.user))
+            .filter(GameParticipant.game_id == game_id)
+            .all()
+        )
+        return cls(game_participants)
+
+    def get(self, participant_id: int) -> Optional[GameParticipant]:
+        return self.by_participant_id.get(participant_id)
+
+    def battletag(self, participant_id: int) -> str:
+        gp = self.by_participant_id.get(participant_id)
+        participant = gp.participant if gp else None
+        return participant.user.battletag if participant and participant.user else "Unknown"
+
+    def validate(self, updates: Dict[int, List[int]]):
+        """
+        Перевірити фінальний стан гри після застосування updates
+        ({participant_id: positions}) за один прохід.
+
+        Спочатку на дошку кладуться збережені позиції учасників, яких batch
+        не змінює, потім - нові позиції в порядку batch. Перша ж конфліктна
+        група з batch дає HTTPException 400 з battletag власника позиції.
+        """
+        occupied = 0
+        # {маска групи: кількість використань}
+        groups: Dict[int, int] = {}
+        # {позиція: (participant_id власника, з batch чи ні)}
+        owners: Dict[int, Tuple[int, bool]] = {}
+
+        entries = [
+            (gp.participant_id, mask_to_positions(gp.position_mask), False)
+            for gp in self.game_participants
+            if gp.participant_id not in updates
+        ]
+        entries += [(pid, sorted(positions), True) for pid, positions in updates.items()]
+
+        for participant_id, positions, from_batch in entries:
+            if not positions:
+                continue
+            mask = positions_to_mask(positions)
+
+            if not from_batch:
+                # Збережені результати лише займають позиції: якщо в БД вже є
+                # некоректний стан, це не повинно блокувати його виправлення
+                occupied |= mask
+                groups[mask] = groups.get(mask, 0) + 1
+                for pos in positions:
+                    owners.setdefault(pos, (participant_id, False))
+                continue
+
+            if mask in groups:
+                count = groups[mask]
+                if count >= len(positions):
+                    owner_id, owner_from_batch = owners[positions[0]]
+                    if owner_from_batch and len(positions) == 1:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Position conflict in batch: Position {positions[0]} assigned to both {self.battletag(participant_id)} and {self.battletag(owner_id)}"
+                        )
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Position group {positions} can only be used {len(positions)} times. Already used {count} times."
+                    )
+                groups[mask] += 1
+                continue
+
+            overlap = occupied & mask
+            if overlap:
+                pos = mask_to_positions(overlap)[0]
+                owner_id, owner_from_batch = owners[pos]
+                owner_group = mask_to_positions(next(m for m in groups if m & overlap))
+                if owner_from_batch and from_batch:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Position conflict in batch: Position {pos} assigned to both {self.battletag(participant_id)} and {self.battletag(owner_id)}"
+                    )
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Position conflict: Position {pos} is already used in group {owner_group} by {self.battletag(owner_id)}. Cannot use in group {positions}."
+                )
+
+            occupied |= mask
+            groups[mask] = 1
+            for pos in positions:
+                owners[pos] = (participant_id, from_batch)
+
+    def all_have_positions(self) -> bool:
+        return all(gp.position_mask is not None for gp in self.game_participants)
@@ -0,0 +1,126 @@
+"""
+Set-based перерахунок total_score / finals_score учасників турніру.
+
+Замість окремих SUM-запитів і commit на кожного учасника рахуємо очки
+одним UPDATE ... FROM (SELECT ... GROUP BY participant_id) у транзакції
+того, хто викликає. Commit залишається за викликачем.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models.tournament import Tournament
+from models.tournament_participant import TournamentParticipant
+from models.tournament_round import TournamentRound
+from models.tournament_game import TournamentGame
+from models.game_participant import GameParticipant
+from services.player_stats import mark_player_stats_changes
+from services.tournament_cache import bump_tournament_version
+
+
+def _scores_subquery(tournament_id: int, participant_ids: Optional[Iterable[int]] = None):
+    """
+    SELECT tp.id, SUM(regular points), SUM(finals points)
+    FROM tournament_participants tp
+    LEFT JOIN (game_participants JOIN tournament_games JOIN tournament_rounds) ...
+    GROUP BY tp.id
+
+    LEFT JOIN потрібен, щоб учасники без жодного результату (наприклад, після
+    очищення) отримали 0, а не залишились зі старими значеннями.
+    """
+    regular_rounds = func.coalesce(Tournament.regular_rounds, Tournament.total_rounds)
+
+    results = (
+        GameParticipant.__table__
+        .join(TournamentGame.__table__, GameParticipant.game_id == TournamentGame.id)
+        .join(TournamentRound.__table__, TournamentGame.round_id == TournamentRound.id)
+    )
+
+    regular_points = case(
+        (TournamentRound.round_number <= regular_rounds, GameParticipant.calculated_points),
+        else_=0,
+    )
+    finals_points = case(
+        (TournamentRound.round_number > regular_rounds, GameParticipant.calculated_points),
+        else_=0,
+    )
+
+    query = (
+        select(
+            TournamentParticipant.id.label("participant_id"),
+            func.coalesce(func.sum(regular_points), 0.0).label("regular_score"),
+            func.coalesce(func.sum(finals_points), 0.0).label("finals_score"),
+        )
+        .select_from(TournamentParticipant.__table__)
+        .join(Tournament.__table__, Tournament.id == TournamentParticipant.tournament_id)
+        .outerjoin(results, GameParticipant.participant_id == TournamentParticipant.id)
+        .where(TournamentParticipant.tournament_id == tournament_id)
+        .group_by(TournamentParticipant.id)
+    )
+
+    if participant_ids is not None:
+        query = query.where(TournamentParticipant.id.in_(list(participant_ids)))
+
+    return query.subquery("scores")
+
+
+def recalculate_scores(
+    db: Session,
+    tournament_id: int,
+    participant_ids: Optional[Iterable[int]] = None
+) -> Dict[int, Tuple[float, float]]:
+    """
+    Перерахувати total_score (регулярні раунди) та finals_score (фінальні раунди)
+    для набору учасників турніру або для всього турніру (participant_ids=None).
+
+    Виконується одним UPDATE ... FROM у поточній транзакції (без commit).
+    Незбережені ORM-зміни попередньо flush-аться, щоб UPDATE їх бачив.
+
+    Повертає {participant_id: (total_score, finals_score)}; завантажені в сесію
+    об'єкти TournamentParticipant отримують нові значення без повторного SELECT.
+    """
+    if participant_ids is not None:
+        participant_ids = {pid for pid in participant_ids if pid is not None}
+        if not participant_ids:
+            return {}
+
+    db.flush()
+
+    scores = _scores_subquery(tournament_id, participant_ids)
+    stmt = (
+        update(TournamentParticipant)
+        .where(TournamentParticipant.id == scores.c.participant_id)
+        .values(
+            total_score=scores.c.regular_score,
+            finals_score=scores.c.finals_score,
+        )
+        .returning(
+            TournamentParticipant.id,
+            TournamentParticipant.total_score,
+            TournamentParticipant.finals_score,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    updated = {
+        row[0]: (float(row[1] or 0.0), float(row[2] or 0.0))
+        for row in db.execute(stmt)
+    }
+
+    # UPDATE в обхід ORM не тригерить after_flush - версію турніру піднімаємо
+    # і player_stats учасників позначаємо явно
+    if updated:
+        bump_tournament_version(db, tournament_id)
+        mark_player_stats_changes(db, "scores", updated)
+
+    # Синхронізуємо вже завантажені об'єкти, щоб подальший код бачив свіжі очки
+    # (PK беремо з identity key: звернення до obj.id перезавантажило б expired об'єкт)
+    for key, obj in list(db.identity_map.items()):
+        if isinstance(obj, TournamentParticipant) and key[1][0] in updated:
+            total_score, finals_score = updated[key[1][0]]
+            set_committed_value(obj, "total_score", total_score)
+            set_committed_value(obj, "finals_score", finals_score)
+
+    return updated
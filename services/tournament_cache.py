@@ -0,0 +1,159 @@
+"""
+Версіонований read-кеш для деталей турніру та ігор раунду.
+
+Кожен турнір має монотонну колонку version. Вона інкрементується після
+кожного flush, що змінює турнір, його учасників, раунди, ігри, результати
+або публічні дані користувачів-учасників. Кеш тримає вже серіалізовані
+(jsonable) відповіді під ключем (..., tournament_id, version), тому
+застарілі записи просто перестають запитуватись і витісняються LRU.
+Персональні поля (phone/telegram/rating, can_edit) застосовуються після кешу.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Set
+
+from sqlalchemy import event, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.tournament import Tournament
+from models.tournament_participant import TournamentParticipant
+from models.tournament_round import TournamentRound
+from models.tournament_game import TournamentGame
+from models.game_participant import GameParticipant
+from models.user import User
+
+# Поля користувача, що потрапляють у відповіді турніру
+_USER_PUBLIC_FIELDS = ("battletag", "name", "phone", "telegram", "battlegrounds_rating")
+
+
+class VersionedCache:
+    """Потокобезпечний LRU-кеш"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_metrics(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+# Глобальний кеш відповідей турнірів
+tournament_cache = VersionedCache(maxsize=settings.tournament_cache_size)
+
+
+def get_tournament_version(db: Session, tournament_id: int) -> Optional[int]:
+    """Поточна версія турніру (PK lookup); None якщо турнір не існує або видалений"""
+    return db.execute(
+        select(Tournament.version).where(
+            Tournament.id == tournament_id,
+            Tournament.is_deleted == False
+        )
+    ).scalar()
+
+
+def bump_tournament_version(db: Session, tournament_id: int):
+    """Явно інкрементувати версію турніру (у поточній транзакції, без commit)"""
+    from services.finalists import invalidate_finalist_sets
+
+    invalidate_finalist_sets(db, tournament_id)
+    db.execute(
+        update(Tournament.__table__)
+        .where(Tournament.__table__.c.id == tournament_id)
+        .values(version=Tournament.__table__.c.version + 1)
+    )
+
+
+def _collect_changes(session: Session):
+    """Зібрати турніри, ігри та користувачів, змінених у flush"""
+    tournament_ids: Set[int] = set()
+    game_ids: Set[int] = set()
+    user_ids: Set[int] = set()
+
+    # dirty містить і об'єкти без реальних змін (присвоєння того ж значення,
+    # зміни лише колекцій) - такі не мають піднімати версію
+    modified = [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+
+    for obj in list(session.new) + modified + list(session.deleted):
+        if isinstance(obj, Tournament):
+            # Зміна лише version (через bump) сюди не потрапляє - це Core UPDATE
+            if obj.id is not None:
+                tournament_ids.add(obj.id)
+        elif isinstance(obj, (TournamentParticipant, TournamentRound, TournamentGame)):
+            if obj.tournament_id is not None:
+                tournament_ids.add(obj.tournament_id)
+        elif isinstance(obj, GameParticipant):
+            if obj.game_id is not None:
+                game_ids.add(obj.game_id)
+        elif isinstance(obj, User) and obj.id is not None:
+            state = inspect(obj)
+            if obj in session.dirty and any(
+                state.attrs[field].history.has_changes() for field in _USER_PUBLIC_FIELDS
+            ):
+                user_ids.add(obj.id)
+
+    return tournament_ids, game_ids, user_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_versions_after_flush(session: Session, flush_context):
+    tournament_ids, game_ids, user_ids = _collect_changes(session)
+    if not (tournament_ids or game_ids or user_ids):
+        return
+
+    # Мемоізовані фіналісти прив'язані до версії турніру - скидаємо разом з нею
+    from services.finalists import invalidate_finalist_sets
+
+    invalidate_finalist_sets(session)
+
+    table = Tournament.__table__
+    conditions = []
+    if tournament_ids:
+        conditions.append(table.c.id.in_(tournament_ids))
+    if game_ids:
+        conditions.append(table.c.id.in_(
+            select(TournamentGame.tournament_id).where(TournamentGame.id.in_(game_ids))
+        ))
+    if user_ids:
+        conditions.append(table.c.id.in_(
+            select(TournamentParticipant.tournament_id).where(TournamentParticipant.user_id.in_(user_ids))
+        ))
+
+    session.connection().execute(
+        update(table).where(or_(*conditions)).values(version=table.c.version + 1)
+    )
+
+
+def redact_participant(participant: dict, viewer_id: Optional[int], has_full_access: bool) -> dict:
+    """Копія учасника з прихованими контактами, якщо viewer не має доступу"""
+    if has_full_access or (viewer_id is not None and participant.get("user_id") == viewer_id):
+        return participant
+    redacted = dict(participant)
+    redacted["phone"] = None
+    redacted["telegram"] = None
+    redacted["battlegrounds_rating"] = None
+    return redacted
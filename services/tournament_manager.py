@@ -11,26 +11,11 @@ def log_tournament_action(
     action_type: str,
     action_description: str
 ):
-    """Helper функція для асинхронного логування дій в турнірі"""
-    import threading
-    from db import SessionLocal
+    """Helper функція для асинхронного логування дій в турнірі (пакетний запис у фоні)"""
+    from services.audit_log import audit_log_writer
     
-    def _log_async():
-        """Асинхронне логування в окремій сесії"""
-        try:
-            log_db = SessionLocal()
-            try:
-                from api.crud.tournament_log_crud import create_tournament_log
-                create_tournament_log(log_db, tournament_id, user_id, action_type, action_description)
-            finally:
-                log_db.close()
-        except Exception:
-            # Не падаємо якщо логування не вдалось
-            pass
-    
-    # Запускаємо в окремому потоці
-    thread = threading.Thread(target=_log_async, daemon=True)
-    thread.start()
+    # Лише ставимо в чергу: без окремого потоку, сесії та commit на кожен лог
+    audit_log_writer.log_tournament(tournament_id, user_id, action_type, action_description)
 
 
 class TournamentManager:
@@ -1,20 +1,53 @@
 from abc import ABC, abstractmethod
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List, Optional
-import random
+from typing import Dict, List, Optional
 from models.tournament import Tournament, TournamentStatus
 from models.tournament_round import TournamentRound, RoundStatus
 from models.tournament_game import TournamentGame, GameStatus
 from models.game_participant import GameParticipant
 from models.tournament_participant import TournamentParticipant
 from models.user import User
-from api.crud.round_crud import create_round_with_games, start_round, complete_round
+from api.crud.round_crud import build_round, complete_round
 from api.crud.participant_crud import get_tournament_participants
-from api.crud.game_crud import get_round_games, get_game_participants, add_game_participant
+from api.crud.game_crud import get_game_participants
 from core.exceptions import InvalidTournamentState
 
 
+def merge_priority_lists(global_favorites: List[int], tournament_priority: List[int]) -> List[int]:
+    """Global favorites first, then tournament-specific priority (avoiding duplicates)"""
+    seen = set()
+    merged = []
+    for user_id in list(global_favorites) + list(tournament_priority):
+        if user_id not in seen:
+            seen.add(user_id)
+            merged.append(user_id)
+    return merged
+
+
+def select_lobby_makers(game_players: Dict[int, List[int]], priority_list: List[int]) -> Dict[int, int]:
+    """
+    Вибрати Lobby Maker-а для кожної гри: гравця з найвищим пріоритетом.
+    game_players - {game_id: [user_id, ...]}. O(гравців) завдяки словнику рангів.
+    Повертає {game_id: user_id} лише для ігор, де є хтось зі списку пріоритету.
+    """
+    rank = {}
+    for position, user_id in enumerate(priority_list):
+        rank.setdefault(user_id, position)
+    
+    lobby_makers = {}
+    for game_id, user_ids in game_players.items():
+        best_user_id = None
+        best_rank = None
+        for user_id in user_ids:
+            user_rank = rank.get(user_id)
+            if user_rank is not None and (best_rank is None or user_rank < best_rank):
+                best_user_id, best_rank = user_id, user_rank
+        if best_user_id is not None:
+            lobby_makers[game_id] = best_user_id
+    return lobby_makers
+
+
 class TournamentStrategy(ABC):
     """Abstract base class for tournament strategies"""
     
@@ -57,24 +90,15 @@ class SwissStrategy(TournamentStrategy):
         # Update tournament status
         tournament.status = TournamentStatus.ACTIVE
         tournament.current_round = 1
-        db.commit()
         
-        # Create first round
-        first_round = create_round_with_games(db, tournament.id, 1, tournament.total_participants)
-        
-        # Assign participants based on strategy
-        strategy = tournament.first_round_strategy
-        if strategy == "BALANCED":
-            self._assign_participants_balanced(db, first_round, participants, tournament)
-        elif strategy == "STRONG_VS_STRONG":
-            self._assign_participants_strong_vs_strong(db, first_round, participants, tournament)
-        else:
-            # Default to RANDOM
-            self._assign_participants_randomly(db, first_round, participants, tournament)
+        # Plan first round based on strategy
+        games_count = tournament.total_participants // 8
+        plan = self._plan_first_round(participants, games_count, tournament.first_round_strategy)
         
-        # Start the round
-        start_round(db, first_round.id)
+        # Create and start the round in the same transaction as the status change
+        self._build_round(db, tournament, 1, plan, games_count)
         
+        db.commit()
         db.refresh(tournament)
         return tournament
     
@@ -127,7 +151,7 @@ class SwissStrategy(TournamentStrategy):
         ).first()
         
         if current_round:
-            complete_round(db, current_round.id)
+            complete_round(db, current_round.id, commit=False)
         
         # Update tournament current round
         next_round_number = tournament.current_round + 1
@@ -139,64 +163,35 @@ class SwissStrategy(TournamentStrategy):
         if is_finals_round:
             # FINALS LOGIC: Only actual finalists from previous final rounds (with swaps taken into account)
             participants_count = tournament.finals_participants_count or 8
-            next_round = create_round_with_games(db, tournament.id, next_round_number, participants_count)
-            
-            # Get actual finalists from previous final rounds (not top-N by total_score)
-            # This ensures that swapped finalists are included in subsequent final rounds
-            regular_rounds = tournament.regular_rounds or tournament.total_rounds
-            previous_final_rounds = db.query(TournamentRound).filter(
-                TournamentRound.tournament_id == tournament.id,
-                TournamentRound.round_number > regular_rounds,
-                TournamentRound.round_number < next_round_number  # Only previous final rounds
-            ).all()
+            games_count = participants_count // 8
             
-            if previous_final_rounds:
-                # Get actual finalists from previous final rounds
-                previous_final_round_ids = [r.id for r in previous_final_rounds]
-                previous_final_games = db.query(TournamentGame).filter(
-                    TournamentGame.tournament_id == tournament.id,
-                    TournamentGame.round_id.in_(previous_final_round_ids)
-                ).all()
-                
-                if previous_final_games:
-                    previous_final_game_ids = [g.id for g in previous_final_games]
-                    finalist_rows = db.query(GameParticipant.participant_id).filter(
-                        GameParticipant.game_id.in_(previous_final_game_ids)
-                    ).distinct().all()
-                    finalist_ids = [row[0] for row in finalist_rows]
-                    
-                    # Get TournamentParticipant objects for actual finalists
-                    participants = db.query(TournamentParticipant).filter(
-                        TournamentParticipant.tournament_id == tournament.id,
-                        TournamentParticipant.id.in_(finalist_ids)
-                    ).all()
-                else:
-                    # Fallback: if no previous final games, use top-N by total_score
-                    participants = db.query(TournamentParticipant).filter(
-                        TournamentParticipant.tournament_id == tournament.id
-                    ).order_by(TournamentParticipant.total_score.desc()).limit(participants_count).all()
-            else:
-                # First final round: use top-N by total_score (as in start-finals)
-                participants = db.query(TournamentParticipant).filter(
-                    TournamentParticipant.tournament_id == tournament.id
-                ).order_by(TournamentParticipant.total_score.desc()).limit(participants_count).all()
+            # Actual finalists from previous final rounds (not top-N by total_score), so that
+            # swapped finalists are included; before the first final round - top-N by total_score.
+            # Нова гра ще порожня, тож "фактичні" = учасники попередніх фінальних раундів
+            from services.finalists import get_finalist_sets
+            finalist_ids = get_finalist_sets(db, tournament).effective
+            participants = db.query(TournamentParticipant).filter(
+                TournamentParticipant.tournament_id == tournament.id,
+                TournamentParticipant.id.in_(finalist_ids)
+            ).all() if finalist_ids else []
             
             # Assign participants randomly for finals
-            self._assign_participants_randomly(db, next_round, participants, tournament)
+            plan = self._plan_randomly(participants, games_count)
         else:
             # SWISS LOGIC: All participants
-            next_round = create_round_with_games(db, tournament.id, next_round_number, tournament.total_participants)
+            games_count = tournament.total_participants // 8
             
             # Get participants sorted by total score
             participants = db.query(TournamentParticipant).filter(
                 TournamentParticipant.tournament_id == tournament.id
             ).order_by(TournamentParticipant.total_score.desc()).all()
             
-            # Assign participants based on strategy
-            self._assign_participants_by_score(db, next_round, participants, tournament)
+            # Score brackets with repeat-opponent minimisation
+            plan = self._plan_swiss(db, tournament, participants, games_count)
         
-        # Start the round
-        start_round(db, next_round.id)
+        # Create and start the round; completing the previous round and the new
+        # round are committed together, so a failure midway leaves no partial round
+        next_round = self._build_round(db, tournament, next_round_number, plan, games_count)
         
         db.commit()
         db.refresh(tournament)
@@ -251,186 +246,106 @@ class SwissStrategy(TournamentStrategy):
         db.refresh(tournament)
         return tournament
     
-    def _assign_participants_randomly(self, db: Session, round_obj: TournamentRound, participants: List, tournament: Tournament):
-        """Randomly assign participants to games in first round"""
-        
-        # Shuffle participants for random assignment
-        shuffled_participants = participants.copy()
-        random.shuffle(shuffled_participants)
-        
-        # Get games for this round
-        games = get_round_games(db, round_obj.id)
-        
-        # Assign 8 participants per game
-        participants_per_game = 8
-        for i, participant in enumerate(shuffled_participants):
-            game_index = i // participants_per_game
-            if game_index < len(games):
-                game_participant = GameParticipant(
-                    game_id=games[game_index].id,
-                    participant_id=participant.id
-                )
-                db.add(game_participant)
-        
-        db.commit()
-        
-        # Assign Lobby Makers
-        self._assign_lobby_makers(db, round_obj, tournament)
+    def _build_round(self, db: Session, tournament: Tournament, round_number: int, plan: List[List[int]], games_count: int) -> TournamentRound:
+        """Create an ACTIVE round from a pairing plan and assign Lobby Makers (no commit)"""
+        round_obj = build_round(db, tournament.id, round_number, plan, games_count=games_count, commit=False)
+        self._assign_lobby_makers(db, round_obj, tournament, commit=False)
+        return round_obj
     
-    def _assign_participants_by_score(self, db: Session, round_obj: TournamentRound, participants: List, tournament: Tournament):
-        """Assign participants to games based on current scores (Swiss pairing)"""
-        
-        # Get games for this round
-        games = get_round_games(db, round_obj.id)
-        
-        # Batch create game participants
-        game_participants = []
-        participants_per_game = 8
-        
-        for i, participant in enumerate(participants):
-            game_index = i // participants_per_game
-            if game_index < len(games):
-                game_participants.append(GameParticipant(
-                    game_id=games[game_index].id,
-                    participant_id=participant.id
-                ))
+    def _plan(self, strategy_name: str, participants: List, games_count: int, strength: Optional[List[float]] = None, history: Optional[List[List[int]]] = None) -> List[List[int]]:
+        """Pairing plan from the pairing engine (lists of participant ids per game)"""
+        from services.pairing_engine import plan_lobbies
+        return plan_lobbies(strategy_name, [p.id for p in participants], games_count, strength=strength, history=history)
+    
+    def _plan_first_round(self, participants: List, games_count: int, strategy_name: Optional[str]) -> List[List[int]]:
+        """First round: RANDOM / BALANCED / STRONG_VS_STRONG by Battlegrounds rating (unknown - RANDOM)"""
+        # If rating is None, treat as 0
+        ratings = [p.user.battlegrounds_rating if p.user and p.user.battlegrounds_rating else 0 for p in participants]
+        return self._plan(strategy_name, participants, games_count, strength=ratings)
+    
+    def _plan_randomly(self, participants: List, games_count: int) -> List[List[int]]:
+        """Randomly assign participants to games"""
+        return self._plan("RANDOM", participants, games_count)
+    
+    def _plan_by_score(self, participants: List, games_count: int) -> List[List[int]]:
+        """Consecutive blocks of 8 by total score (participants with equal score keep their order)"""
+        return self._plan("SCORE", participants, games_count, strength=[p.total_score or 0 for p in participants])
+    
+    def _plan_swiss(self, db: Session, tournament: Tournament, participants: List, games_count: int) -> List[List[int]]:
+        """Score-bracket Swiss pairing avoiding repeat opponents from previous rounds"""
+        rows = db.query(GameParticipant.game_id, GameParticipant.participant_id).join(
+            TournamentGame, GameParticipant.game_id == TournamentGame.id
+        ).filter(
+            TournamentGame.tournament_id == tournament.id
+        ).all()
         
-        db.bulk_save_objects(game_participants)
-        db.commit()
+        previous_games = {}
+        for game_id, participant_id in rows:
+            previous_games.setdefault(game_id, []).append(participant_id)
         
-        # Assign Lobby Makers
-        self._assign_lobby_makers(db, round_obj, tournament)
-
-    def _assign_participants_balanced(self, db: Session, round_obj: TournamentRound, participants: List, tournament: Tournament):
-        """
-        Assign participants to games balancing strong players across lobbies (Snake draft).
-        Example for 2 lobbies: 
-        1->A, 2->B, 3->B, 4->A, 5->A, 6->B...
-        """
-        # Sort participants by rating (descending)
-        # Assuming participant.user.battlegrounds_rating is available. If None, treat as 0.
-        sorted_participants = sorted(
-            participants, 
-            key=lambda p: p.user.battlegrounds_rating if p.user and p.user.battlegrounds_rating else 0, 
-            reverse=True
+        return self._plan(
+            "SWISS", participants, games_count,
+            strength=[p.total_score or 0 for p in participants],
+            history=list(previous_games.values())
         )
-        
-        games = get_round_games(db, round_obj.id)
-        num_games = len(games)
-        
-        # Prepare lists for each game
-        game_assignments = [[] for _ in range(num_games)]
-        
-        # Snake distribution
-        for i, participant in enumerate(sorted_participants):
-            # Determine which game to put this participant in
-            # Cycle: 0, 1, 2, ... N-1, N-1, ... 2, 1, 0
-            cycle_len = num_games * 2
-            pos_in_cycle = i % cycle_len
-            
-            if pos_in_cycle < num_games:
-                game_idx = pos_in_cycle
-            else:
-                game_idx = cycle_len - 1 - pos_in_cycle
-                
-            game_assignments[game_idx].append(participant)
-            
-        # Save to DB
-        game_participants = []
-        for i, game_players in enumerate(game_assignments):
-            game = games[i]
-            for participant in game_players:
-                game_participants.append(GameParticipant(
-                    game_id=game.id,
-                    participant_id=participant.id
-                ))
-        
-        db.bulk_save_objects(game_participants)
-        db.commit()
-        
-        self._assign_lobby_makers(db, round_obj, tournament)
-
-    def _assign_participants_strong_vs_strong(self, db: Session, round_obj: TournamentRound, participants: List, tournament: Tournament):
+    
+    def _assign_lobby_makers(self, db: Session, round_obj: TournamentRound, tournament: Tournament, commit: bool = True):
         """
-        Assign participants to games grouping strong players together.
-        Lobby 1 gets top 8, Lobby 2 gets next 8, etc.
+        Assign Lobby Makers to games based on priority list.
+        Два SELECT-и (улюблені lobby maker-и creator-а та склад ігор раунду),
+        вибір у пам'яті, і пакетний UPDATE ігор та прапорців is_lobby_maker.
         """
-        # Sort participants by rating (descending)
-        sorted_participants = sorted(
-            participants, 
-            key=lambda p: p.user.battlegrounds_rating if p.user and p.user.battlegrounds_rating else 0, 
-            reverse=True
-        )
-        
-        games = get_round_games(db, round_obj.id)
-        
-        # Simple fill
-        game_participants = []
-        participants_per_game = 8
-        
-        for i, participant in enumerate(sorted_participants):
-            game_index = i // participants_per_game
-            if game_index < len(games):
-                game_participants.append(GameParticipant(
-                    game_id=games[game_index].id,
-                    participant_id=participant.id
-                ))
-                
-        db.bulk_save_objects(game_participants)
-        db.commit()
-        
-        self._assign_lobby_makers(db, round_obj, tournament)
-
-    def _assign_lobby_makers(self, db: Session, round_obj: TournamentRound, tournament: Tournament):
-        """Assign Lobby Makers to games based on priority list"""
-        # First, try to get global favorite lobby makers from tournament creator
-        creator = db.query(User).filter(User.id == tournament.creator_id).first()
-        global_favorites = creator.favorite_lobby_makers if creator and creator.favorite_lobby_makers else []
-        
-        # Combine global favorites with tournament-specific priority list
-        # Global favorites have higher priority
-        tournament_priority = tournament.lobby_maker_priority_list or []
-        
-        # Merge lists: global first, then tournament-specific (avoiding duplicates)
-        priority_list = global_favorites + [uid for uid in tournament_priority if uid not in global_favorites]
-        
-        # Get games without joinedload to avoid relationship issues
-        games = db.query(TournamentGame).filter(
-            TournamentGame.round_id == round_obj.id
-        ).all()
-        
-        for game in games:
-            # Refresh game to ensure clean state
-            db.refresh(game)
+        from sqlalchemy import update
+        from sqlalchemy.orm.attributes import set_committed_value
+        from services.tournament_cache import bump_tournament_version
+        
+        # Global favorite lobby makers of the tournament creator have higher priority
+        global_favorites = db.query(User.favorite_lobby_makers).filter(
+            User.id == tournament.creator_id
+        ).scalar() or []
+        priority_list = merge_priority_lists(global_favorites, tournament.lobby_maker_priority_list or [])
+        
+        lobby_makers = {}
+        rows = []
+        if priority_list:
+            # (game_participant_id, game_id, user_id) for the whole round in one query
+            rows = db.query(GameParticipant.id, GameParticipant.game_id, TournamentParticipant.user_id).join(
+                TournamentParticipant, GameParticipant.participant_id == TournamentParticipant.id
+            ).join(
+                TournamentGame, GameParticipant.game_id == TournamentGame.id
+            ).filter(
+                TournamentGame.round_id == round_obj.id
+            ).all()
             
-            game_participants = get_game_participants(db, game.id)
+            game_players = {}
+            for _, game_id, user_id in rows:
+                game_players.setdefault(game_id, []).append(user_id)
             
-            # Find candidate from priority list
-            lobby_maker_user_id = None
+            lobby_makers = select_lobby_makers(game_players, priority_list)
+        
+        if lobby_makers:
+            game_updates = [
+                {"id": game_id, "lobby_maker_id": user_id}
+                for game_id, user_id in lobby_makers.items()
+            ]
+            # Update is_lobby_maker flag for every player of games that got a Lobby Maker
+            flag_updates = [
+                {"id": gp_id, "is_lobby_maker": user_id == lobby_makers[game_id]}
+                for gp_id, game_id, user_id in rows
+                if game_id in lobby_makers
+            ]
+            db.execute(update(TournamentGame), game_updates)
+            db.execute(update(GameParticipant), flag_updates)
             
-            # Check priority list first
-            for user_id in priority_list:
-                # Check if this user is in the game
-                participant = next(
-                    (gp for gp in game_participants 
-                     if db.query(TournamentParticipant).filter_by(id=gp.participant_id).first().user_id == user_id),
-                    None
-                )
-                
-                if participant:
-                    lobby_maker_user_id = user_id
-                    break
-            
-            # If found, assign
-            if lobby_maker_user_id:
-                game.lobby_maker_id = lobby_maker_user_id
-                
-                # Update is_lobby_maker flag
-                for gp in game_participants:
-                    # Access via relationship (lazy load)
-                    if gp.participant.user_id == lobby_maker_user_id:
-                        gp.is_lobby_maker = True
-                    else:
-                        gp.is_lobby_maker = False
-                        
-        db.commit()
\ No newline at end of file
+            # Bulk UPDATE by primary key не проходить через after_flush і не оновлює
+            # вже завантажені об'єкти - синхронізуємо їх та версію турніру вручну
+            bump_tournament_version(db, tournament.id)
+            flags = {item["id"]: item["is_lobby_maker"] for item in flag_updates}
+            for key, obj in list(db.identity_map.items()):
+                if isinstance(obj, TournamentGame) and key[1][0] in lobby_makers:
+                    set_committed_value(obj, "lobby_maker_id", lobby_makers[key[1][0]])
+                elif isinstance(obj, GameParticipant) and key[1][0] in flags:
+                    set_committed_value(obj, "is_lobby_maker", flags[key[1][0]])
+        
+        if commit:
+            db.commit()
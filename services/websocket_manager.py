@@ -1,11 +1,78 @@
-from typing import Dict, List, Set
+from typing import Any, Dict, Iterable, List, Set, Tuple, Union
 from fastapi import WebSocket
 from collections import defaultdict
+import asyncio
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Підтримувані кодування повідомлень (узгоджуються через /ws?encoding=...)
+ENCODING_JSON = "json"
+ENCODING_COMPACT = "compact"
+SUPPORTED_ENCODINGS = (ENCODING_JSON, ENCODING_COMPACT)
+
+# Короткі ключі для compact-кодування. Невідомі ключі передаються як є.
+# Мапа відправляється клієнту у привітальному повідомленні для декодування.
+COMPACT_KEYS: Dict[str, str] = {
+    "tournament_id": "tid",
+    "tournament_name": "tn",
+    "game_id": "gid",
+    "round_number": "rn",
+    "final_round_number": "frn",
+    "current_round": "cr",
+    "is_final": "f",
+    "updated_participant": "up",
+    "participant_id": "pid",
+    "user_id": "uid",
+    "battletag": "bt",
+    "position": "pos",
+    "calculated_points": "cp",
+    "is_lobby_maker": "lm",
+    "game_status": "gs",
+    "total_score": "ts",
+    "finals_score": "fs",
+    "final_position": "fp",
+    "lobby_maker_id": "lmid",
+    "lobby_maker_participant_id": "lmpid",
+    "lobby_maker_battletag": "lmbt",
+    "timestamp": "at",
+}
+
+
+def _compact(value: Any) -> Any:
+    """Рекурсивно замінити ключі на короткі"""
+    if isinstance(value, dict):
+        return {COMPACT_KEYS.get(k, k): _compact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_compact(v) for v in value]
+    return value
+
+
+class EncodedMessage:
+    """
+    Повідомлення, серіалізоване один раз на кодування.
+    Один і той самий текст відправляється всім сокетам з цим кодуванням.
+    """
+    
+    __slots__ = ("message", "type", "_encoded")
+    
+    def __init__(self, message: dict):
+        self.message = message
+        self.type = message.get("type", "unknown")
+        self._encoded: Dict[str, Tuple[str, int]] = {}
+    
+    def encode(self, encoding: str = ENCODING_JSON) -> Tuple[str, int]:
+        """Повертає (текст, розмір у байтах) для кодування"""
+        encoded = self._encoded.get(encoding)
+        if encoded is None:
+            payload = _compact(self.message) if encoding == ENCODING_COMPACT else self.message
+            # Ті самі параметри, що й у starlette WebSocket.send_json
+            text = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+            encoded = (text, len(text.encode("utf-8")))
+            self._encoded[encoding] = encoded
+        return encoded
+
 
 class TournamentWebSocketManager:
     """
@@ -19,12 +86,37 @@ class TournamentWebSocketManager:
         self.user_connections: Dict[int, List[WebSocket]] = defaultdict(list)
         # Зберігаємо user_id для кожного websocket для швидкого пошуку
         self.websocket_to_user: Dict[WebSocket, int] = {}  # {websocket: user_id}
+        # Індекс участі в турнірах для підключених користувачів, щоб broadcast не ходив у БД
+        # {tournament_id: {user_id, ...}} та зворотний {user_id: {tournament_id, ...}}
+        self.tournament_members: Dict[int, Set[int]] = defaultdict(set)
+        self.user_tournaments: Dict[int, Set[int]] = defaultdict(set)
+        # Таймаут на відправку в один сокет, щоб повільний клієнт не гальмував fan-out
+        self.send_timeout: float = 5.0
+        # Кодування, узгоджене для кожного підключення
+        self.websocket_encoding: Dict[WebSocket, str] = {}
+        # Лічильники відправлених повідомлень і байтів по типу повідомлення
+        self.messages_sent: Dict[str, int] = defaultdict(int)
+        self.bytes_sent: Dict[str, int] = defaultdict(int)
     
-    async def connect(self, websocket: WebSocket, user_id: int):
-        """Підключити користувача (універсальне підключення)"""
+    async def connect(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        tournament_ids: Iterable[int] = (),
+        encoding: str = ENCODING_JSON
+    ):
+        """
+        Підключити користувача (універсальне підключення).
+        tournament_ids - турніри користувача, якими прогрівається індекс участі.
+        encoding - json (за замовчуванням) або compact (короткі ключі).
+        """
         await websocket.accept()
         self.user_connections[user_id].append(websocket)
         self.websocket_to_user[websocket] = user_id
+        self.websocket_encoding[websocket] = encoding if encoding in SUPPORTED_ENCODINGS else ENCODING_JSON
+        for tournament_id in tournament_ids:
+            self.tournament_members[tournament_id].add(user_id)
+            self.user_tournaments[user_id].add(tournament_id)
         logger.info(f"User {user_id} connected (universal connection)")
     
     async def disconnect(self, websocket: WebSocket):
@@ -42,83 +134,151 @@ class TournamentWebSocketManager:
             # Якщо у користувача більше немає підключень, видаляємо його
             if not self.user_connections[user_id]:
                 del self.user_connections[user_id]
+                self._forget_user_tournaments(user_id)
         
         # Видаляємо з мапи
         del self.websocket_to_user[websocket]
+        self.websocket_encoding.pop(websocket, None)
         logger.info(f"User {user_id} disconnected")
     
+    def _forget_user_tournaments(self, user_id: int):
+        """Прибрати користувача з індексу участі (коли закрито останнє підключення)"""
+        for tournament_id in self.user_tournaments.pop(user_id, set()):
+            members = self.tournament_members.get(tournament_id)
+            if members is not None:
+                members.discard(user_id)
+                if not members:
+                    del self.tournament_members[tournament_id]
+    
+    def add_tournament_member(self, tournament_id: int, user_id: int):
+        """Оновити індекс після join/add/swap (лише для підключених користувачів)"""
+        if user_id not in self.user_connections:
+            # Не підключений - індекс прогріється при підключенні
+            return
+        self.tournament_members[tournament_id].add(user_id)
+        self.user_tournaments[user_id].add(tournament_id)
+    
+    def remove_tournament_member(self, tournament_id: int, user_id: int):
+        """Оновити індекс після leave/remove/swap"""
+        members = self.tournament_members.get(tournament_id)
+        if members is not None:
+            members.discard(user_id)
+            if not members:
+                del self.tournament_members[tournament_id]
+        tournaments = self.user_tournaments.get(user_id)
+        if tournaments is not None:
+            tournaments.discard(tournament_id)
+            if not tournaments:
+                del self.user_tournaments[user_id]
+    
+    def remove_tournament(self, tournament_id: int):
+        """Прибрати турнір з індексу (після видалення турніру)"""
+        for user_id in self.tournament_members.pop(tournament_id, set()):
+            tournaments = self.user_tournaments.get(user_id)
+            if tournaments is not None:
+                tournaments.discard(tournament_id)
+                if not tournaments:
+                    del self.user_tournaments[user_id]
+    
+    def get_tournament_members(self, tournament_id: int) -> Set[int]:
+        """Підключені учасники турніру (з індексу, без запитів до БД)"""
+        return set(self.tournament_members.get(tournament_id, ()))
+    
+    async def _send(self, user_id: int, ws: WebSocket, message: EncodedMessage) -> bool:
+        """Відправити в один сокет з таймаутом (текст серіалізується один раз на кодування)"""
+        text, size = message.encode(self.websocket_encoding.get(ws, ENCODING_JSON))
+        try:
+            await asyncio.wait_for(ws.send_text(text), timeout=self.send_timeout)
+            self.messages_sent[message.type] += 1
+            self.bytes_sent[message.type] += size
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"[WS] Send to user {user_id} timed out after {self.send_timeout}s")
+        except Exception as e:
+            logger.warning(f"[WS] Failed to send message to user {user_id}: {e}")
+        return False
+    
+    async def _fan_out(self, user_ids: Iterable[int], message: Union[dict, EncodedMessage]) -> int:
+        """
+        Паралельна відправка всім сокетам вказаних користувачів.
+        Час = найповільніший сокет (обмежений send_timeout), а не сума всіх.
+        Мертві підключення прибираються. Повертає кількість успішних відправок.
+        """
+        targets = [
+            (user_id, ws)
+            for user_id in user_ids
+            for ws in list(self.user_connections.get(user_id, ()))
+        ]
+        if not targets:
+            return 0
+        
+        if not isinstance(message, EncodedMessage):
+            message = EncodedMessage(message)
+        
+        results = await asyncio.gather(
+            *(self._send(user_id, ws, message) for user_id, ws in targets)
+        )
+        
+        # Очищаємо мертві підключення
+        for (user_id, ws), ok in zip(targets, results):
+            if not ok:
+                await self.disconnect(ws)
+        
+        return sum(1 for ok in results if ok)
+    
     async def send_to_user(self, user_id: int, message: dict):
         """Відправити повідомлення конкретному користувачу"""
         if user_id not in self.user_connections:
             logger.debug(f"[WS] User {user_id} not connected, skipping message type: {message.get('type')}")
             return
         
-        disconnected = []
-        sent_count = 0
-        for ws in list(self.user_connections[user_id]):
-            try:
-                await ws.send_json(message)
-                sent_count += 1
-            except Exception as e:
-                logger.warning(f"[WS] Failed to send message to user {user_id}: {e}")
-                disconnected.append(ws)
+        sent_count = await self._fan_out([user_id], message)
         
         if sent_count > 0:
             logger.debug(f"[WS] Sent message type {message.get('type')} to user {user_id} ({sent_count} connection(s))")
-        
-        # Очищаємо мертві підключення
-        for ws in disconnected:
-            await self.disconnect(ws)
     
     async def broadcast_to_users(self, user_ids: List[int], message: dict):
         """Відправити повідомлення групі користувачів"""
-        for user_id in user_ids:
-            await self.send_to_user(user_id, message)
+        await self._fan_out(set(user_ids), message)
     
     async def broadcast_to_tournament(self, tournament_id: int, message: dict, db=None):
         """
         Відправити повідомлення всім учасникам турніру.
-        Отримує список учасників з БД та відправляє їм повідомлення.
+        Учасники беруться з in-memory індексу (db залишено для сумісності, не використовується).
         """
-        if db is None:
-            logger.warning("Database session required for broadcast_to_tournament")
-            return
-        
-        # Отримуємо всіх учасників турніру
-        from models.tournament_participant import TournamentParticipant
-        participants = db.query(TournamentParticipant).filter(
-            TournamentParticipant.tournament_id == tournament_id
-        ).all()
-        
-        user_ids = [p.user_id for p in participants]
-        logger.info(f"[WS] Broadcasting to tournament {tournament_id}: {len(user_ids)} participants, message type: {message.get('type')}")
+        user_ids = self.get_tournament_members(tournament_id)
         
         if not user_ids:
-            logger.warning(f"[WS] No participants found for tournament {tournament_id}")
-        
-        await self.broadcast_to_users(user_ids, message)
+            logger.info(f"[WS] No connected participants for tournament {tournament_id}, message type: {message.get('type')}")
+            return
         
-        # Перевірка, скільки користувачів підключені
-        connected_count = sum(1 for uid in user_ids if uid in self.user_connections)
-        logger.info(f"[WS] Sent to {connected_count}/{len(user_ids)} connected participants for tournament {tournament_id}")
+        sent_count = await self._fan_out(user_ids, message)
+        logger.info(f"[WS] Sent {message.get('type')} to {len(user_ids)} connected participants of tournament {tournament_id} ({sent_count} socket(s))")
     
     async def broadcast_to_all(self, message: dict):
         """
         Відправити повідомлення всім підключеним користувачам (незалежно від участі в турнірі).
         Використовується для оновлень результатів гри, щоб всі могли бачити зміни.
         """
-        disconnected = []
-        for user_id, websockets in list(self.user_connections.items()):
-            for ws in list(websockets):
-                try:
-                    await ws.send_json(message)
-                except Exception as e:
-                    logger.warning(f"Failed to send message to user {user_id}: {e}")
-                    disconnected.append(ws)
-        
-        # Очищаємо мертві підключення
-        for ws in disconnected:
-            await self.disconnect(ws)
+        await self._fan_out(list(self.user_connections.keys()), message)
+    
+    async def send_personal(self, websocket: WebSocket, message: dict):
+        """Відправити службове повідомлення (pong, connected) в конкретний сокет з його кодуванням"""
+        encoded = EncodedMessage(message)
+        text, size = encoded.encode(self.websocket_encoding.get(websocket, ENCODING_JSON))
+        await websocket.send_text(text)
+        self.messages_sent[encoded.type] += 1
+        self.bytes_sent[encoded.type] += size
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Метрики WebSocket: підключення та відправлені повідомлення/байти по типах"""
+        return {
+            "connected_users": len(self.user_connections),
+            "connections": self.get_connection_count(),
+            "indexed_tournaments": len(self.tournament_members),
+            "messages_sent": dict(self.messages_sent),
+            "bytes_sent": dict(self.bytes_sent),
+        }
     
     def get_connected_users(self) -> Set[int]:
         """Отримати список всіх підключених користувачів"""
@@ -0,0 +1,62 @@
+"""
+Shared fixtures: SQLite in-memory database with all tables
+"""
+import pytest
+
+
+def create_sqlite_engine(foreign_keys: bool = False, path=None):
+    """SQLite in-memory (одне з'єднання на всі потоки) з усіма таблицями.
+
+    З path - файлова БД, де кожен потік отримує власне з'єднання з пулу
+    """
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.pool import StaticPool
+    from db import Base
+    # Усі моделі мають бути імпортовані, щоб relationship-и резолвились
+    import models.user  # noqa: F401
+    import models.tournament  # noqa: F401
+    import models.tournament_participant  # noqa: F401
+    import models.tournament_round  # noqa: F401
+    import models.tournament_game  # noqa: F401
+    import models.game_participant  # noqa: F401
+    import models.game_log  # noqa: F401
+    import models.tournament_log  # noqa: F401
+    import models.player_stats  # noqa: F401
+
+    if path is None:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    if foreign_keys:
+        event.listen(engine, "connect", lambda connection, record: connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def db_engine():
+    engine = create_sqlite_engine()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def fk_db_engine():
+    """Те саме, але з PRAGMA foreign_keys=ON"""
+    engine = create_sqlite_engine(foreign_keys=True)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    from sqlalchemy.orm import sessionmaker
+    return sessionmaker(bind=db_engine, autoflush=False)
+
+
+@pytest.fixture
+def db_session(session_factory):
+    """Порожня сесія; файли тестів наповнюють її власними даними"""
+    session = session_factory()
+    yield session
+    session.close()
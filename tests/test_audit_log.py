@@ -0,0 +1,105 @@
+"""
+Unit tests for the batched audit-log writer
+"""
+import pytest
+
+from services.audit_log import AuditLogWriter
+
+
+@pytest.fixture
+def session_factory(session_factory):
+    return with_author(session_factory)
+
+
+def with_author(factory):
+    """Додати користувача-автора логів"""
+    from models.user import User
+
+    session = factory()
+    session.add(User(id=1, battlenet_id="1", battletag="Admin#1"))
+    session.commit()
+    session.close()
+    return factory
+
+
+class TestAuditLogWriter:
+    def test_flush_writes_batch_with_author(self, session_factory):
+        from models.game_log import GameLog
+        from models.tournament_log import TournamentLog
+
+        writer = AuditLogWriter(session_factory=session_factory, autostart=False)
+        for i in range(3):
+            writer.log_game(10, 1, "position_set", f"set {i}")
+        writer.log_tournament(5, 1, "tournament_started", "started")
+
+        assert writer.get_metrics()["depth"] == 4
+        assert writer.flush() == 4
+
+        db = session_factory()
+        game_logs = db.query(GameLog).order_by(GameLog.id).all()
+        tournament_logs = db.query(TournamentLog).all()
+        assert [log.action_description for log in game_logs] == ["set 0", "set 1", "set 2"]
+        assert game_logs[0].user_battletag == "Admin#1"
+        assert tournament_logs[0].tournament_id == 5
+        db.close()
+
+        metrics = writer.get_metrics()
+        assert metrics["written"] == 4
+        assert metrics["batches"] == 1
+        assert metrics["depth"] == 0
+
+    def test_unknown_user_is_skipped(self, session_factory):
+        writer = AuditLogWriter(session_factory=session_factory, autostart=False)
+        writer.log_game(10, 999, "position_set", "ghost")
+        writer.log_game(10, 1, "position_set", "real")
+        writer.flush()
+        assert writer.skipped == 1
+        assert writer.written == 1
+
+    def test_full_queue_drops_entries(self, session_factory):
+        writer = AuditLogWriter(max_queue_size=2, session_factory=session_factory, autostart=False)
+        assert writer.log_game(10, 1, "a", "1") is True
+        assert writer.log_game(10, 1, "a", "2") is True
+        assert writer.log_game(10, 1, "a", "3") is False
+        assert writer.get_metrics()["dropped"] == 1
+
+    def test_batches_are_limited_by_size(self, session_factory):
+        writer = AuditLogWriter(batch_size=2, session_factory=session_factory, autostart=False)
+        for i in range(5):
+            writer.log_tournament(5, 1, "a", str(i))
+        writer.flush()
+        assert writer.batches == 3
+        assert writer.written == 5
+
+    def test_stop_flushes_background_queue(self, session_factory):
+        writer = AuditLogWriter(flush_interval_ms=10000, session_factory=session_factory)
+        writer.log_tournament(5, 1, "a", "pending")
+        assert writer.is_running
+        writer.stop(timeout=1)
+        assert writer.written == 1
+        assert not writer.is_running
+
+    def test_foreign_key_violation_loses_only_bad_row(self, fk_db_engine):
+        from sqlalchemy.orm import sessionmaker
+        from models.tournament import Tournament
+        from models.tournament_log import TournamentLog
+
+        factory = with_author(sessionmaker(bind=fk_db_engine, autoflush=False))
+        db = factory()
+        db.add(Tournament(id=5, name="Cup", creator_id=1, total_rounds=1, total_participants=8))
+        db.commit()
+        db.close()
+
+        writer = AuditLogWriter(session_factory=factory, autostart=False)
+        for i in range(7):
+            writer.log_tournament(5, 1, "a", f"ok {i}")
+        # Турнір видалено одразу після дії - FK tournament_logs.tournament_id
+        writer.log_tournament(999, 1, "a", "orphan")
+        writer.flush()
+
+        assert writer.written == 7
+        assert writer.failed == 1
+        db = factory()
+        descriptions = sorted(log.action_description for log in db.query(TournamentLog))
+        assert descriptions == [f"ok {i}" for i in range(7)]
+        db.close()
@@ -0,0 +1,121 @@
+"""
+Unit tests for connection pool instrumentation
+"""
+import pytest
+
+from core.db_pool import InstrumentedQueuePool, PoolCheckoutMiddleware, PoolMetrics, instrument_pool
+
+
+@pytest.fixture
+def metrics():
+    return PoolMetrics()
+
+
+@pytest.fixture
+def engine(metrics, tmp_path):
+    """SQLite-файл з інструментованим QueuePool (1 з'єднання + 1 overflow)"""
+    from sqlalchemy import create_engine
+
+    pool_class = type("TestPool", (InstrumentedQueuePool,), {"metrics": metrics})
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.sqlite3'}",
+        poolclass=pool_class,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.1,
+        connect_args={"check_same_thread": False},
+    )
+    instrument_pool(engine.pool, metrics)
+    yield engine
+    engine.dispose()
+
+
+class TestPoolMetrics:
+    def test_checkout_wait_and_gauges(self, engine, metrics):
+        from sqlalchemy import text
+
+        with engine.connect() as first:
+            first.execute(text("SELECT 1"))
+            with engine.connect() as second:
+                second.execute(text("SELECT 1"))
+                snapshot = metrics.get_metrics()
+                assert snapshot["in_use"] == 2
+                assert snapshot["checked_out"] == 2
+                assert snapshot["overflow"] == 1
+
+        snapshot = metrics.get_metrics()
+        assert snapshot["in_use"] == 0
+        assert snapshot["peak_in_use"] == 2
+        assert snapshot["checkouts"] == 2
+        assert snapshot["checkout_wait"]["count"] == 2
+        assert sum(snapshot["checkout_wait"]["histogram"].values()) == 2
+
+    def test_exhausted_pool_counts_timeout(self, engine, metrics):
+        from sqlalchemy import exc
+
+        first, second = engine.connect(), engine.connect()
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        first.close()
+        second.close()
+        assert metrics.get_metrics()["timeouts"] == 1
+
+    def test_histogram_buckets(self, metrics):
+        metrics.observe_wait(0.5)
+        metrics.observe_wait(30)
+        metrics.observe_wait(60000)
+        histogram = metrics.get_metrics()["checkout_wait"]["histogram"]
+        assert histogram["le_1ms"] == 1
+        assert histogram["le_50ms"] == 1
+        assert histogram["inf"] == 1
+
+
+class TestRequestAccounting:
+    @pytest.fixture
+    def client(self, engine, metrics):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from sqlalchemy import text
+
+        app = FastAPI()
+        app.add_middleware(PoolCheckoutMiddleware, metrics=metrics)
+
+        @app.get("/one")
+        def one():
+            for _ in range(2):
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+            return {}
+
+        @app.get("/nested")
+        def nested():
+            with engine.connect() as outer, engine.connect() as inner:
+                outer.execute(text("SELECT 1"))
+                inner.execute(text("SELECT 1"))
+            return {}
+
+        @app.get("/none")
+        def none():
+            return {}
+
+        return TestClient(app)
+
+    def test_sequential_checkouts_are_not_flagged(self, client, metrics):
+        client.get("/one")
+        requests = metrics.get_metrics()["requests"]
+        assert requests["count"] == 1
+        assert requests["checkouts_per_request"]["2"] == 1
+        assert requests["multi_connection"] == 0
+
+    def test_nested_connections_are_flagged(self, client, metrics, caplog):
+        import logging
+
+        metrics.debug = True
+        with caplog.at_level(logging.WARNING):
+            client.get("/nested")
+            client.get("/none")
+
+        requests = metrics.get_metrics()["requests"]
+        assert requests["multi_connection"] == 1
+        assert requests["checkouts_per_request"]["0"] == 1
+        assert "held 2 DB connections" in caplog.text
@@ -0,0 +1,54 @@
+"""
+Unit tests for shared finalist sets
+"""
+import pytest
+from types import SimpleNamespace
+
+import services.finalists as finalists
+from services.finalists import FinalistSets, get_finalist_sets, invalidate_finalist_sets
+
+
+class FakeSession:
+    def __init__(self):
+        self.info = {}
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls = []
+
+    def fake_load(db, tournament):
+        calls.append(tournament.id)
+        return FinalistSets(original=frozenset({1, 2}), actual=frozenset({2, 3}))
+
+    monkeypatch.setattr(finalists, "_load_finalist_sets", fake_load)
+    return calls
+
+
+def test_effective_prefers_actual_finalists():
+    assert FinalistSets(frozenset({1, 2}), frozenset({2, 3})).effective == {2, 3}
+    assert FinalistSets(frozenset({1, 2}), frozenset()).effective == {1, 2}
+
+
+def test_sets_are_memoized_per_session(loads):
+    db = FakeSession()
+    tournament = SimpleNamespace(id=7)
+
+    first = get_finalist_sets(db, tournament)
+    second = get_finalist_sets(db, tournament)
+
+    assert first is second
+    assert loads == [7]
+
+
+def test_invalidate_reloads(loads):
+    db = FakeSession()
+    tournament = SimpleNamespace(id=7)
+
+    get_finalist_sets(db, tournament)
+    invalidate_finalist_sets(db, 7)
+    get_finalist_sets(db, tournament)
+    invalidate_finalist_sets(db)
+    get_finalist_sets(db, tournament)
+
+    assert loads == [7, 7, 7]
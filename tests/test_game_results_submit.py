@@ -0,0 +1,79 @@
+"""
+Unit tests for game result submission running in a single transaction
+"""
+import pytest
+
+from core.roles import UserRole
+
+
+@pytest.fixture
+def db(db_session):
+    """Турнір на 8 гравців, одна гра з lobby maker-ом"""
+    from models.user import User
+    from models.tournament import Tournament, TournamentStatus
+    from models.tournament_participant import TournamentParticipant
+    from models.tournament_round import TournamentRound
+    from models.tournament_game import TournamentGame, GameStatus
+    from models.game_participant import GameParticipant
+
+    session = db_session
+    session.add(User(id=100, battlenet_id="100", battletag="Admin#100", role=UserRole.ADMIN))
+    for user_id in range(1, 9):
+        session.add(User(id=user_id, battlenet_id=str(user_id), battletag=f"Player#{user_id}"))
+    session.add(Tournament(id=1, name="Cup", creator_id=100, total_rounds=3,
+                           total_participants=8, status=TournamentStatus.ACTIVE))
+    session.add(TournamentRound(id=1, tournament_id=1, round_number=1))
+    session.add(TournamentGame(id=1, tournament_id=1, round_id=1, game_number=1,
+                               lobby_maker_id=1, status=GameStatus.ACTIVE))
+    for user_id in range(1, 9):
+        session.add(TournamentParticipant(id=user_id, tournament_id=1, user_id=user_id, total_score=0.0))
+        session.add(GameParticipant(game_id=1, participant_id=user_id))
+    session.commit()
+    return session
+
+
+def count_commits(db):
+    from sqlalchemy import event
+
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(1))
+    return commits
+
+
+class TestSubmitGameResults:
+    def test_full_submit_commits_once(self, db):
+        from models.tournament import Tournament
+        from models.tournament_game import TournamentGame, GameStatus
+        from models.game_participant import GameParticipant
+        from models.user import User
+        from schemas.game_results import GameResultsSubmission, GameResultInput
+        from services.games_service import submit_game_results_logic
+
+        admin = db.get(User, 100)
+        submission = GameResultsSubmission(results=[
+            GameResultInput(participant_id=pid, points=9 - pid) for pid in range(1, 9)
+        ])
+        commits = count_commits(db)
+
+        assert submit_game_results_logic(db, 1, submission, admin, db.get(Tournament, 1)) == 8
+        assert len(commits) == 1
+
+        points = {gp.participant_id: gp.points for gp in db.query(GameParticipant)}
+        assert points == {pid: 9 - pid for pid in range(1, 9)}
+        assert db.get(TournamentGame, 1).status == GameStatus.COMPLETED
+
+    def test_single_participant_submit_commits_once(self, db):
+        from models.tournament import Tournament
+        from models.tournament_game import TournamentGame
+        from models.game_participant import GameParticipant
+        from models.user import User
+        from schemas.game_results import GameResultInput
+        from services.games_service import submit_participant_result_logic
+
+        commits = count_commits(db)
+        submit_participant_result_logic(
+            db, 1, 3, GameResultInput(participant_id=3, points=6),
+            db.get(User, 100), db.get(Tournament, 1), db.get(TournamentGame, 1)
+        )
+        assert len(commits) == 1
+        assert db.query(GameParticipant).filter(GameParticipant.participant_id == 3).one().points == 6
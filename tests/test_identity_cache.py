@@ -0,0 +1,174 @@
+"""
+Unit tests for request-scoped authentication and the identity cache
+"""
+import time
+
+import pytest
+
+from core.identity import CurrentUser, IdentityCache
+from core.roles import UserRole
+
+
+@pytest.fixture
+def engine(db_engine, db_session):
+    """Два користувачі: гравець і адмін"""
+    from models.user import User
+
+    db_session.add(User(id=1, battlenet_id="1", battletag="Player#1", role=UserRole.USER))
+    db_session.add(User(id=2, battlenet_id="2", battletag="Admin#2", role=UserRole.ADMIN))
+    db_session.commit()
+    db_session.close()
+    return db_engine
+
+
+@pytest.fixture
+def app_client(engine, monkeypatch):
+    """Застосунок з ActivityTrackingMiddleware та свіжим кешем ідентичності"""
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import sessionmaker
+    import core.auth
+    from api.deps.db import get_db
+    from core.auth import get_admin, get_current_active_user, get_current_user_optional
+    from core.middleware import ActivityTrackingMiddleware
+
+    cache = IdentityCache(maxsize=100, ttl_seconds=60)
+    monkeypatch.setattr(core.auth, "identity_cache", cache)
+
+    factory = sessionmaker(bind=engine, autoflush=False)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.add_middleware(ActivityTrackingMiddleware)
+    app.dependency_overrides[get_db] = override_get_db
+
+    @app.get("/me")
+    def me(user=Depends(get_current_active_user)):
+        return {"id": user.id, "role": user.role.value, "battletag": user.battletag}
+
+    @app.get("/optional")
+    def optional(user=Depends(get_current_user_optional)):
+        return {"id": user.id if user else None}
+
+    @app.get("/admin")
+    def admin(user=Depends(get_admin)):
+        return {"id": user.id}
+
+    return TestClient(app), cache
+
+
+def auth(user_id: int) -> dict:
+    from core.auth import create_access_token
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def count_user_queries(engine):
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+class TestIdentityCache:
+    def test_entries_expire(self):
+        cache = IdentityCache(ttl_seconds=0.01)
+        cache.set(CurrentUser(1, UserRole.USER, True, "Player#1"))
+        assert cache.get(1) is not None
+        time.sleep(0.02)
+        assert cache.get(1) is None
+
+    def test_lru_eviction_and_invalidation(self):
+        cache = IdentityCache(maxsize=2)
+        for user_id in (1, 2):
+            cache.set(CurrentUser(user_id, UserRole.USER, True, f"P#{user_id}"))
+        cache.get(1)
+        cache.set(CurrentUser(3, UserRole.USER, True, "P#3"))
+        assert cache.get(2) is None
+        assert cache.get(1) is not None
+
+        cache.invalidate(1)
+        assert cache.get(1) is None
+        assert cache.get_metrics()["invalidations"] == 1
+
+    def test_snapshot_is_read_only(self):
+        user = CurrentUser(1, UserRole.USER, True, "Player#1")
+        with pytest.raises(AttributeError):
+            user.role = UserRole.ADMIN
+
+
+class TestRequestAuthentication:
+    def test_token_is_decoded_once_per_request(self, app_client, monkeypatch):
+        import core.auth
+
+        client, _ = app_client
+        calls = []
+        original = core.auth.decode_access_token
+        monkeypatch.setattr(core.auth, "decode_access_token", lambda token: calls.append(token) or original(token))
+        headers = auth(1)
+
+        assert client.get("/me", headers=headers).json()["battletag"] == "Player#1"
+        assert len(calls) == 1
+
+    def test_cached_identity_skips_user_query(self, app_client, engine):
+        client, cache = app_client
+        queries = count_user_queries(engine)
+        headers = auth(1)
+
+        client.get("/me", headers=headers)
+        assert len(queries) == 1
+        client.get("/me", headers=headers)
+        client.get("/optional", headers=headers)
+        assert len(queries) == 1
+        assert cache.get_metrics()["hits"] >= 2
+
+    def test_invalid_token(self, app_client):
+        client, _ = app_client
+        headers = {"Authorization": "Bearer not-a-token"}
+        assert client.get("/me", headers=headers).status_code == 401
+        assert client.get("/optional", headers=headers).json() == {"id": None}
+
+    def test_role_change_is_visible_after_invalidation(self, app_client, engine):
+        from sqlalchemy.orm import sessionmaker
+        from models.user import User
+
+        client, cache = app_client
+        headers = auth(1)
+        assert client.get("/admin", headers=headers).status_code == 403
+
+        session = sessionmaker(bind=engine)()
+        session.get(User, 1).role = UserRole.ADMIN
+        session.commit()
+        session.close()
+
+        # До інвалідації - знімок з кешу
+        assert client.get("/admin", headers=headers).status_code == 403
+        cache.invalidate(1)
+        assert client.get("/admin", headers=headers).status_code == 200
+
+    def test_deactivated_user_is_rejected(self, app_client, engine):
+        from sqlalchemy.orm import sessionmaker
+        from models.user import User
+
+        client, cache = app_client
+        headers = auth(1)
+        assert client.get("/me", headers=headers).status_code == 200
+
+        session = sessionmaker(bind=engine)()
+        session.get(User, 1).is_active = False
+        session.commit()
+        session.close()
+        cache.invalidate(1)
+
+        assert client.get("/me", headers=headers).status_code == 400
@@ -0,0 +1,33 @@
+"""
+Unit tests for in-memory lobby maker selection
+"""
+import pytest
+
+from services.tournament_strategies import merge_priority_lists, select_lobby_makers
+
+
+class TestMergePriorityLists:
+    def test_global_favorites_first_without_duplicates(self):
+        assert merge_priority_lists([5, 3], [3, 7, 5, 9]) == [5, 3, 7, 9]
+
+    def test_empty_lists(self):
+        assert merge_priority_lists([], []) == []
+        assert merge_priority_lists([], [2, 2]) == [2]
+
+
+class TestSelectLobbyMakers:
+    def test_highest_priority_player_wins(self):
+        games = {1: [10, 11, 12, 13], 2: [20, 21, 22, 23]}
+        result = select_lobby_makers(games, [22, 12, 11, 20])
+        assert result == {1: 12, 2: 22}
+
+    def test_game_without_priority_players_is_skipped(self):
+        games = {1: [10, 11], 2: [20, 21]}
+        assert select_lobby_makers(games, [21]) == {2: 21}
+
+    def test_duplicate_in_priority_keeps_first_rank(self):
+        games = {1: [10, 11]}
+        assert select_lobby_makers(games, [11, 10, 11]) == {1: 11}
+
+    def test_no_priority(self):
+        assert select_lobby_makers({1: [10, 11]}, []) == {}
@@ -0,0 +1,148 @@
+"""
+Unit tests for the WebSocket notification dispatcher
+"""
+import asyncio
+import threading
+
+import pytest
+
+from services.notification_dispatcher import NotificationDispatcher
+
+
+class TestNotificationDispatcher:
+    """Test queueing, backpressure and cross-thread enqueue"""
+
+    def test_notifications_are_processed_on_app_loop(self):
+        """Should run queued coroutines on the loop that owns the dispatcher"""
+        received = []
+
+        async def notify(value):
+            received.append((value, asyncio.get_running_loop()))
+
+        async def scenario():
+            dispatcher = NotificationDispatcher(max_queue_size=10, workers=2)
+            dispatcher.start()
+            loop = asyncio.get_running_loop()
+
+            assert dispatcher.enqueue(notify, value=1) is True
+            assert dispatcher.enqueue(notify, value=2) is True
+            await dispatcher.stop()
+            return dispatcher, loop
+
+        dispatcher, loop = asyncio.run(scenario())
+
+        assert sorted(v for v, _ in received) == [1, 2]
+        assert all(l is loop for _, l in received)
+        assert dispatcher.get_metrics()["processed"] == 2
+
+    def test_enqueue_from_worker_thread(self):
+        """Should accept notifications from sync handlers running in other threads"""
+        received = []
+
+        async def notify(value):
+            received.append(value)
+
+        async def scenario():
+            dispatcher = NotificationDispatcher(max_queue_size=10, workers=1)
+            dispatcher.start()
+
+            thread = threading.Thread(target=lambda: dispatcher.enqueue(notify, value="from-thread"))
+            thread.start()
+            await asyncio.get_running_loop().run_in_executor(None, thread.join)
+            await asyncio.sleep(0)
+            await dispatcher.stop()
+
+        asyncio.run(scenario())
+        assert received == ["from-thread"]
+
+    def test_full_queue_drops_and_counts(self):
+        """Should drop notifications when the bounded queue is full"""
+        async def notify():
+            await asyncio.sleep(0)
+
+        async def scenario():
+            dispatcher = NotificationDispatcher(max_queue_size=2, workers=1)
+            dispatcher.start()
+            results = [dispatcher.enqueue(notify) for _ in range(5)]
+            metrics = dispatcher.get_metrics()
+            await dispatcher.stop()
+            return results, metrics
+
+        results, metrics = asyncio.run(scenario())
+
+        assert results.count(True) == 2
+        assert metrics["dropped"] == 3
+        assert metrics["max_depth"] == 2
+
+    def test_failed_notification_does_not_stop_worker(self):
+        """Should count failures and keep processing the queue"""
+        received = []
+
+        async def broken():
+            raise RuntimeError("socket closed")
+
+        async def notify():
+            received.append(True)
+
+        async def scenario():
+            dispatcher = NotificationDispatcher(max_queue_size=10, workers=1)
+            dispatcher.start()
+            dispatcher.enqueue(broken)
+            dispatcher.enqueue(notify)
+            await dispatcher.stop()
+            return dispatcher.get_metrics()
+
+        metrics = asyncio.run(scenario())
+        assert metrics["failed"] == 1
+        assert received == [True]
+
+    def test_enqueue_without_loop_is_dropped(self):
+        """Should drop instead of spawning a thread when no loop is available"""
+        async def notify():
+            pass
+
+        dispatcher = NotificationDispatcher()
+        assert dispatcher.enqueue(notify) is False
+        assert dispatcher.get_metrics()["dropped"] == 1
+
+
+class TestTournamentNotifications:
+    """Notification coroutines build messages from caller-supplied data, without DB access"""
+
+    @pytest.fixture
+    def sent(self, monkeypatch):
+        import db
+        from services.websocket_manager import websocket_manager
+
+        sent = []
+
+        async def broadcast_to_users(user_ids, message):
+            sent.append((list(user_ids), message))
+
+        async def broadcast_to_tournament(tournament_id, message, db=None):
+            sent.append((tournament_id, message))
+
+        monkeypatch.setattr(websocket_manager, "broadcast_to_users", broadcast_to_users)
+        monkeypatch.setattr(websocket_manager, "broadcast_to_tournament", broadcast_to_tournament)
+        # Будь-яка спроба відкрити сесію в event loop - помилка тесту
+        monkeypatch.setattr(db, "SessionLocal", lambda: pytest.fail("notification opened a DB session"))
+        return sent
+
+    def test_finals_started_goes_to_passed_finalists(self, sent):
+        from services.notification_service import notify_finals_started
+
+        asyncio.run(notify_finals_started(
+            tournament_id=1, current_round=5, finalist_user_ids=[3, 7], tournament_name="Cup"
+        ))
+
+        ((user_ids, message),) = sent
+        assert user_ids == [3, 7]
+        assert message["finalists_count"] == 2
+        assert message["tournament_name"] == "Cup"
+        assert "'Cup'" in message["message"]
+
+    def test_tournament_finished_uses_passed_name(self, sent):
+        from services.notification_service import notify_tournament_finished
+
+        asyncio.run(notify_tournament_finished(tournament_id=1, tournament_name="Cup"))
+        assert sent[0][1]["tournament_name"] == "Cup"
@@ -0,0 +1,78 @@
+"""
+Unit tests for pairing engine strategies
+"""
+import pytest
+
+from services.pairing_engine import (
+    PAIRING_STRATEGIES, CoOccurrence, get_pairing, plan_lobbies, lobby_metrics
+)
+
+
+IDS = list(range(101, 117))           # 16 учасників, 2 лобі
+STRENGTH = list(range(16, 0, -1))     # 101 найсильніший
+
+
+def flat(plan):
+    return [pid for lobby in plan for pid in lobby]
+
+
+class TestRegistry:
+    def test_known_strategies(self):
+        for name in ("RANDOM", "SCORE", "BALANCED", "STRONG_VS_STRONG", "SWISS"):
+            assert name in PAIRING_STRATEGIES
+
+    def test_unknown_falls_back_to_random(self):
+        assert get_pairing("UNKNOWN") is PAIRING_STRATEGIES["RANDOM"]
+        assert get_pairing(None) is PAIRING_STRATEGIES["RANDOM"]
+
+
+class TestStrategies:
+    @pytest.mark.parametrize("name", ["RANDOM", "SCORE", "BALANCED", "STRONG_VS_STRONG", "SWISS"])
+    def test_every_participant_in_exactly_one_lobby(self, name):
+        plan = plan_lobbies(name, IDS, 2, strength=STRENGTH, history=[], seed=3)
+        assert [len(lobby) for lobby in plan] == [8, 8]
+        assert sorted(flat(plan)) == IDS
+
+    def test_random_is_reproducible_with_seed(self):
+        assert plan_lobbies("RANDOM", IDS, 2, seed=7) == plan_lobbies("RANDOM", IDS, 2, seed=7)
+
+    def test_strong_vs_strong_blocks(self):
+        plan = plan_lobbies("STRONG_VS_STRONG", IDS, 2, strength=STRENGTH)
+        assert plan == [IDS[:8], IDS[8:]]
+
+    def test_balanced_snake(self):
+        plan = plan_lobbies("BALANCED", IDS, 2, strength=STRENGTH)
+        assert plan[0][:4] == [101, 104, 105, 108]
+        assert plan[1][:4] == [102, 103, 106, 107]
+
+    def test_extra_participants_are_skipped(self):
+        plan = plan_lobbies("SCORE", IDS + [999], 2, strength=STRENGTH + [0])
+        assert 999 not in flat(plan)
+
+
+class TestSwiss:
+    def test_without_history_matches_score_brackets(self):
+        assert plan_lobbies("SWISS", IDS, 2, strength=STRENGTH, history=[]) == \
+            plan_lobbies("SCORE", IDS, 2, strength=STRENGTH)
+
+    def test_avoids_repeat_opponents(self):
+        # Попередній раунд: ті самі score-блоки, що дав би SCORE зараз
+        history = [IDS[:8], IDS[8:]]
+        score = dict(zip(IDS, STRENGTH))
+
+        naive = plan_lobbies("SCORE", IDS, 2, strength=STRENGTH)
+        swiss = plan_lobbies("SWISS", IDS, 2, strength=STRENGTH, history=history)
+
+        assert lobby_metrics(swiss, score, history)["repeat_pairs"] < \
+            lobby_metrics(naive, score, history)["repeat_pairs"]
+        # Найсильніший гравець залишається в першому лобі
+        assert swiss[0][0] == 101
+
+
+class TestCoOccurrence:
+    def test_counts_pairs_once_per_game(self):
+        matrix = CoOccurrence.from_games({10: 0, 20: 1, 30: 2}, [[10, 20], [10, 20, 30], [40, 10]])
+        assert matrix.get(0, 1) == 2
+        assert matrix.get(1, 0) == 2
+        assert matrix.get(0, 2) == 1
+        assert matrix.cost(0, [1, 2]) == 3
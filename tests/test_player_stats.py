@@ -0,0 +1,184 @@
+"""
+Unit tests for pre-aggregated player statistics
+"""
+import pytest
+
+from models.player_stats import PlayerStats, OVERALL_SIZE
+from services.player_stats import (
+    get_player_stats_rows, build_player_stats_response, refresh_player_stats
+)
+
+
+@pytest.fixture
+def db(db_session):
+    """8 гравців без турнірів"""
+    from models.user import User
+
+    for user_id in range(1, 9):
+        db_session.add(User(id=user_id, battlenet_id=str(user_id), battletag=f"Player#{user_id}"))
+    db_session.commit()
+    return db_session
+
+
+def play_tournament(db, tournament_id=1, size=8):
+    """Турнір на 8 гравців з однією завершеною грою (гравець i - місце i)"""
+    from models.tournament import Tournament, TournamentStatus
+    from models.tournament_participant import TournamentParticipant
+    from models.tournament_round import TournamentRound
+    from models.tournament_game import TournamentGame, GameStatus
+    from models.game_participant import GameParticipant
+
+    db.add(Tournament(id=tournament_id, name="Cup", creator_id=1, total_rounds=1,
+                      total_participants=size, status=TournamentStatus.ACTIVE))
+    db.add(TournamentRound(id=tournament_id, tournament_id=tournament_id, round_number=1))
+    db.add(TournamentGame(id=tournament_id, tournament_id=tournament_id, round_id=tournament_id,
+                          game_number=1, status=GameStatus.ACTIVE))
+    for user_id in range(1, 9):
+        participant_id = tournament_id * 100 + user_id
+        db.add(TournamentParticipant(id=participant_id, tournament_id=tournament_id,
+                                     user_id=user_id, total_score=float(9 - user_id)))
+        db.add(GameParticipant(game_id=tournament_id, participant_id=participant_id))
+    db.commit()
+    return db.get(Tournament, tournament_id)
+
+
+def finish(db, tournament):
+    from models.tournament import TournamentStatus
+    from models.tournament_game import TournamentGame, GameStatus
+    from models.game_participant import GameParticipant
+
+    for gp in db.query(GameParticipant).filter(GameParticipant.game_id == tournament.id):
+        gp.set_positions([gp.participant.user_id])
+        gp.participant.final_position = gp.participant.user_id
+    db.get(TournamentGame, tournament.id).status = GameStatus.COMPLETED
+    tournament.status = TournamentStatus.FINISHED
+    db.commit()
+
+
+def stats_for(db, user_id):
+    from models.user import User
+    return build_player_stats_response(db.get(User, user_id), get_player_stats_rows(db, user_id))
+
+
+class TestPlayerStatsSync:
+    def test_finishing_tournament_refreshes_rows(self, db):
+        finish(db, play_tournament(db))
+
+        winner = stats_for(db, 1)
+        assert winner["tournaments_played"] == 1
+        assert winner["overall"]["wins"] == 1
+        assert winner["stats_by_size"][8]["average_position"] == 1.0
+        assert winner["game_stats"] == {"total_games": 1, "average_game_position": 1.0}
+
+        third = stats_for(db, 3)
+        assert third["overall"]["third_places"] == 1
+        assert third["stats_by_size"][8]["total_score"] == 6.0
+
+    def test_result_change_refreshes_game_stats(self, db):
+        from models.game_participant import GameParticipant
+
+        tournament = play_tournament(db)
+        finish(db, tournament)
+        gp = db.query(GameParticipant).filter(GameParticipant.participant_id == 101).one()
+        gp.set_positions([4])
+        db.commit()
+
+        assert stats_for(db, 1)["game_stats"]["average_game_position"] == 4.0
+
+    def test_soft_delete_removes_tournament_from_stats(self, db):
+        tournament = play_tournament(db)
+        finish(db, tournament)
+        tournament.is_deleted = True
+        db.commit()
+
+        stats = stats_for(db, 1)
+        assert stats["tournaments_played"] == 0
+        assert stats["stats_by_size"] == {}
+        assert stats["game_stats"] == {"total_games": 0, "average_game_position": 0}
+
+    def test_score_recalculation_script_refreshes_stats(self, db, monkeypatch):
+        from sqlalchemy import update
+        from models.game_participant import GameParticipant
+        import scripts.recalculate_scores as script
+
+        finish(db, play_tournament(db))
+        assert stats_for(db, 1)["overall"]["total_score"] == 8.0
+
+        # Очки в обхід ORM: total_score учасників тепер застарілі
+        db.execute(update(GameParticipant).values(calculated_points=2.5))
+        db.commit()
+        monkeypatch.setattr(script, "SessionLocal", lambda: db)
+        script.recalculate_all_scores()
+
+        assert stats_for(db, 1)["overall"]["total_score"] == 2.5
+        assert stats_for(db, 8)["stats_by_size"][8]["total_score"] == 2.5
+
+    def test_game_results_apply_deltas_without_rebuild(self, db, monkeypatch):
+        import services.player_stats
+        from models.tournament_game import TournamentGame, GameStatus
+        from models.game_participant import GameParticipant
+        from models.tournament_participant import TournamentParticipant
+        from services.player_stats import compute_player_stats
+
+        tournament = play_tournament(db)
+        refresh_player_stats(db, range(1, 9))
+        db.commit()
+
+        def no_rebuild(db, user_ids):
+            raise AssertionError(f"full rebuild for {sorted(user_ids)}")
+
+        monkeypatch.setattr(services.player_stats, "compute_player_stats", no_rebuild)
+
+        # Позиції в незавершеній грі та очки активного турніру статистику не змінюють
+        results = db.query(GameParticipant).order_by(GameParticipant.participant_id).all()
+        for place, gp in enumerate(results, start=1):
+            gp.set_positions([place] if place < 7 else [7, 8])
+            gp.participant.total_score = 10.0
+        db.commit()
+        assert stats_for(db, 1)["game_stats"]["total_games"] == 0
+
+        # Завершення гри додає внески всіх учасників
+        db.get(TournamentGame, tournament.id).status = GameStatus.COMPLETED
+        db.commit()
+        # Зміна результату expired об'єкта (після commit) - дельта від старого значення
+        results[0].set_positions([5])
+        results[4].set_positions([1])
+        db.commit()
+
+        monkeypatch.undo()
+        expected = compute_player_stats(db, range(1, 9))
+        games = {}
+        for user_id in range(1, 9):
+            (overall,) = [row for row in get_player_stats_rows(db, user_id) if row.tournament_size == OVERALL_SIZE]
+            (fresh,) = [row for row in expected[user_id] if row.tournament_size == OVERALL_SIZE]
+            games[user_id] = (overall.games_played, overall.game_position_sum)
+            assert games[user_id] == (fresh.games_played, fresh.game_position_sum)
+        assert games[1] == (1, 5.0)
+        assert games[7] == (1, 7.5)
+        assert db.get(TournamentParticipant, 101).total_score == 10.0
+
+    def test_rollback_discards_pending_refresh(self, db):
+        from models.tournament import TournamentStatus
+        from services.player_stats import PENDING_KEY
+
+        tournament = play_tournament(db)
+        tournament.status = TournamentStatus.FINISHED
+        db.flush()
+        assert PENDING_KEY in db.info
+        db.rollback()
+        assert PENDING_KEY not in db.info
+
+
+class TestRefresh:
+    def test_every_user_gets_overall_row(self, db):
+        refresh_player_stats(db, [5])
+        db.commit()
+        rows = get_player_stats_rows(db, 5)
+        assert [(row.tournament_size, row.tournaments_played) for row in rows] == [(OVERALL_SIZE, 0)]
+
+    def test_unplayed_user_has_no_overall_block(self, db):
+        refresh_player_stats(db, [5])
+        db.commit()
+        stats = stats_for(db, 5)
+        assert "overall" not in stats
+        assert stats["tournaments_played"] == 0
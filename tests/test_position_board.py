@@ -0,0 +1,112 @@
+"""
+Unit tests for in-memory position occupancy board
+"""
+import pytest
+from types import SimpleNamespace
+from fastapi import HTTPException
+
+from services.position_board import (
+    PositionBoard, positions_to_mask, mask_to_positions, validate_positions_shape
+)
+
+
+def make_board(existing):
+    """existing: {participant_id: positions or None}"""
+    game_participants = []
+    for participant_id, positions in existing.items():
+        user = SimpleNamespace(battletag=f"Player#{participant_id}")
+        game_participants.append(SimpleNamespace(
+            id=100 + participant_id,
+            participant_id=participant_id,
+            position_mask=positions_to_mask(positions) if positions else None,
+            participant=SimpleNamespace(user_id=participant_id, user=user),
+        ))
+    return PositionBoard(game_participants)
+
+
+class TestMasks:
+    def test_round_trip(self):
+        assert positions_to_mask([2, 3]) == 0b110
+        assert mask_to_positions(0b110) == [2, 3]
+        assert mask_to_positions(positions_to_mask(range(1, 9))) == list(range(1, 9))
+
+    def test_shape_validation(self):
+        validate_positions_shape([4, 5, 6])
+        for bad in ([], [0], [9], [2, 4]):
+            with pytest.raises(HTTPException):
+                validate_positions_shape(bad)
+
+
+class TestBatchValidation:
+    def test_full_lobby_with_shared_group(self):
+        board = make_board({i: None for i in range(1, 9)})
+        updates = {1: [1], 2: [2, 3], 3: [2, 3], 4: [4], 5: [5], 6: [6, 7, 8], 7: [6, 7, 8], 8: [6, 7, 8]}
+        board.validate(updates)
+
+    def test_overlap_with_existing_names_owner(self):
+        board = make_board({1: [2, 3], 2: None})
+        with pytest.raises(HTTPException) as exc:
+            board.validate({2: [2]})
+        assert "Player#1" in exc.value.detail
+
+    def test_group_used_too_many_times(self):
+        board = make_board({1: [2, 3], 2: [2, 3], 3: None})
+        with pytest.raises(HTTPException) as exc:
+            board.validate({3: [2, 3]})
+        assert "can only be used 2 times" in exc.value.detail
+
+    def test_conflict_inside_batch(self):
+        board = make_board({1: None, 2: None})
+        with pytest.raises(HTTPException) as exc:
+            board.validate({1: [5], 2: [5]})
+        assert "in batch" in exc.value.detail
+
+    def test_swap_is_validated_against_final_state(self):
+        """Обмін позиціями в одному batch не конфліктує зі старими значеннями"""
+        board = make_board({1: [1], 2: [8]})
+        board.validate({1: [8], 2: [1]})
+
+    def test_own_previous_positions_ignored(self):
+        board = make_board({1: [3]})
+        board.validate({1: [3, 4]})
+
+
+class TestBoardHelpers:
+    def test_battletag(self):
+        board = make_board({1: [1], 2: None})
+        assert board.battletag(1) == "Player#1"
+        assert board.battletag(42) == "Unknown"
+
+    def test_all_have_positions(self):
+        assert not make_board({1: [1], 2: None}).all_have_positions()
+        assert make_board({1: [1], 2: [2]}).all_have_positions()
+
+
+@pytest.fixture
+def mapped_models():
+    """Усі моделі, щоб relationship("TournamentGame") тощо могли зрезолвитись"""
+    from models.user import User  # noqa: F401
+    from models.tournament import Tournament  # noqa: F401
+    from models.tournament_round import TournamentRound  # noqa: F401
+    from models.tournament_game import TournamentGame  # noqa: F401
+    from models.game_participant import GameParticipant
+    return GameParticipant
+
+
+class TestGameParticipantAccessors:
+    def test_positions_round_trip(self, mapped_models):
+        GameParticipant = mapped_models
+        gp = GameParticipant(positions="[6, 7, 8]")
+        assert gp.position_mask == 0b11100000
+        assert gp.best_position == 6
+        assert gp.positions == "[6, 7, 8]"
+        assert gp.positions_list == [6, 7, 8]
+        assert gp.average_position == 7.0
+
+    def test_clear_positions(self, mapped_models):
+        GameParticipant = mapped_models
+        gp = GameParticipant(positions=[3])
+        gp.set_positions(None)
+        assert gp.positions is None
+        assert gp.best_position is None
+        assert gp.positions_list == []
@@ -0,0 +1,95 @@
+"""
+Unit tests for the write-behind last_seen tracker
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from core.presence import PresenceTracker
+
+
+NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class TestPresenceCoalescing:
+    """Test that writes are coalesced per user"""
+
+    def test_first_touch_is_queued(self):
+        """Should queue the first activity of a user"""
+        tracker = PresenceTracker(write_interval=60)
+        tracker.touch(1, NOW)
+        assert tracker._pending == {1: NOW}
+
+    def test_touches_within_interval_are_not_queued_again(self):
+        """Should write a user at most once per write interval"""
+        tracker = PresenceTracker(write_interval=60)
+        tracker.touch(1, NOW)
+        tracker._pending.clear()  # emulate flush
+
+        tracker.touch(1, NOW + timedelta(seconds=30))
+        assert tracker._pending == {}
+
+        tracker.touch(1, NOW + timedelta(seconds=61))
+        assert tracker._pending == {1: NOW + timedelta(seconds=61)}
+
+    def test_buffer_keeps_freshest_value_for_reads(self):
+        """Should expose the latest activity even if not queued for write"""
+        tracker = PresenceTracker(write_interval=60)
+        tracker.touch(1, NOW)
+        tracker.touch(1, NOW + timedelta(seconds=30))
+        assert tracker.get_last_seen(1) == NOW + timedelta(seconds=30)
+
+
+class TestPresenceReads:
+    """Test merging buffered and DB values"""
+
+    def test_db_value_used_when_not_buffered(self):
+        tracker = PresenceTracker()
+        assert tracker.get_last_seen(1, NOW) == NOW
+
+    def test_fresher_value_wins(self):
+        tracker = PresenceTracker()
+        tracker.touch(1, NOW)
+        assert tracker.get_last_seen(1, NOW - timedelta(minutes=10)) == NOW
+        assert tracker.get_last_seen(1, NOW + timedelta(minutes=1)) == NOW + timedelta(minutes=1)
+
+    def test_naive_db_value_treated_as_utc(self):
+        tracker = PresenceTracker()
+        tracker.touch(1, NOW)
+        naive = (NOW + timedelta(minutes=1)).replace(tzinfo=None)
+        assert tracker.get_last_seen(1, naive) == NOW + timedelta(minutes=1)
+
+
+class TestPresenceFlushStatement:
+    """Test the bulk UPDATE statement shape"""
+
+    def test_flush_uses_single_update_from_values(self, monkeypatch):
+        """Should write all pending users with one UPDATE ... FROM (VALUES ...)"""
+        executed = []
+
+        class FakeSession:
+            def execute(self, stmt):
+                executed.append(str(stmt.compile(dialect=postgresql.dialect())))
+
+            def commit(self):
+                pass
+
+            def rollback(self):
+                pass
+
+            def close(self):
+                pass
+
+        import db
+        monkeypatch.setattr(db, "SessionLocal", FakeSession)
+
+        tracker = PresenceTracker()
+        tracker.touch(1, NOW)
+        tracker.touch(2, NOW)
+
+        assert tracker.flush() == 2
+        assert len(executed) == 1
+        assert executed[0].startswith("UPDATE users SET last_seen=presence.last_seen")
+        assert "FROM (VALUES" in executed[0]
+        assert tracker._pending == {}
@@ -0,0 +1,348 @@
+"""
+Unit tests for query plans of hot endpoint queries
+
+TestSQLiteIndexPlans запускається завжди: ті самі синтетичні дані в SQLite
+in-memory, перевірка EXPLAIN QUERY PLAN для композитного індексу ігор турніру.
+
+Решта тестів - лише PostgreSQL. Потрібна окрема, одноразова БД: схема
+перестворюється (drop_all/create_all) і заповнюється синтетичними даними.
+
+    PLAN_TEST_DATABASE_URL=postgresql://localhost/blackbears_plans python -m pytest tests/test_query_plans.py
+
+Кожен SELECT, який виконують функції основних ендпоінтів, проганяється через
+EXPLAIN з enable_seqscan = off: якщо планувальник усе одно обирає Seq Scan
+по великій таблиці, значить придатного індексу немає.
+"""
+import os
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+PLAN_TEST_DATABASE_URL = os.getenv("PLAN_TEST_DATABASE_URL")
+
+requires_postgres = pytest.mark.skipif(
+    not PLAN_TEST_DATABASE_URL,
+    reason="PLAN_TEST_DATABASE_URL is not set (needs a throwaway PostgreSQL database)"
+)
+
+# Таблиці, що ростуть разом з кількістю турнірів / дій
+LARGE_TABLES = {
+    "users",
+    "tournaments",
+    "tournament_participants",
+    "tournament_rounds",
+    "tournament_games",
+    "game_participants",
+    "game_logs",
+    "tournament_logs",
+    "player_stats",
+}
+
+USERS = 400
+TOURNAMENTS = 40
+PLAYERS = 32
+ROUNDS = 5
+
+
+def seed(connection):
+    """Синтетичні турніри: 32 гравці, 5 раундів по 4 гри, логи дій"""
+    from sqlalchemy import insert
+    from models.user import User
+    from models.tournament import Tournament, TournamentStatus
+    from models.tournament_participant import TournamentParticipant
+    from models.tournament_round import TournamentRound, RoundStatus
+    from models.tournament_game import TournamentGame, GameStatus
+    from models.game_participant import GameParticipant, positions_to_mask
+    from models.game_log import GameLog
+    from models.tournament_log import TournamentLog
+
+    rng = random.Random(20)
+    started = datetime(2025, 1, 1)
+
+    connection.execute(insert(User), [
+        {"id": i, "battlenet_id": str(i), "battletag": f"Player#{i}"} for i in range(1, USERS + 1)
+    ])
+
+    tournaments, participants, rounds, games, game_participants, game_logs, tournament_logs = [], [], [], [], [], [], []
+    participant_id = round_id = game_id = 0
+    for tournament_id in range(1, TOURNAMENTS + 1):
+        finished = tournament_id % 4 != 0
+        tournaments.append({
+            "id": tournament_id, "name": f"Cup {tournament_id}", "creator_id": rng.randint(1, 20),
+            "total_participants": PLAYERS, "total_rounds": ROUNDS, "current_round": ROUNDS,
+            "status": TournamentStatus.FINISHED if finished else TournamentStatus.ACTIVE,
+            "start_date": started + timedelta(days=tournament_id),
+            "is_deleted": tournament_id % 10 == 0, "tiebreak_seed": tournament_id,
+        })
+
+        ids = []
+        for place, user_id in enumerate(rng.sample(range(1, USERS + 1), PLAYERS), start=1):
+            participant_id += 1
+            ids.append(participant_id)
+            participants.append({
+                "id": participant_id, "tournament_id": tournament_id, "user_id": user_id,
+                "total_score": float(rng.randint(0, 60)), "finals_score": None,
+                "final_position": place if finished else None,
+            })
+
+        for round_number in range(1, ROUNDS + 1):
+            round_id += 1
+            rounds.append({
+                "id": round_id, "tournament_id": tournament_id, "round_number": round_number,
+                "status": RoundStatus.COMPLETED,
+            })
+            rng.shuffle(ids)
+            for game_number in range(PLAYERS // 8):
+                game_id += 1
+                games.append({
+                    "id": game_id, "tournament_id": tournament_id, "round_id": round_id,
+                    "game_number": game_number + 1, "status": GameStatus.COMPLETED,
+                })
+                for seat, pid in enumerate(ids[game_number * 8:(game_number + 1) * 8], start=1):
+                    game_participants.append({
+                        "game_id": game_id, "participant_id": pid,
+                        "position_mask": positions_to_mask([seat]), "best_position": seat,
+                        "calculated_points": float(9 - seat), "is_lobby_maker": False,
+                    })
+                for action in range(10):
+                    game_logs.append({
+                        "game_id": game_id, "user_id": 1, "user_battletag": "Player#1", "user_role": "admin",
+                        "action_type": "position_set", "action_description": f"action {action}",
+                        "created_at": started + timedelta(days=tournament_id, minutes=round_number * 60 + action),
+                    })
+            tournament_logs.append({
+                "tournament_id": tournament_id, "user_id": 1, "user_battletag": "Player#1", "user_role": "admin",
+                "action_type": "next_round_created", "action_description": f"round {round_number}",
+                "created_at": started + timedelta(days=tournament_id, minutes=round_number * 60),
+            })
+
+    connection.execute(insert(Tournament), tournaments)
+    connection.execute(insert(TournamentParticipant), participants)
+    connection.execute(insert(TournamentRound), rounds)
+    connection.execute(insert(TournamentGame), games)
+    connection.execute(insert(GameParticipant), game_participants)
+    connection.execute(insert(GameLog), game_logs)
+    connection.execute(insert(TournamentLog), tournament_logs)
+
+
+def import_models():
+    import models.user  # noqa: F401
+    import models.tournament  # noqa: F401
+    import models.tournament_participant  # noqa: F401
+    import models.tournament_round  # noqa: F401
+    import models.tournament_game  # noqa: F401
+    import models.game_participant  # noqa: F401
+    import models.game_log  # noqa: F401
+    import models.tournament_log  # noqa: F401
+    import models.player_stats  # noqa: F401
+
+
+@pytest.fixture(scope="module")
+def plan_engine():
+    from sqlalchemy import create_engine, text
+    from db import Base
+
+    import_models()
+    engine = create_engine(PLAN_TEST_DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        seed(connection)
+    with engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+
+    yield engine
+
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@contextmanager
+def captured_queries(engine):
+    """SQL (SELECT / UPDATE), виконаний рушієм усередині блоку, з параметрами"""
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seq_scans(plan, found=None):
+    """Таблиці з LARGE_TABLES, які план читає через Seq Scan"""
+    found = [] if found is None else found
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in LARGE_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        seq_scans(child, found)
+    return found
+
+
+def assert_index_plans(engine, statements):
+    from sqlalchemy import text
+
+    assert statements, "no queries captured"
+    with engine.connect() as connection:
+        connection.execute(text("SET enable_seqscan = off"))
+        for statement, parameters in statements:
+            result = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = result.scalar()[0]["Plan"]
+            scans = seq_scans(plan)
+            assert not scans, f"Seq Scan on {scans} for query:\n{statement}"
+        connection.rollback()
+
+
+@pytest.fixture
+def db(plan_engine):
+    from sqlalchemy.orm import sessionmaker
+
+    session = sessionmaker(bind=plan_engine, autoflush=False)()
+    yield session
+    session.rollback()
+    session.close()
+
+
+def get_tournament_model(db, tournament_id=1):
+    from models.tournament import Tournament
+    return db.get(Tournament, tournament_id)
+
+
+@requires_postgres
+class TestTournamentQueries:
+    def test_tournament_list(self, plan_engine, db):
+        from api.crud.tournament_crud import get_tournaments
+        from models.tournament import TournamentStatus
+
+        with captured_queries(plan_engine) as statements:
+            get_tournaments(db, limit=20, viewer_id=5)
+            get_tournaments(db, limit=20, status=[TournamentStatus.FINISHED], viewer_id=5)
+        assert_index_plans(plan_engine, statements)
+
+    def test_tournament_details_and_creator_list(self, plan_engine, db):
+        from api.crud.tournament_crud import get_tournament, get_user_tournaments
+
+        with captured_queries(plan_engine) as statements:
+            get_tournament(db, 3)
+            get_user_tournaments(db, 7)
+        assert_index_plans(plan_engine, statements)
+
+    def test_round_games(self, plan_engine, db):
+        from api.crud.game_crud import get_round_games
+
+        with captured_queries(plan_engine) as statements:
+            get_round_games(db, 12)
+        assert_index_plans(plan_engine, statements)
+
+    def test_tournament_logs(self, plan_engine, db):
+        from api.crud.tournament_log_crud import get_combined_tournament_logs, count_combined_tournament_logs
+
+        with captured_queries(plan_engine) as statements:
+            get_combined_tournament_logs(db, 3, limit=50)
+            count_combined_tournament_logs(db, 3)
+        assert_index_plans(plan_engine, statements)
+
+
+@requires_postgres
+class TestStandingsQueries:
+    def test_final_standings_and_finalists(self, plan_engine, db):
+        from sqlalchemy import select
+        from api.crud.participant_crud import _final_standings_query
+        from services.finalists import _load_finalist_sets
+
+        tournament = get_tournament_model(db, 3)
+        with captured_queries(plan_engine) as statements:
+            db.execute(select(_final_standings_query(tournament))).all()
+            _load_finalist_sets(db, tournament)
+        assert_index_plans(plan_engine, statements)
+
+    def test_swiss_pairing_history(self, plan_engine, db):
+        from models.tournament_participant import TournamentParticipant
+        from services.tournament_strategies import SwissStrategy
+
+        tournament = get_tournament_model(db, 3)
+        participants = db.query(TournamentParticipant).filter(
+            TournamentParticipant.tournament_id == tournament.id
+        ).all()
+        with captured_queries(plan_engine) as statements:
+            SwissStrategy()._plan_swiss(db, tournament, participants, PLAYERS // 8)
+        assert_index_plans(plan_engine, statements)
+
+
+@requires_postgres
+class TestPlayerStatsQueries:
+    def test_player_stats(self, plan_engine, db):
+        from services.player_stats import compute_player_stats, get_player_stats_rows
+
+        with captured_queries(plan_engine) as statements:
+            compute_player_stats(db, [5])
+            get_player_stats_rows(db, 5)
+        assert_index_plans(plan_engine, statements)
+
+
+@pytest.fixture(scope="module")
+def sqlite_engine():
+    from sqlalchemy import create_engine, text
+    from db import Base
+
+    import_models()
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        seed(connection)
+        connection.execute(text("ANALYZE"))
+    yield engine
+    engine.dispose()
+
+
+def sqlite_plan(engine, statements) -> str:
+    """EXPLAIN QUERY PLAN усіх захоплених запитів одним текстом"""
+    assert statements, "no queries captured"
+    with engine.connect() as connection:
+        return "\n".join(
+            row[-1]
+            for statement, parameters in statements
+            for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+        )
+
+
+class TestSQLiteIndexPlans:
+    # "USING INDEX" або "USING COVERING INDEX"
+    INDEX = "INDEX ix_tournament_games_tournament_id_round_id"
+
+    def test_final_games_use_composite_index(self, sqlite_engine):
+        from sqlalchemy.orm import sessionmaker
+        from models.tournament_game import TournamentGame
+
+        db = sessionmaker(bind=sqlite_engine)()
+        # Як у swap фіналістів: ігри турніру в заданих раундах
+        with captured_queries(sqlite_engine) as statements:
+            db.query(TournamentGame).filter(
+                TournamentGame.tournament_id == 3,
+                TournamentGame.round_id.in_([13, 14])
+            ).all()
+        db.close()
+
+        plan = sqlite_plan(sqlite_engine, statements)
+        assert f"{self.INDEX} (tournament_id=? AND round_id=?)" in plan
+
+    def test_tournament_games_use_index_prefix(self, sqlite_engine):
+        from sqlalchemy.orm import sessionmaker
+        from models.tournament_game import TournamentGame
+
+        db = sessionmaker(bind=sqlite_engine)()
+        with captured_queries(sqlite_engine) as statements:
+            db.query(TournamentGame.id).filter(TournamentGame.tournament_id == 3).all()
+        db.close()
+
+        plan = sqlite_plan(sqlite_engine, statements)
+        assert "SCAN tournament_games" not in plan
+        assert f"{self.INDEX} (tournament_id=?)" in plan
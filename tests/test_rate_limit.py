@@ -0,0 +1,161 @@
+"""
+Unit tests for the sliding-window rate limiter
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.rate_limit import (
+    InMemoryRateLimitStore, SQLiteRateLimitStore, RateLimitMiddleware, RateLimitRule, RateLimitStore,
+    sliding_window_estimate, sliding_window_retry_after
+)
+
+
+class TestSlidingWindowMath:
+    """Test window estimate and Retry-After calculation"""
+
+    def test_previous_window_weight_decays(self):
+        """Should weight previous window by the remaining overlap"""
+        assert sliding_window_estimate(10, 0, 0, 60) == 10
+        assert sliding_window_estimate(10, 0, 30, 60) == 5
+        assert sliding_window_estimate(10, 2, 45, 60) == 4.5
+
+    def test_retry_after_when_current_window_exhausted(self):
+        """Should wait for next window plus the decay of the exhausted one"""
+        # 10/10 used at second 20: next window starts in 40s, weight must fall below 1.0 -> 0s extra
+        assert sliding_window_retry_after(0, 10, 20, 60, 10) == pytest.approx(40)
+        # 20 requests with limit 10: weight must drop to 0.5 -> 30s into next window
+        assert sliding_window_retry_after(0, 20, 20, 60, 10) == pytest.approx(70)
+
+    def test_retry_after_from_previous_window(self):
+        """Should wait until previous window contribution decays"""
+        # previous 10, current 0, limit 5 at second 0 -> needs weight < 0.5 -> 30s
+        assert sliding_window_retry_after(10, 0, 0, 60, 5) == pytest.approx(30)
+
+
+class TestInMemoryStore:
+    """Test counters and eviction"""
+
+    def test_limit_enforced_within_window(self):
+        store = InMemoryRateLimitStore()
+        limits = [(3, 60)]
+        results = [store.hit("ip", limits, 600.0 + i)[0] for i in range(4)]
+        assert results == [True, True, True, False]
+
+    def test_denied_request_does_not_consume_other_limits(self):
+        """Should not count a request rejected by the hourly limit in the minute window"""
+        store = InMemoryRateLimitStore()
+        limits = [(100, 60), (2, 3600)]
+        store.hit("ip", limits, 3600.0)
+        store.hit("ip", limits, 3601.0)
+        allowed, retry_after, limit, window = store.hit("ip", limits, 3602.0)
+        assert allowed is False
+        assert (limit, window) == (2, 3600)
+        assert store._counters[("ip", 60)][2] == 2
+
+    def test_idle_keys_are_evicted(self):
+        store = InMemoryRateLimitStore()
+        store.hit("a", [(10, 60)], 0.0)
+        store.hit("b", [(10, 60)], 150.0)
+        assert store.evict(150.0) == 1
+        assert len(store) == 1
+
+
+class TestSQLiteStore:
+    """Test the shared local store used by several workers"""
+
+    def test_two_store_instances_share_counters(self, tmp_path):
+        path = str(tmp_path / "limits.sqlite3")
+        worker_a = SQLiteRateLimitStore(path)
+        worker_b = SQLiteRateLimitStore(path)
+        limits = [(2, 60)]
+
+        assert worker_a.hit("ip", limits, 600.0)[0] is True
+        assert worker_b.hit("ip", limits, 601.0)[0] is True
+        assert worker_a.hit("ip", limits, 602.0)[0] is False
+
+    def test_eviction(self, tmp_path):
+        store = SQLiteRateLimitStore(str(tmp_path / "limits.sqlite3"))
+        store.hit("ip", [(2, 60)], 0.0)
+        assert store.evict(200.0) == 1
+
+    def test_store_interface_is_abstract(self):
+        with pytest.raises(TypeError):
+            RateLimitStore()
+        assert SQLiteRateLimitStore.blocking is True
+        assert InMemoryRateLimitStore.blocking is False
+
+
+class TestMiddleware:
+    """Test route budgets and the 429 response"""
+
+    def _client(self):
+        app = FastAPI()
+        app.add_middleware(
+            RateLimitMiddleware,
+            requests_per_minute=3,
+            requests_per_hour=100,
+            rules=[RateLimitRule("results", r"^/games/\d+/results$", 1, 100, frozenset({"PUT"}))],
+        )
+
+        @app.get("/tournaments")
+        async def tournaments():
+            return []
+
+        @app.put("/games/{game_id}/results")
+        async def results(game_id: int):
+            return {}
+
+        return TestClient(app)
+
+    def test_429_response_with_retry_after(self):
+        client = self._client()
+        for _ in range(3):
+            assert client.get("/tournaments").status_code == 200
+
+        response = client.get("/tournaments")
+        assert response.status_code == 429
+        assert response.json()["type"] == "rate_limit_error"
+        assert 1 <= int(response.headers["Retry-After"]) <= 120
+
+    def test_route_budgets_are_separate(self):
+        client = self._client()
+        assert client.put("/games/1/results").status_code == 200
+        assert client.put("/games/1/results").status_code == 429
+        # list budget is untouched
+        assert client.get("/tournaments").status_code == 200
+
+    def test_blocking_store_runs_off_event_loop(self, tmp_path):
+        import threading
+
+        class RecordingStore(SQLiteRateLimitStore):
+            def hit(self, key, limits, now):
+                self.thread = threading.get_ident()
+                return super().hit(key, limits, now)
+
+        store = RecordingStore(str(tmp_path / "limits.sqlite3"))
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, requests_per_minute=1, store=store)
+
+        @app.get("/tournaments")
+        async def tournaments():
+            return {"loop_thread": threading.get_ident()}
+
+        client = TestClient(app)
+        response = client.get("/tournaments")
+        assert response.status_code == 200
+        assert store.thread != response.json()["loop_thread"]
+        assert client.get("/tournaments").status_code == 429
+
+
+class TestAppRules:
+    def test_lists_rule_matches_only_list_paths(self):
+        from main import app
+
+        (middleware,) = [m for m in app.user_middleware if m.cls is RateLimitMiddleware]
+        (lists,) = [rule for rule in middleware.kwargs["rules"] if rule.name == "lists"]
+
+        for path in ("/tournaments", "/tournaments/", "/tournaments/my", "/tournaments/my/"):
+            assert lists.matches("GET", path), path
+        for path in ("/tournamentsmy", "/tournaments/1", "/tournaments/myx"):
+            assert not lists.matches("GET", path), path
@@ -0,0 +1,67 @@
+"""
+Unit tests for startup migrations check and phase timings
+"""
+import pytest
+
+from core.startup import PhaseTimer, alembic_config, get_head_revisions, run_migrations_if_needed
+
+
+@pytest.fixture
+def engine(tmp_path):
+    from sqlalchemy import create_engine
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.sqlite3'}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def upgrades(monkeypatch):
+    """Перехоплює alembic upgrade (міграції написані під PostgreSQL)"""
+    from alembic import command
+
+    calls = []
+    monkeypatch.setattr(command, "upgrade", lambda config, revision: calls.append((config, revision)))
+    return calls
+
+
+def stamp(engine, revision: str):
+    from sqlalchemy import text
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": revision})
+
+
+class TestRunMigrationsIfNeeded:
+    def test_head_has_single_revision(self):
+        assert len(get_head_revisions(alembic_config())) == 1
+
+    def test_database_at_head_is_skipped(self, engine, upgrades):
+        (head,) = get_head_revisions(alembic_config())
+        stamp(engine, head)
+        assert run_migrations_if_needed(engine) is False
+        assert upgrades == []
+
+    def test_outdated_database_is_upgraded_in_process(self, engine, upgrades):
+        stamp(engine, "f0708fc96070")
+        assert run_migrations_if_needed(engine) is True
+
+        ((config, revision),) = upgrades
+        assert revision == "head"
+        assert config.attributes["connection"] is not None
+        assert config.attributes["configure_logger"] is False
+
+    def test_empty_database_is_upgraded(self, engine, upgrades):
+        assert run_migrations_if_needed(engine) is True
+        assert len(upgrades) == 1
+
+
+class TestPhaseTimer:
+    def test_phases_are_recorded_in_order(self):
+        timer = PhaseTimer()
+        timer.record("imports", 120.04)
+        with timer.phase("migrations"):
+            pass
+        metrics = timer.get_metrics()
+        assert list(metrics) == ["imports", "migrations"]
+        assert metrics["imports"] == 120.0
+        assert "total" in timer.summary()
@@ -0,0 +1,105 @@
+"""
+Unit tests for hot read endpoints running in the threadpool
+"""
+import asyncio
+import time
+
+import pytest
+
+# (router module, endpoint function) - читання з sync Session, мають бути def
+HOT_READ_ENDPOINTS = [
+    ("api.routers.tournaments", "list_tournaments"),
+    ("api.routers.tournaments", "get_tournament_details"),
+    ("api.routers.tournaments", "get_round_games"),
+    ("api.routers.tournaments", "get_tournament_logs"),
+    ("api.routers.games", "get_round_games_endpoint"),
+    ("api.routers.stats", "get_player_stats"),
+    ("api.routers.users", "search_users"),
+]
+
+
+class TestHotEndpoints:
+    @pytest.mark.parametrize("module_name,endpoint", HOT_READ_ENDPOINTS)
+    def test_endpoint_is_sync(self, module_name, endpoint):
+        import importlib
+
+        module = importlib.import_module(module_name)
+        routes = [route for route in module.router.routes if getattr(route, "name", None) == endpoint]
+        assert routes, f"{endpoint} is not registered"
+        assert not asyncio.iscoroutinefunction(routes[0].endpoint)
+
+
+class TestThreadpoolSize:
+    def test_default_fits_db_pool(self, monkeypatch):
+        from core.config import Settings
+
+        monkeypatch.delenv("THREADPOOL_SIZE", raising=False)
+        monkeypatch.setenv("DB_POOL_SIZE", "5")
+        monkeypatch.setenv("DB_MAX_OVERFLOW", "7")
+        assert Settings().threadpool_size == 12
+
+
+@pytest.fixture
+def stats_app(tmp_path, monkeypatch):
+    """Роутер статистики на файловій SQLite: кожен потік threadpool отримує власне з'єднання"""
+    from fastapi import FastAPI
+    from sqlalchemy.orm import sessionmaker
+    import services.player_stats
+    from api.deps.db import get_db
+    from api.routers.stats import router
+    from models.user import User
+    from tests.conftest import create_sqlite_engine
+
+    engine = create_sqlite_engine(path=tmp_path / "stats.db")
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    with session_factory() as session:
+        session.add(User(id=1, battlenet_id="1", battletag="Player#1"))
+        session.commit()
+
+    # Повільний sync запит до БД всередині справжнього ендпоінту
+    get_rows = services.player_stats.get_player_stats_rows
+
+    def slow_get_rows(db, user_id):
+        time.sleep(0.3)
+        return get_rows(db, user_id)
+
+    monkeypatch.setattr(services.player_stats, "get_player_stats_rows", slow_get_rows)
+
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = override_get_db
+    yield app
+    engine.dispose()
+
+
+class TestEventLoopStaysFree:
+    @pytest.mark.asyncio
+    async def test_slow_stats_query_does_not_delay_loop(self, stats_app):
+        """Повільний запит у /stats/player/{id} виконується в threadpool і не затримує інші корутини"""
+        import httpx
+
+        ticks = []
+
+        async def ticker():
+            for _ in range(10):
+                started = time.perf_counter()
+                await asyncio.sleep(0.02)
+                ticks.append(time.perf_counter() - started)
+
+        transport = httpx.ASGITransport(app=stats_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses, _ = await asyncio.gather(
+                asyncio.gather(*[client.get("/stats/player/1") for _ in range(4)]),
+                ticker()
+            )
+
+        assert all(response.status_code == 200 for response in responses)
+        assert all(response.json()["tournaments_played"] == 0 for response in responses)
+        assert max(ticks) < 0.2
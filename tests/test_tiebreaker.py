@@ -102,3 +102,93 @@ def test_complex_tiebreaker_scenario():
     assert sorted_participants[2]['id'] == 3  # 15 points, best=1, random=0.7
     assert sorted_participants[3]['id'] == 4  # 15 points, best=2
     assert sorted_participants[4]['id'] == 5  # 10 points
+
+
+def test_final_standings_query_compiles_for_postgres():
+    """Final standings are ranked in SQL with ROW_NUMBER and a seeded tiebreak"""
+    from types import SimpleNamespace
+    from sqlalchemy.dialects import postgresql
+    from models.user import User  # noqa: F401
+    from models.tournament import Tournament  # noqa: F401
+    from models.tournament_round import TournamentRound  # noqa: F401
+    from models.tournament_game import TournamentGame  # noqa: F401
+    from api.crud.participant_crud import _final_standings_query
+
+    tournament = SimpleNamespace(
+        id=1, with_finals=True, finals_started=True, regular_rounds=4, total_rounds=6,
+        finals_participants_count=8, tiebreak_seed=12345
+    )
+    sql = str(_final_standings_query(tournament).compile(dialect=postgresql.dialect()))
+
+    assert "row_number() OVER" in sql
+    assert "EXISTS" in sql
+
+
+@pytest.fixture
+def db(db_session):
+    """Турнір на 4 гравців, 1 регулярний + 1 фінальний раунд"""
+    from models.user import User
+    from models.tournament import Tournament, TournamentStatus
+    from models.tournament_participant import TournamentParticipant
+    from models.tournament_round import TournamentRound
+    from models.tournament_game import TournamentGame
+    from models.game_participant import GameParticipant
+
+    session = db_session
+    for user_id in range(1, 5):
+        session.add(User(id=user_id, battlenet_id=str(user_id), battletag=f"Player#{user_id}"))
+    session.add(Tournament(id=1, name="Cup", creator_id=1, total_participants=4, total_rounds=2,
+                           regular_rounds=1, with_finals=True, finals_started=True,
+                           finals_participants_count=2, tiebreak_seed=1, status=TournamentStatus.ACTIVE))
+    session.add(TournamentRound(id=1, tournament_id=1, round_number=1))
+    session.add(TournamentRound(id=2, tournament_id=1, round_number=2))
+    session.add(TournamentGame(id=1, tournament_id=1, round_id=1, game_number=1))
+    session.add(TournamentGame(id=2, tournament_id=1, round_id=2, game_number=1))
+
+    # Учасники 1, 2 - у фінальній грі з однаковим finals_score; 3, 4 - поза фіналом,
+    # але з більшим total_score, однаковим між собою
+    scores = {1: (10.0, 5.0), 2: (8.0, 5.0), 3: (30.0, 0.0), 4: (30.0, 0.0)}
+    best = {1: 3, 2: 1, 3: 1, 4: 2}
+    for pid, (total_score, finals_score) in scores.items():
+        session.add(TournamentParticipant(id=pid, tournament_id=1, user_id=pid,
+                                          total_score=total_score, finals_score=finals_score))
+        session.add(GameParticipant(game_id=1, participant_id=pid, best_position=best[pid]))
+    for pid in (1, 2):
+        session.add(GameParticipant(game_id=2, participant_id=pid))
+    session.commit()
+    return session
+
+
+def standings(db, seed=None):
+    from models.tournament import Tournament
+    from api.crud.participant_crud import update_final_positions
+
+    if seed is not None:
+        db.get(Tournament, 1).tiebreak_seed = seed
+        db.commit()
+    positions = update_final_positions(db, 1)
+    return sorted(positions, key=positions.get)
+
+
+class TestFinalStandings:
+    def test_finalists_rank_above_non_finalists(self, db):
+        from models.tournament_participant import TournamentParticipant
+
+        order = standings(db)
+        # 3 і 4 мають більший total_score, але не грають у фінальному раунді
+        assert set(order[:2]) == {1, 2}
+        assert set(order[2:]) == {3, 4}
+        positions = {p.id: p.final_position for p in db.query(TournamentParticipant)}
+        assert positions == {pid: order.index(pid) + 1 for pid in range(1, 5)}
+
+    def test_best_placement_breaks_equal_finals_score(self, db):
+        # Однаковий finals_score: 2 мав 1-ше місце в грі, 1 - лише 3-тє
+        assert standings(db)[:2] == [2, 1]
+
+    def test_tiebreak_seed_is_deterministic(self, db):
+        first = standings(db, seed=1)
+        assert standings(db, seed=1) == first
+        assert first[2:] == [3, 4]
+
+        # Інший seed - інший "coin flip" для 3 і 4 (best_placement поза фіналом не враховується)
+        assert standings(db, seed=500000000)[2:] == [4, 3]
@@ -0,0 +1,86 @@
+"""
+Unit tests for the verified-token cache and JWT backends
+"""
+import time
+from datetime import timedelta
+
+import pytest
+from jose import JWTError, jwt
+
+import core.auth
+from core.auth import JWT_DECODERS, create_access_token, decode_access_token
+from core.config import settings
+from core.token_cache import VerifiedTokenCache
+
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    cache = VerifiedTokenCache(maxsize=10)
+    monkeypatch.setattr(core.auth, "token_cache", cache)
+    return cache
+
+
+def forged(claims: dict) -> str:
+    """Токен з довільними aud/iss/exp, підписаний тим самим ключем"""
+    payload = {"sub": "1", "aud": "blackbears-frontend", "iss": "blackbears-backend",
+               "exp": int(time.time()) + 60}
+    payload.update(claims)
+    return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+
+
+class TestVerifiedTokenCache:
+    def test_repeated_token_is_served_from_cache(self, token_cache, monkeypatch):
+        calls = []
+        decoder = JWT_DECODERS[settings.jwt_backend]
+        monkeypatch.setitem(JWT_DECODERS, settings.jwt_backend, lambda token: calls.append(token) or decoder(token))
+        token = create_access_token({"sub": "7"})
+
+        for _ in range(3):
+            assert decode_access_token(token)["sub"] == "7"
+        assert len(calls) == 1
+        assert token_cache.get_metrics() == {"size": 1, "maxsize": 10, "hits": 2, "misses": 1}
+
+    def test_entry_expires_with_token(self):
+        cache = VerifiedTokenCache()
+        cache.set("token", {"sub": "1", "exp": time.time() + 0.01})
+        assert cache.get("token") is not None
+        time.sleep(0.02)
+        assert cache.get("token") is None
+
+    def test_invalid_token_is_not_cached(self, token_cache):
+        token = forged({"iss": "someone-else"})
+        for _ in range(2):
+            with pytest.raises(JWTError):
+                decode_access_token(token)
+        assert token_cache.get_metrics()["size"] == 0
+
+    def test_lru_keeps_maxsize(self):
+        cache = VerifiedTokenCache(maxsize=2)
+        for i in range(3):
+            cache.set(f"token-{i}", {"sub": str(i), "exp": time.time() + 60})
+        assert cache.get("token-0") is None
+        assert cache.get("token-2")["sub"] == "2"
+
+
+class TestBackends:
+    @pytest.mark.parametrize("backend", sorted(JWT_DECODERS))
+    def test_valid_token(self, backend):
+        token = create_access_token({"sub": "5"}, expires_delta=timedelta(minutes=5))
+        assert JWT_DECODERS[backend](token)["sub"] == "5"
+
+    @pytest.mark.parametrize("backend", sorted(JWT_DECODERS))
+    @pytest.mark.parametrize("claims", [
+        {"aud": "other-frontend"},
+        {"iss": "other-backend"},
+        {"exp": int(time.time()) - 10},
+    ])
+    def test_rejected_tokens(self, backend, claims):
+        with pytest.raises(JWTError):
+            JWT_DECODERS[backend](forged(claims))
+
+    @pytest.mark.parametrize("backend", sorted(JWT_DECODERS))
+    def test_wrong_signature(self, backend):
+        token = jwt.encode({"sub": "1", "aud": "blackbears-frontend", "iss": "blackbears-backend",
+                            "exp": int(time.time()) + 60}, "another-secret", algorithm="HS256")
+        with pytest.raises(JWTError):
+            JWT_DECODERS[backend](token)
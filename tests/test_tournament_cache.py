@@ -0,0 +1,48 @@
+"""
+Unit tests for tournament version bumps on flush
+"""
+import pytest
+
+
+@pytest.fixture
+def db(db_session):
+    """Один турнір і учасник"""
+    from models.user import User
+    from models.tournament import Tournament
+    from models.tournament_participant import TournamentParticipant
+
+    session = db_session
+    session.add(User(id=1, battlenet_id="1", battletag="Player#1"))
+    session.add(Tournament(id=1, name="Cup", creator_id=1, total_participants=8, total_rounds=3))
+    session.add(TournamentParticipant(id=1, tournament_id=1, user_id=1, total_score=4.0))
+    session.commit()
+    return session
+
+
+def version(db) -> int:
+    from services.tournament_cache import get_tournament_version
+    return get_tournament_version(db, 1)
+
+
+class TestVersionBumps:
+    def test_real_change_bumps_version(self, db):
+        from models.tournament_participant import TournamentParticipant
+
+        before = version(db)
+        db.get(TournamentParticipant, 1).total_score = 5.0
+        db.commit()
+        assert version(db) == before + 1
+
+    def test_unchanged_assignment_keeps_version(self, db):
+        from models.tournament import Tournament
+        from models.tournament_participant import TournamentParticipant
+
+        before = version(db)
+        participant = db.get(TournamentParticipant, 1)
+        # Те саме значення: об'єкт у session.dirty, але без змін у колонках
+        participant.total_score = participant.total_score
+        tournament = db.get(Tournament, 1)
+        tournament.name = tournament.name
+        assert participant in db.dirty
+        db.commit()
+        assert version(db) == before
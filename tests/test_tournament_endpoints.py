@@ -0,0 +1,151 @@
+"""
+Unit tests for the cached tournament read endpoints
+"""
+import pytest
+
+from core.identity import IdentityCache
+
+
+@pytest.fixture
+def db(db_session):
+    """Турнір на 16 гравців: раунд 1 з двома іграми, результати першої гри записані"""
+    from models.user import User
+    from models.tournament import Tournament, TournamentStatus
+    from models.tournament_participant import TournamentParticipant
+    from models.tournament_round import TournamentRound
+    from models.tournament_game import TournamentGame, GameStatus
+    from models.game_participant import GameParticipant
+
+    session = db_session
+    session.add(User(id=100, battlenet_id="100", battletag="Creator#100"))
+    session.add(User(id=200, battlenet_id="200", battletag="Outsider#200"))
+    for user_id in range(1, 17):
+        session.add(User(id=user_id, battlenet_id=str(user_id), battletag=f"Player#{user_id}",
+                         phone=f"+38000000{user_id:02d}", telegram=f"@player{user_id}"))
+    session.add(Tournament(id=1, name="Cup", creator_id=100, total_participants=16, total_rounds=3,
+                           current_round=1, status=TournamentStatus.ACTIVE))
+    session.add(TournamentRound(id=1, tournament_id=1, round_number=1))
+    session.add(TournamentGame(id=1, tournament_id=1, round_id=1, game_number=1, status=GameStatus.COMPLETED))
+    session.add(TournamentGame(id=2, tournament_id=1, round_id=1, game_number=2, status=GameStatus.ACTIVE))
+    for user_id in range(1, 17):
+        session.add(TournamentParticipant(id=user_id, tournament_id=1, user_id=user_id, total_score=0.0))
+        gp = GameParticipant(game_id=1 if user_id <= 8 else 2, participant_id=user_id)
+        if user_id <= 8:
+            # Гравці 7 і 8 ділять 7-8 місця
+            gp.set_positions([user_id] if user_id < 7 else [7, 8])
+        session.add(gp)
+    session.commit()
+    return session
+
+
+@pytest.fixture
+def client(db, session_factory, monkeypatch):
+    """Роутер турнірів на тестовій БД зі свіжими кешами турнірів і користувачів"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    import core.auth
+    import services.tournament_cache
+    from api.deps.db import get_db
+    from api.routers.tournaments import router
+    from services.tournament_cache import VersionedCache
+
+    monkeypatch.setattr(services.tournament_cache, "tournament_cache", VersionedCache())
+    monkeypatch.setattr(core.auth, "identity_cache", IdentityCache())
+
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+def auth(user_id: int) -> dict:
+    from core.auth import create_access_token
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+class TestRoundGames:
+    def test_response_shape(self, client):
+        response = client.get("/tournaments/1/rounds/1/games", headers=auth(200))
+        assert response.status_code == 200
+        body = response.json()
+        assert body["round"]["number"] == 1
+        assert [game["id"] for game in body["games"]] == [1, 2]
+
+        participants = {gp["participant_id"]: gp for gp in body["games"][0]["participants"]}
+        # Старий формат: JSON-рядок спільних позицій, без колонок маски
+        assert participants[1]["positions"] == "[1]"
+        assert participants[8]["positions"] == "[7, 8]"
+        assert participants[1]["battletag"] == "Player#1"
+        assert participants[1]["user_id"] == 1
+        assert "position_mask" not in participants[1]
+        assert "best_position" not in participants[1]
+        assert all(gp["positions"] is None for gp in body["games"][1]["participants"])
+
+
+class TestTournamentDetails:
+    def test_if_none_match_returns_304(self, client):
+        response = client.get("/tournaments/1", headers=auth(1))
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        cached = client.get("/tournaments/1", headers={**auth(1), "If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
+
+    def test_etag_changes_after_result_write(self, client, session_factory):
+        from models.game_participant import GameParticipant
+
+        headers = auth(1)
+        etag = client.get("/tournaments/1/rounds/1/games", headers=headers).headers["ETag"]
+
+        session = session_factory()
+        gp = session.query(GameParticipant).filter(GameParticipant.participant_id == 9).one()
+        gp.set_positions([1])
+        session.commit()
+        session.close()
+
+        response = client.get("/tournaments/1/rounds/1/games", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        second_game = response.json()["games"][1]
+        assert {gp["participant_id"]: gp["positions"] for gp in second_game["participants"]}[9] == "[1]"
+
+    def test_contacts_are_redacted_for_non_participant(self, client):
+        outsider = client.get("/tournaments/1", headers=auth(200)).json()
+        assert all(p["phone"] is None and p["telegram"] is None for p in outsider["participants"])
+
+        # Учасник бачить лише власні контакти, творець - усі
+        player = {p["user_id"]: p for p in client.get("/tournaments/1", headers=auth(3)).json()["participants"]}
+        assert player[3]["phone"] == "+3800000003"
+        assert player[4]["telegram"] is None
+        creator = client.get("/tournaments/1", headers=auth(100)).json()
+        assert all(p["telegram"] == f"@player{p['user_id']}" for p in creator["participants"])
+
+    def test_anonymous_viewer_gets_redacted_copy_of_cached_entry(self, client):
+        client.get("/tournaments/1", headers=auth(100))
+        anonymous = client.get("/tournaments/1").json()
+        assert all(p["phone"] is None for p in anonymous["participants"])
+
+
+class TestRoundGamesPerViewer:
+    def test_own_game_first_from_same_cache_entry(self, client):
+        from services import tournament_cache as cache_module
+
+        first = client.get("/tournaments/1/rounds/1/games", headers=auth(12)).json()
+        misses = cache_module.tournament_cache.misses
+        second = client.get("/tournaments/1/rounds/1/games", headers=auth(2)).json()
+
+        # Другий запит - з кешу, але порядок ігор персональний
+        assert cache_module.tournament_cache.misses == misses
+        assert [game["id"] for game in first["games"]] == [2, 1]
+        assert [game["id"] for game in second["games"]] == [1, 2]
+        assert first["games"][0]["is_my_game"] is True
+        assert second["games"][1]["is_my_game"] is False
+        assert first["games"][0]["can_edit"] is True
@@ -0,0 +1,74 @@
+"""
+Unit tests for combined tournament logs pagination
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from api.crud.tournament_log_crud import (
+    get_combined_tournament_logs, count_combined_tournament_logs,
+    encode_log_cursor, decode_log_cursor
+)
+
+
+@pytest.fixture
+def db(db_session):
+    """Один турнір з грою та логами в обох таблицях"""
+    from models.user import User
+    from models.tournament import Tournament
+    from models.tournament_round import TournamentRound
+    from models.tournament_game import TournamentGame
+    from models.game_log import GameLog
+    from models.tournament_log import TournamentLog
+
+    session = db_session
+    session.add(User(id=1, battlenet_id="1", battletag="Admin#1"))
+    session.add(Tournament(id=1, name="Cup", creator_id=1, total_rounds=3, total_participants=8))
+    session.add(TournamentRound(id=1, tournament_id=1, round_number=1))
+    session.add(TournamentGame(id=1, tournament_id=1, round_id=1, game_number=1))
+    session.commit()
+
+    # По кілька логів на секунду, id у двох таблицях перетинаються
+    started = datetime(2025, 1, 1)
+    for i in range(1, 30):
+        created_at = started + timedelta(seconds=i // 3)
+        fields = dict(user_id=1, user_battletag="Admin#1", user_role="admin",
+                      action_type="test", action_description=str(i), created_at=created_at)
+        if i % 2:
+            session.add(GameLog(id=i, game_id=1, **fields))
+        else:
+            session.add(TournamentLog(id=i if i % 4 else i - 1, tournament_id=1, **fields))
+    session.commit()
+    return session
+
+
+def keys(rows):
+    return [(row.type, row.id) for row in rows]
+
+
+class TestCombinedLogs:
+    def test_newest_first_and_total(self, db):
+        rows = get_combined_tournament_logs(db, 1, limit=100)
+        assert len(rows) == 29
+        assert count_combined_tournament_logs(db, 1) == 29
+        assert all(a.created_at >= b.created_at for a, b in zip(rows, rows[1:]))
+
+    def test_cursor_pages_cover_everything_once(self, db):
+        expected = keys(get_combined_tournament_logs(db, 1, limit=100))
+        collected, cursor = [], None
+        while True:
+            page = get_combined_tournament_logs(db, 1, limit=7, cursor=cursor)
+            collected += keys(page)
+            if len(page) < 7:
+                break
+            cursor = encode_log_cursor(page[-1])
+        assert collected == expected
+
+    def test_skip_still_supported(self, db):
+        expected = keys(get_combined_tournament_logs(db, 1, limit=100))[5:10]
+        assert keys(get_combined_tournament_logs(db, 1, limit=5, skip=5)) == expected
+
+
+class TestLogCursor:
+    def test_invalid_cursor(self):
+        with pytest.raises(ValueError):
+            decode_log_cursor("not-a-cursor")
@@ -0,0 +1,178 @@
+"""
+Unit tests for the tournament membership index and websocket fan-out
+"""
+import asyncio
+import json
+
+import pytest
+
+from services.websocket_manager import TournamentWebSocketManager, EncodedMessage
+
+
+class FakeWebSocket:
+    """Minimal websocket stub that records sent messages"""
+
+    def __init__(self, delay: float = 0.0, broken: bool = False):
+        self.delay = delay
+        self.broken = broken
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.broken:
+            raise RuntimeError("connection closed")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+
+class TestMembershipIndex:
+    """Test tournament -> users index maintenance"""
+
+    def test_connect_warms_index(self):
+        """Should index tournaments passed on connect"""
+        async def scenario():
+            manager = TournamentWebSocketManager()
+            await manager.connect(FakeWebSocket(), 1, [10, 20])
+            await manager.connect(FakeWebSocket(), 2, [10])
+            return manager
+
+        manager = asyncio.run(scenario())
+        assert manager.get_tournament_members(10) == {1, 2}
+        assert manager.get_tournament_members(20) == {1}
+
+    def test_last_disconnect_clears_index(self):
+        """Should keep user indexed while at least one connection is open"""
+        async def scenario():
+            manager = TournamentWebSocketManager()
+            ws1, ws2 = FakeWebSocket(), FakeWebSocket()
+            await manager.connect(ws1, 1, [10])
+            await manager.connect(ws2, 1, [10])
+            await manager.disconnect(ws1)
+            after_first = manager.get_tournament_members(10)
+            await manager.disconnect(ws2)
+            return after_first, manager
+
+        after_first, manager = asyncio.run(scenario())
+        assert after_first == {1}
+        assert manager.get_tournament_members(10) == set()
+        assert 1 not in manager.user_tournaments
+
+    def test_add_and_remove_member(self):
+        """Should track join/leave only for connected users"""
+        async def scenario():
+            manager = TournamentWebSocketManager()
+            await manager.connect(FakeWebSocket(), 1, [])
+            manager.add_tournament_member(10, 1)
+            manager.add_tournament_member(10, 99)  # not connected
+            members = manager.get_tournament_members(10)
+            manager.remove_tournament_member(10, 1)
+            return members, manager
+
+        members, manager = asyncio.run(scenario())
+        assert members == {1}
+        assert manager.get_tournament_members(10) == set()
+
+
+class TestFanOut:
+    """Test broadcast behaviour"""
+
+    def test_broadcast_to_tournament_only_members(self):
+        """Should send only to indexed members without a db session"""
+        async def scenario():
+            manager = TournamentWebSocketManager()
+            member, outsider = FakeWebSocket(), FakeWebSocket()
+            await manager.connect(member, 1, [10])
+            await manager.connect(outsider, 2, [20])
+            await manager.broadcast_to_tournament(10, {"type": "round_started"})
+            return member, outsider
+
+        member, outsider = asyncio.run(scenario())
+        assert member.sent == [{"type": "round_started"}]
+        assert outsider.sent == []
+
+    def test_slow_socket_does_not_block_others(self):
+        """Should time out a slow socket and drop it while others receive the message"""
+        async def scenario():
+            manager = TournamentWebSocketManager()
+            manager.send_timeout = 0.05
+            fast, slow = FakeWebSocket(), FakeWebSocket(delay=1.0)
+            await manager.connect(fast, 1, [10])
+            await manager.connect(slow, 2, [10])
+            await manager.broadcast_to_tournament(10, {"type": "ping"})
+            return manager, fast
+
+        manager, fast = asyncio.run(scenario())
+        assert fast.sent == [{"type": "ping"}]
+        assert manager.get_connection_count(2) == 0
+        assert manager.get_tournament_members(10) == {1}
+
+    def test_broken_socket_removed_on_broadcast_to_all(self):
+        """Should clean up dead connections"""
+        async def scenario():
+            manager = TournamentWebSocketManager()
+            await manager.connect(FakeWebSocket(broken=True), 1, [])
+            await manager.connect(FakeWebSocket(), 2, [])
+            await manager.broadcast_to_all({"type": "game_completed"})
+            return manager
+
+        manager = asyncio.run(scenario())
+        assert manager.get_connected_users() == {2}
+
+
+class TestEncoding:
+    """Test serialize-once and compact encoding"""
+
+    def test_message_is_serialized_once_per_encoding(self, monkeypatch):
+        """Should call json.dumps once per encoding regardless of socket count"""
+        import services.websocket_manager as ws_module
+
+        calls = []
+        original_dumps = ws_module.json.dumps
+
+        def counting_dumps(*args, **kwargs):
+            calls.append(1)
+            return original_dumps(*args, **kwargs)
+
+        monkeypatch.setattr(ws_module.json, "dumps", counting_dumps)
+
+        async def scenario():
+            manager = TournamentWebSocketManager()
+            for user_id in range(1, 11):
+                await manager.connect(FakeWebSocket(), user_id, [], "json")
+            await manager.connect(FakeWebSocket(), 11, [], "compact")
+            await manager.broadcast_to_all({"type": "game_completed", "game_id": 5})
+
+        asyncio.run(scenario())
+        assert len(calls) == 2
+
+    def test_compact_encoding_uses_short_keys(self):
+        """Should replace known keys recursively and keep unknown ones"""
+        text, size = EncodedMessage({
+            "type": "game_result_updated",
+            "tournament_id": 1,
+            "updated_participant": {"participant_id": 7, "custom": True},
+        }).encode("compact")
+
+        assert json.loads(text) == {
+            "type": "game_result_updated",
+            "tid": 1,
+            "up": {"pid": 7, "custom": True},
+        }
+        assert size == len(text.encode("utf-8"))
+
+    def test_metrics_count_messages_and_bytes(self):
+        """Should count messages and bytes per message type"""
+        async def scenario():
+            manager = TournamentWebSocketManager()
+            await manager.connect(FakeWebSocket(), 1, [])
+            await manager.connect(FakeWebSocket(), 2, [])
+            await manager.broadcast_to_all({"type": "game_completed"})
+            return manager.get_metrics()
+
+        metrics = asyncio.run(scenario())
+        expected_size = len(json.dumps({"type": "game_completed"}, separators=(",", ":")))
+        assert metrics["messages_sent"] == {"game_completed": 2}
+        assert metrics["bytes_sent"] == {"game_completed": 2 * expected_size}